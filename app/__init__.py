@@ -1,5 +1,4 @@
 import os
-import pathlib
 import secrets
 from functools import partial
 from time import monotonic
@@ -86,7 +85,7 @@ from app.navigation import (
     OrgNavigation,
     SecondaryNavigation,
 )
-from app.notify_client import InviteTokenError
+from app.notify_client import InviteTokenError, api_session
 from app.notify_client.api_key_api_client import api_key_api_client
 from app.notify_client.billing_api_client import billing_api_client
 from app.notify_client.complaint_api_client import complaint_api_client
@@ -101,6 +100,7 @@ from app.notify_client.performance_dashboard_api_client import (
     performance_dashboard_api_client,
 )
 from app.notify_client.platform_stats_api_client import platform_stats_api_client
+from app.notify_client.resilience import api_resilience
 from app.notify_client.service_api_client import service_api_client
 from app.notify_client.status_api_client import status_api_client
 from app.notify_client.template_folder_api_client import template_folder_api_client
@@ -108,13 +108,20 @@ from app.notify_client.template_statistics_api_client import template_statistics
 from app.notify_client.upload_api_client import upload_api_client
 from app.notify_client.user_api_client import user_api_client
 from app.url_converters import SimpleDateTypeConverter, TemplateTypeConverter
+from app.utils.event_queue import event_queue
 from app.utils.govuk_frontend_jinja.flask_ext import init_govuk_frontend
-from notifications_utils import logging, request_helper
+from app.utils.jinja_cache import init_jinja_cache
+from app.utils.job_progress import job_progress
+from app.utils.load_test import load_tests
+from app.utils.render_cache import fragment_cache, preview_cache
+from app.utils.static_files import send_static_file
+from notifications_utils import logging, request_helper, request_timings
 from notifications_utils.formatters import (
     formatted_list,
     get_lines_with_normalised_whitespace,
 )
 from notifications_utils.recipients import format_phone_number_human_readable
+from notifications_utils.template import template_env
 from notifications_utils.url_safe_token import generate_token
 
 login_manager = LoginManager()
@@ -215,6 +222,7 @@ def create_app(application):
 
     application.config.from_object(configs[notify_environment])
     asset_fingerprinter._asset_root = application.config["ASSET_PATH"]
+    asset_fingerprinter.load_manifest()
 
     init_app(application)
 
@@ -230,6 +238,8 @@ def create_app(application):
         proxy_fix,
         request_helper,
         # API clients
+        api_session,
+        api_resilience,
         api_key_api_client,
         billing_api_client,
         complaint_api_client,
@@ -250,6 +260,15 @@ def create_app(application):
         user_api_client,
         # External API clients
         redis_client,
+        # Caches
+        preview_cache,
+        fragment_cache,
+        # Audit events
+        event_queue,
+        # Server-sent events
+        job_progress,
+        # Platform admin load tests
+        load_tests,
     ):
         client.init_app(application)
 
@@ -311,10 +330,17 @@ def create_app(application):
 
     application.register_blueprint(status_blueprint)
 
+    # Serve precompressed static files when there are any
+    application.view_functions["static"] = send_static_file
+
     add_template_filters(application)
+    init_jinja_cache(application, application.jinja_env, template_env)
 
     register_errorhandlers(application)
 
+    # Last, so that every before-request hook gets timed
+    request_timings.init_app(application)
+
     setup_event_handlers()
 
 
@@ -326,13 +352,7 @@ def init_app(application):
     application.before_request(make_session_permanent)
     application.after_request(save_service_or_org_after_request)
 
-    start = len(asset_fingerprinter._filesystem_path)
-    font_paths = [
-        str(item)[start:]
-        for item in pathlib.Path(asset_fingerprinter._filesystem_path).glob(
-            "fonts/*.woff2"
-        )
-    ]
+    font_paths = asset_fingerprinter.list_assets("fonts/*.woff2")
 
     @application.context_processor
     def _attach_current_service():
@@ -1,4 +1,7 @@
 import hashlib
+import json
+import pathlib
+from fnmatch import fnmatch
 
 
 class AssetFingerprinter(object):
@@ -17,13 +20,24 @@ class AssetFingerprinter(object):
         {{ asset_fingerprinter.get_url('stylesheets/application.css') }}
 
     * 'app/static' is assumed to be the root for all asset files
+    * if the frontend build has written fingerprints to 'app/static/manifest.json'
+      then `load_manifest` will use them rather than hashing each file
     """
 
     def __init__(self, asset_root="/static/", filesystem_path="app/static/"):
         self._cache = {}
+        self._manifest = {}
         self._asset_root = asset_root
         self._filesystem_path = filesystem_path
 
+    def load_manifest(self):
+        try:
+            with open(self._filesystem_path + "manifest.json") as manifest:
+                self._manifest = json.load(manifest)
+        except FileNotFoundError:
+            self._manifest = {}
+        self._cache = {}
+
     def get_url(self, asset_path, with_querystring_hash=True):
         if not with_querystring_hash:
             return self._asset_root + asset_path
@@ -32,10 +46,22 @@ class AssetFingerprinter(object):
                 self._asset_root
                 + asset_path
                 + "?"
-                + self.get_asset_fingerprint(self._filesystem_path + asset_path)
+                + (
+                    self._manifest.get(asset_path)
+                    or self.get_asset_fingerprint(self._filesystem_path + asset_path)
+                )
             )
         return self._cache[asset_path]
 
+    def list_assets(self, pattern):
+        if self._manifest:
+            return sorted(path for path in self._manifest if fnmatch(path, pattern))
+        start = len(self._filesystem_path)
+        return sorted(
+            str(item)[start:]
+            for item in pathlib.Path(self._filesystem_path).glob(pattern)
+        )
+
     def get_asset_fingerprint(self, asset_file_path):
         return hashlib.md5(  # nosec B324 - hash value is not verified, so md5 is fine
             self.get_asset_file_contents(asset_file_path)
@@ -105,6 +105,62 @@
     );
   };
 
+  var streams = {};
+
+  // Blocks on the same page can share one stream
+  var getStream = url => (
+    streams[url] = streams[url] || new global.EventSource(url)
+  );
+
+  var updateCounts = ($contents, counts) => Object.keys(counts).forEach(
+    option => $contents
+      .find('[data-pill-option="' + option + '"] .big-number-number')
+      .text(counts[option].toLocaleString('en-US'))
+  );
+
+  var fetchOnce = function(renderer, resource, queue, form) {
+    if (queue.push(renderer) === 1) {
+      $.ajax(
+        resource,
+        {
+          'method': form ? 'post' : 'get',
+          'data': form ? $('#' + form).serialize() : {}
+        }
+      ).done(
+        response => flushQueue(queue, response)
+      ).fail(
+        () => clearQueue(queue)
+      );
+    }
+  };
+
+  // Rather than polling, let the server push changes to the counts. The block
+  // is only fetched again once the stream ends, or polled again if the server
+  // can't keep sending progress.
+  var listen = function($contents, renderer, resource, queue, form, url) {
+    var stream = getStream(url);
+
+    stream.addEventListener('progress', event => {
+      var progress = JSON.parse(event.data);
+      if (progress.counts) updateCounts($contents, progress.counts);
+    });
+    stream.addEventListener('end', () => {
+      stream.close();
+      fetchOnce(renderer, resource, queue, form);
+    });
+    stream.addEventListener('fallback', () => {
+      stream.close();
+      poll(renderer, resource, queue, form);
+    });
+    stream.addEventListener('error', () => {
+      // The browser reconnects by itself unless the server refused the stream,
+      // in which case go back to polling
+      if (stream.readyState === global.EventSource.CLOSED) {
+        poll(renderer, resource, queue, form);
+      }
+    });
+  };
+
   global.GOVUK.Modules.UpdateContent = function() {
 
     this.start = component => {
@@ -130,6 +186,20 @@
           .forEach(className => classesPersister.addClassName(className));
       }
 
+      var stream = $component.data('stream');
+
+      if (stream && 'EventSource' in global) {
+        listen(
+          $contents,
+          getRenderer($contents, key, classesPersister),
+          resource,
+          getQueue(resource),
+          form,
+          stream
+        );
+        return;
+      }
+
       setTimeout(
         () => poll(
           getRenderer($contents, key, classesPersister),
@@ -1,5 +1,7 @@
 import json
+from datetime import timedelta
 from os import getenv
+from pathlib import Path
 
 import newrelic.agent
 
@@ -43,6 +45,9 @@ class Config(object):
 
     # Logging
     NOTIFY_LOG_LEVEL = getenv("NOTIFY_LOG_LEVEL", "INFO")
+    # Log lines are written by a background thread. If this many are waiting to
+    # be written, more are dropped. 0 writes them straight away instead
+    NOTIFY_LOG_QUEUE_SIZE = int(getenv("NOTIFY_LOG_QUEUE_SIZE", "10000"))
 
     DEFAULT_SERVICE_LIMIT = 50
 
@@ -74,6 +79,78 @@ class Config(object):
 
     REDIS_URL = cloud_config.redis_url
     REDIS_ENABLED = getenv("REDIS_ENABLED", "1") == "1"
+    # Each worker keeps up to REDIS_MAX_CONNECTIONS open. Redis is skipped for
+    # REDIS_CIRCUIT_COOLDOWN seconds after REDIS_CIRCUIT_MAX_FAILURES calls in a
+    # row fail to reach it
+    REDIS_MAX_CONNECTIONS = int(getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_SOCKET_TIMEOUT = float(getenv("REDIS_SOCKET_TIMEOUT", "2"))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "2"))
+    REDIS_HEALTH_CHECK_INTERVAL = int(getenv("REDIS_HEALTH_CHECK_INTERVAL", "30"))
+    REDIS_CIRCUIT_MAX_FAILURES = int(getenv("REDIS_CIRCUIT_MAX_FAILURES", "5"))
+    REDIS_CIRCUIT_COOLDOWN = float(getenv("REDIS_CIRCUIT_COOLDOWN", "30"))
+
+    # Rendered previews of notifications, keyed by template id and version
+    PREVIEW_CACHE_ENABLED = getenv("PREVIEW_CACHE_ENABLED", "1") == "1"
+    PREVIEW_CACHE_MAX_SIZE = int(getenv("PREVIEW_CACHE_MAX_SIZE", "5000"))
+    PREVIEW_CACHE_REDIS_ENABLED = getenv("PREVIEW_CACHE_REDIS_ENABLED", "0") == "1"
+    PREVIEW_CACHE_REDIS_TTL = int(timedelta(days=1).total_seconds())
+
+    # Rendered fragments of the dashboard and job pages, keyed by what they show
+    FRAGMENT_CACHE_ENABLED = getenv("FRAGMENT_CACHE_ENABLED", "1") == "1"
+    FRAGMENT_CACHE_MAX_SIZE = int(getenv("FRAGMENT_CACHE_MAX_SIZE", "1000"))
+    FRAGMENT_CACHE_REDIS_ENABLED = getenv("FRAGMENT_CACHE_REDIS_ENABLED", "0") == "1"
+    FRAGMENT_CACHE_REDIS_TTL = int(timedelta(hours=1).total_seconds())
+
+    # Compiled templates, shared by every worker on the same filesystem
+    JINJA_BYTECODE_CACHE_DIR = getenv("JINJA_BYTECODE_CACHE_DIR")
+    # Compile every template when the app starts, not when it’s first used
+    JINJA_WARM_UP = getenv("JINJA_WARM_UP", "0") == "1"
+
+    # Server-sent events with the progress of jobs which are sending
+    JOB_PROGRESS_POLL_INTERVAL = float(getenv("JOB_PROGRESS_POLL_INTERVAL", "2"))
+    JOB_PROGRESS_KEEP_ALIVE = 15
+    JOB_PROGRESS_MAX_DURATION = int(timedelta(hours=1).total_seconds())
+
+    # Where requests spend their time. Every request counts towards the latency
+    # of its endpoint; a sample of them also get a Server-Timing header and a log
+    # line breaking it down
+    REQUEST_TIMINGS_ENABLED = getenv("REQUEST_TIMINGS_ENABLED", "1") == "1"
+    REQUEST_TIMINGS_SAMPLE_RATE = float(getenv("REQUEST_TIMINGS_SAMPLE_RATE", "1"))
+
+    # Connections to the API. Each worker keeps up to API_POOL_SIZE open to
+    # reuse, and reuses a signed token for API_TOKEN_MAX_AGE seconds – the API
+    # accepts them for 30 seconds either side of when they were signed
+    API_POOL_SIZE = int(getenv("API_POOL_SIZE", "16"))
+    API_CONNECT_TIMEOUT = float(getenv("API_CONNECT_TIMEOUT", "5"))
+    API_READ_TIMEOUT = float(getenv("API_READ_TIMEOUT", "30"))
+    API_TOKEN_MAX_AGE = int(getenv("API_TOKEN_MAX_AGE", "10"))
+
+    # When the API is slow or failing. Each request gets API_REQUEST_DEADLINE
+    # seconds for all of its API calls. An endpoint’s circuit opens when
+    # API_CIRCUIT_FAILURE_RATE of at least API_CIRCUIT_MIN_CALLS calls in
+    # API_CIRCUIT_WINDOW seconds fail, and tries again after
+    # API_CIRCUIT_COOLDOWN seconds. Meanwhile GETs get the last response if it’s
+    # less than API_STALE_MAX_AGE seconds old. GETs are sent again if they’ve
+    # not been answered after API_HEDGE_AFTER seconds, if it’s set
+    API_REQUEST_DEADLINE = float(getenv("API_REQUEST_DEADLINE", "25"))
+    API_CIRCUIT_FAILURE_RATE = float(getenv("API_CIRCUIT_FAILURE_RATE", "0.5"))
+    API_CIRCUIT_MIN_CALLS = int(getenv("API_CIRCUIT_MIN_CALLS", "10"))
+    API_CIRCUIT_WINDOW = float(getenv("API_CIRCUIT_WINDOW", "30"))
+    API_CIRCUIT_COOLDOWN = float(getenv("API_CIRCUIT_COOLDOWN", "15"))
+    API_STALE_MAX_AGE = float(getenv("API_STALE_MAX_AGE", "300"))
+    API_STALE_CACHE_SIZE = int(getenv("API_STALE_CACHE_SIZE", "500"))
+    API_HEDGE_AFTER = float(getenv("API_HEDGE_AFTER", "0"))
+
+    # Audit events are sent to the API by a background thread, up to
+    # EVENT_BATCH_SIZE at a time. Server errors are tried again up to
+    # EVENT_MAX_ATTEMPTS times in all, waiting EVENT_RETRY_BACKOFF seconds and
+    # then twice as long each time. If EVENT_QUEUE_SIZE are waiting, more are
+    # dropped. 0 sends them during the request instead
+    EVENT_QUEUE_SIZE = int(getenv("EVENT_QUEUE_SIZE", "1000"))
+    EVENT_BATCH_SIZE = int(getenv("EVENT_BATCH_SIZE", "20"))
+    EVENT_MAX_ATTEMPTS = int(getenv("EVENT_MAX_ATTEMPTS", "5"))
+    EVENT_RETRY_BACKOFF = float(getenv("EVENT_RETRY_BACKOFF", "0.5"))
+    EVENT_FLUSH_TIMEOUT = float(getenv("EVENT_FLUSH_TIMEOUT", "5"))
 
     # TODO: reassign this
     NOTIFY_SERVICE_ID = "d6aa2c68-a2d9-4437-ab19-3ae8eb202553"
@@ -137,6 +214,8 @@ class Test(Development):
     API_HOST_NAME = "http://you-forgot-to-mock-an-api-call-to"
     REDIS_URL = "redis://you-forgot-to-mock-a-redis-call-to"
     LOGO_CDN_DOMAIN = "static-logos.test.com"
+    NOTIFY_LOG_QUEUE_SIZE = 0
+    EVENT_QUEUE_SIZE = 0
 
 
 class Production(Config):
@@ -145,6 +224,12 @@ class Production(Config):
     ASSET_DOMAIN = ""  # TODO use a CDN
     ASSET_PATH = "/static/"  # TODO use a CDN
     DEBUG = False
+    # In the app’s own directory, where only it can write
+    JINJA_BYTECODE_CACHE_DIR = getenv(
+        "JINJA_BYTECODE_CACHE_DIR", str(Path(__file__).parent.parent / ".cache/jinja")
+    )
+    JINJA_WARM_UP = getenv("JINJA_WARM_UP", "1") == "1"
+    REQUEST_TIMINGS_SAMPLE_RATE = float(getenv("REQUEST_TIMINGS_SAMPLE_RATE", "0.1"))
 
     # buckets
     CSV_UPLOAD_BUCKET = cloud_config.s3_credentials(
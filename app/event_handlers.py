@@ -1,6 +1,6 @@
 from flask import request
 
-from app.notify_client.events_api_client import events_api_client
+from app.utils.event_queue import event_queue
 
 EVENT_SCHEMAS = {
     "sucessful_login": {"user_id"},
@@ -102,7 +102,7 @@ def _send_event(event_type, **kwargs):
     event_data = _construct_event_data(request)
     event_data.update(kwargs)
 
-    events_api_client.create_event(event_type, event_data)
+    event_queue.put(event_type, event_data)
 
 
 def _construct_event_data(request):
@@ -1888,6 +1888,37 @@ class AdminClearCacheForm(StripWhitespaceForm):
             raise ValidationError("Select at least one option")
 
 
+class AdminLoadTestForm(StripWhitespaceForm):
+    message_count = GovukIntegerField(
+        "Number of messages",
+        default=500,
+        validators=[
+            InputRequired(message="Cannot be empty"),
+            validators.NumberRange(
+                min=1, max=10000, message="Must be between 1 and 10,000"
+            ),
+        ],
+    )
+    concurrency = GovukIntegerField(
+        "Messages to send at once",
+        default=10,
+        validators=[
+            InputRequired(message="Cannot be empty"),
+            validators.NumberRange(min=1, max=100, message="Must be between 1 and 100"),
+        ],
+    )
+    rate = GovukIntegerField(
+        "Messages to start a second (0 for as many as possible)",
+        default=0,
+        validators=[
+            InputRequired(message="Cannot be empty"),
+            validators.NumberRange(
+                min=0, max=1000, message="Must be between 0 and 1,000"
+            ),
+        ],
+    )
+
+
 class ChangeSecurityKeyNameForm(StripWhitespaceForm):
     security_key_name = GovukTextInputField(
         "Name of key",
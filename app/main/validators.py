@@ -1,9 +1,9 @@
 import re
 from abc import ABC, abstractmethod
+from functools import lru_cache
 
 from wtforms import ValidationError
 
-from app.main._commonly_used_passwords import commonly_used_passwords
 from app.models.spreadsheet import Spreadsheet
 from app.utils.user import is_gov_user
 from notifications_utils.field import Field
@@ -12,6 +12,14 @@ from notifications_utils.recipients import InvalidEmailError, validate_email_add
 from notifications_utils.sanitise_text import SanitiseSMS
 
 
+@lru_cache(maxsize=1)
+def get_commonly_used_passwords():
+    # Only imported when someone sets a password, rather than by every worker
+    from app.main._commonly_used_passwords import commonly_used_passwords
+
+    return frozenset(commonly_used_passwords)
+
+
 class CommonlyUsedPassword:
     def __init__(self, message=None):
         if not message:
@@ -19,7 +27,7 @@ class CommonlyUsedPassword:
         self.message = message
 
     def __call__(self, form, field):
-        if field.data in commonly_used_passwords:
+        if field.data in get_commonly_used_passwords():
             raise ValidationError(self.message)
 
 
@@ -1,11 +1,15 @@
+from functools import partial
+
 from flask import jsonify, redirect, render_template, session, url_for
 from flask_login import current_user
+from markupsafe import Markup
 from notifications_python_client.errors import HTTPError
 
 from app import current_service, notification_api_client, service_api_client
 from app.main import main
 from app.main.forms import SearchByNameForm
 from app.models.template_list import TemplateList
+from app.utils.render_cache import digest, preview_cache, preview_cache_key
 from app.utils.user import user_has_permissions
 from notifications_utils.recipients import format_phone_number_human_readable
 from notifications_utils.template import SMSPreviewTemplate
@@ -131,20 +135,38 @@ def get_sms_thread(service_id, user_number):
         if redact_personalisation:
             notification["personalisation"] = {}
 
+        if is_inbound:
+            # inbound messages have no template, so key them on their content
+            cache_key = "inbound-sms-{}".format(digest(notification["content"]))
+        else:
+            cache_key = preview_cache_key(
+                "sms-thread",
+                notification["template"].get("id"),
+                notification["template"].get("version"),
+                redact_personalisation,
+                notification.get("personalisation"),
+            )
+
         yield {
             "inbound": is_inbound,
-            "content": SMSPreviewTemplate(
-                {
-                    "template_type": "sms",
-                    "content": (
-                        notification["content"]
-                        if is_inbound
-                        else notification["template"]["content"]
+            "content": Markup(
+                preview_cache.get_or_render(
+                    cache_key,
+                    partial(
+                        SMSPreviewTemplate,
+                        {
+                            "template_type": "sms",
+                            "content": (
+                                notification["content"]
+                                if is_inbound
+                                else notification["template"]["content"]
+                            ),
+                        },
+                        notification.get("personalisation"),
+                        downgrade_non_sms_characters=(not is_inbound),
+                        redact_missing_personalisation=redact_personalisation,
                     ),
-                },
-                notification.get("personalisation"),
-                downgrade_non_sms_characters=(not is_inbound),
-                redact_missing_personalisation=redact_personalisation,
+                )
             ),
             "created_at": notification["created_at"],
             "status": notification.get("status"),
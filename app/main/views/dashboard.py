@@ -1,9 +1,9 @@
 import calendar
 from datetime import datetime
 from functools import partial
-from itertools import groupby
 
-from flask import Response, abort, jsonify, render_template, request, session, url_for
+import numpy as np
+from flask import abort, jsonify, render_template, request, session, url_for
 from flask_login import current_user
 from werkzeug.utils import redirect
 
@@ -14,7 +14,13 @@ from app import (
     service_api_client,
     template_statistics_client,
 )
-from app.formatters import format_date_numeric, format_datetime_numeric, get_time_left
+from app.formatters import (
+    format_date_numeric,
+    format_datetime_numeric,
+    format_datetime_relative,
+    format_delta,
+    get_time_left,
+)
 from app.main import main
 from app.main.views.user_profile import set_timezone
 from app.statistics_utils import get_formatted_percentage
@@ -22,10 +28,12 @@ from app.utils import (
     DELIVERED_STATUSES,
     FAILURE_STATUSES,
     REQUESTED_STATUSES,
+    conditional_json_response,
     service_has_permission,
 )
-from app.utils.csv import Spreadsheet
+from app.utils.csv import CSVReport
 from app.utils.pagination import generate_next_dict, generate_previous_dict
+from app.utils.render_cache import fragment_cache
 from app.utils.time import get_current_financial_year
 from app.utils.user import user_has_permissions
 from notifications_utils.recipients import format_phone_number_human_readable
@@ -122,7 +130,11 @@ def get_daily_stats_by_user():
 @main.route("/services/<uuid:service_id>/dashboard.json")
 @user_has_permissions("view_activity")
 def service_dashboard_updates(service_id):
-    return jsonify(**get_dashboard_partials(service_id))
+    dashboard_data = get_dashboard_data(service_id)
+    return conditional_json_response(
+        get_dashboard_fingerprint(dashboard_data),
+        lambda: get_dashboard_partials(service_id, dashboard_data),
+    )
 
 
 @main.route("/services/<uuid:service_id>/template-activity")
@@ -251,44 +263,52 @@ def inbox(service_id):
 @user_has_permissions("view_activity")
 @service_has_permission("inbound_sms")
 def inbox_updates(service_id):
-    return jsonify(get_inbox_partials(service_id))
+    page = int(request.args.get("page", 1))
+    inbound_messages_data = service_api_client.get_most_recent_inbound_sms(
+        service_id, page=page
+    )
+    return conditional_json_response(
+        [
+            page,
+            inbound_messages_data,
+            # Each message says how long ago it was received
+            [
+                format_delta(message["created_at"])
+                for message in inbound_messages_data["data"]
+            ],
+        ],
+        lambda: get_inbox_partials(service_id, inbound_messages_data),
+    )
+
+
+INBOX_REPORT = CSVReport(
+    (
+        "Phone number",
+        lambda message: format_phone_number_human_readable(message["user_number"]),
+    ),
+    ("Message", lambda message: message["content"].lstrip(("=+-@"))),
+    ("Received", lambda message: format_datetime_numeric(message["created_at"])),
+)
 
 
 @main.route("/services/<uuid:service_id>/inbox.csv")
 @user_has_permissions("view_activity")
 def inbox_download(service_id):
-    return Response(
-        Spreadsheet.from_rows(
-            [
-                [
-                    "Phone number",
-                    "Message",
-                    "Received",
-                ]
-            ]
-            + [
-                [
-                    format_phone_number_human_readable(message["user_number"]),
-                    message["content"].lstrip(("=+-@")),
-                    format_datetime_numeric(message["created_at"]),
-                ]
-                for message in service_api_client.get_inbound_sms(service_id)["data"]
-            ]
-        ).as_csv_data,
-        mimetype="text/csv",
-        headers={
-            "Content-Disposition": 'inline; filename="Received text messages {}.csv"'.format(
-                format_date_numeric(datetime.utcnow().isoformat())
-            )
-        },
+    return INBOX_REPORT.response(
+        service_api_client.get_inbound_sms(service_id)["data"],
+        filename="Received text messages {}.csv".format(
+            format_date_numeric(datetime.utcnow().isoformat())
+        ),
+        disposition="inline",
     )
 
 
-def get_inbox_partials(service_id):
+def get_inbox_partials(service_id, inbound_messages_data=None):
     page = int(request.args.get("page", 1))
-    inbound_messages_data = service_api_client.get_most_recent_inbound_sms(
-        service_id, page=page
-    )
+    if inbound_messages_data is None:
+        inbound_messages_data = service_api_client.get_most_recent_inbound_sms(
+            service_id, page=page
+        )
     inbound_messages = inbound_messages_data["data"]
     if not inbound_messages:
         inbound_number = current_service.inbound_number
@@ -319,19 +339,40 @@ def filter_out_cancelled_stats(template_statistics):
 
 def aggregate_template_usage(template_statistics, sort_key="count"):
     template_statistics = filter_out_cancelled_stats(template_statistics)
+    if not template_statistics:
+        return []
+
+    first_stats = {}
+    for stat in template_statistics:
+        first_stats.setdefault(stat["template_id"], stat)
+    template_indexes = {
+        template_id: index for index, template_id in enumerate(sorted(first_stats))
+    }
+    # Add up the counts for each template in one go, rather than grouping the
+    # rows in Python first
+    counts = np.bincount(
+        np.fromiter(
+            (template_indexes[stat["template_id"]] for stat in template_statistics),
+            dtype=np.int64,
+            count=len(template_statistics),
+        ),
+        weights=np.fromiter(
+            (stat["count"] for stat in template_statistics),
+            dtype=np.int64,
+            count=len(template_statistics),
+        ),
+        minlength=len(template_indexes),
+    ).astype(np.int64)
+
     templates = []
-    for k, v in groupby(
-        sorted(template_statistics, key=lambda x: x["template_id"]),
-        key=lambda x: x["template_id"],
-    ):
-        template_stats = list(v)
-        first_stat = template_stats[0] if template_stats else None
+    for template_id, count in zip(template_indexes, counts):
+        first_stat = first_stats[template_id]
         templates.append(
             {
-                "template_id": k,
+                "template_id": template_id,
                 "template_name": first_stat.get("template_name"),
                 "template_type": first_stat.get("template_type"),
-                "count": sum(s["count"] for s in template_stats),
+                "count": int(count),
                 "created_by": first_stat.get("created_by"),
                 "created_by_id": first_stat.get("created_by_id"),
                 "last_used": first_stat.get("last_used"),
@@ -360,14 +401,10 @@ def aggregate_notifications_stats(template_statistics):
     return notifications
 
 
-def get_dashboard_partials(service_id):
+def get_dashboard_data(service_id):
     all_statistics = template_statistics_client.get_template_statistics_for_service(
         service_id, limit_days=7
     )
-    template_statistics = aggregate_template_usage(all_statistics)
-    stats = aggregate_notifications_stats(all_statistics)
-
-    dashboard_totals = (get_dashboard_totals(stats),)
     free_sms_allowance = billing_api_client.get_free_sms_fragment_limit_for_year(
         current_service.id,
     )
@@ -384,27 +421,78 @@ def get_dashboard_partials(service_id):
         get_current_financial_year(),
     )
     return {
-        "upcoming": render_template(
+        "all_statistics": all_statistics,
+        "free_sms_allowance": free_sms_allowance,
+        "yearly_usage": yearly_usage,
+    }
+
+
+def get_dashboard_fingerprint(dashboard_data):
+    # The upcoming and inbox partials show how long ago (or until) things
+    # happen, so they can change even when the data doesn’t
+    scheduled_job_stats = current_service.scheduled_job_stats
+    inbound_sms_summary = current_service.inbound_sms_summary or {}
+    return [
+        dashboard_data,
+        scheduled_job_stats,
+        scheduled_job_stats.get("soonest_scheduled_for")
+        and format_datetime_relative(scheduled_job_stats["soonest_scheduled_for"]),
+        inbound_sms_summary,
+        inbound_sms_summary.get("most_recent")
+        and format_delta(inbound_sms_summary["most_recent"]),
+    ]
+
+
+def get_dashboard_partials(service_id, dashboard_data=None):
+    dashboard_data = dashboard_data or get_dashboard_data(service_id)
+    template_statistics = aggregate_template_usage(dashboard_data["all_statistics"])
+    stats = aggregate_notifications_stats(dashboard_data["all_statistics"])
+    dashboard_totals = (get_dashboard_totals(stats),)
+    most_used_template_count = max([row["count"] for row in template_statistics] or [0])
+    usage = get_annual_usage_breakdown(
+        dashboard_data["yearly_usage"], dashboard_data["free_sms_allowance"]
+    )
+    scheduled_job_stats = current_service.scheduled_job_stats
+    inbound_sms_summary = current_service.inbound_sms_summary
+
+    return {
+        "upcoming": fragment_cache.render_template(
             "views/dashboard/_upcoming.html",
+            [
+                service_id,
+                scheduled_job_stats,
+                scheduled_job_stats.get("soonest_scheduled_for")
+                and format_datetime_relative(
+                    scheduled_job_stats["soonest_scheduled_for"]
+                ),
+            ],
         ),
-        "inbox": render_template(
+        "inbox": fragment_cache.render_template(
             "views/dashboard/_inbox.html",
+            [
+                service_id,
+                inbound_sms_summary,
+                inbound_sms_summary
+                and inbound_sms_summary.get("most_recent")
+                and format_delta(inbound_sms_summary["most_recent"]),
+            ],
         ),
-        "totals": render_template(
+        "totals": fragment_cache.render_template(
             "views/dashboard/_totals.html",
+            [service_id, dashboard_totals[0]],
             service_id=service_id,
             statistics=dashboard_totals[0],
         ),
-        "template-statistics": render_template(
+        "template-statistics": fragment_cache.render_template(
             "views/dashboard/template-statistics.html",
+            [service_id, template_statistics],
             template_statistics=template_statistics,
-            most_used_template_count=max(
-                [row["count"] for row in template_statistics] or [0]
-            ),
+            most_used_template_count=most_used_template_count,
         ),
-        "usage": render_template(
+        "usage": fragment_cache.render_template(
             "views/dashboard/_usage.html",
-            **get_annual_usage_breakdown(yearly_usage, free_sms_allowance),
+            usage,
+            **usage,
         ),
     }
 
@@ -5,7 +5,6 @@ from functools import partial
 from flask import (
     Response,
     abort,
-    jsonify,
     redirect,
     render_template,
     request,
@@ -22,17 +21,19 @@ from app import (
     notification_api_client,
     service_api_client,
 )
-from app.formatters import get_time_left, message_count_noun
+from app.formatters import format_datetime_relative, get_time_left, message_count_noun
 from app.main import main
 from app.main.forms import SearchNotificationsForm
 from app.models.job import Job
-from app.utils import parse_filter_args, set_status_filters
-from app.utils.csv import generate_notifications_csv
+from app.utils import conditional_json_response, parse_filter_args, set_status_filters
+from app.utils.csv import generate_notifications_csv, get_user_preferred_timezone
+from app.utils.job_progress import job_progress
 from app.utils.pagination import (
     generate_next_dict,
     generate_previous_dict,
     get_page_from_request,
 )
+from app.utils.render_cache import fragment_cache, preview_cache, preview_cache_key
 from app.utils.user import user_has_permissions
 from notifications_utils.template import EmailPreviewTemplate, SMSBodyPreviewTemplate
 
@@ -68,6 +69,9 @@ def view_job(service_id, job_id):
             job_id=job.id,
             status=request.args.get("status", ""),
         ),
+        progress_url=url_for(
+            ".view_job_progress", service_id=service_id, job_id=job.id
+        ),
         partials=get_job_partials(job),
     )
 
@@ -112,7 +116,23 @@ def cancel_job(service_id, job_id):
 def view_job_updates(service_id, job_id):
     job = Job.from_id(job_id, service_id=service_id)
 
-    return jsonify(**get_job_partials(job))
+    return conditional_json_response(
+        get_job_fingerprint(job), lambda: get_job_partials(job)
+    )
+
+
+@main.route("/services/<uuid:service_id>/jobs/<uuid:job_id>/progress")
+@user_has_permissions()
+def view_job_progress(service_id, job_id):
+    return Response(
+        job_progress.stream(service_id, job_id),
+        mimetype="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # Stop proxies holding events back until they have a bufferful
+            "X-Accel-Buffering": "no",
+        },
+    )
 
 
 @main.route("/services/<uuid:service_id>/notifications", methods=["GET", "POST"])
@@ -188,10 +208,29 @@ def view_notifications(service_id, message_type=None):
 )
 @user_has_permissions()
 def get_notifications_as_json(service_id, message_type=None):
-    return jsonify(
-        get_notifications(
-            service_id, message_type, status_override=request.args.get("status")
+    service_data_retention_days = None
+    if message_type is not None:
+        service_data_retention_days = current_service.get_days_of_retention(
+            message_type, number_of_days="seven_day"
         )
+    # Sending, delivering or failing a notification always changes the counts,
+    # so there’s no need to get the page of notifications to tell if it’s changed
+    service_statistics = service_api_client.get_service_statistics(
+        service_id, limit_days=service_data_retention_days
+    )
+    return conditional_json_response(
+        [
+            service_statistics,
+            message_type,
+            request.args.get("status"),
+            request.args.get("page"),
+        ],
+        lambda: get_notifications(
+            service_id,
+            message_type,
+            status_override=request.args.get("status"),
+            service_statistics=service_statistics,
+        ),
     )
 
 
@@ -203,7 +242,9 @@ def get_notifications_as_json(service_id, message_type=None):
     endpoint="view_notifications_csv",
 )
 @user_has_permissions()
-def get_notifications(service_id, message_type, status_override=None):  # noqa
+def get_notifications(  # noqa
+    service_id, message_type, status_override=None, service_statistics=None
+):
     # TODO get the api to return count of pages as well.
     page = get_page_from_request()
     if page is None:
@@ -238,6 +279,10 @@ def get_notifications(service_id, message_type, status_override=None):  # noqa
         limit_days=service_data_retention_days,
         to=search_term,
     )
+    if service_statistics is None:
+        service_statistics = service_api_client.get_service_statistics(
+            service_id, limit_days=service_data_retention_days
+        )
     url_args = {"message_type": message_type, "status": request.args.get("status")}
     prev_page = None
     if "links" in notifications and notifications["links"].get("prev", None):
@@ -268,9 +313,7 @@ def get_notifications(service_id, message_type, status_override=None):  # noqa
             status_filters=get_status_filters(
                 current_service,
                 message_type,
-                service_api_client.get_service_statistics(
-                    service_id, limit_days=service_data_retention_days
-                ),
+                service_statistics,
             ),
         ),
         "notifications": render_template(
@@ -384,14 +427,33 @@ def _get_job_counts(job):
     ]
 
 
+def get_job_fingerprint(job):
+    service_data_retention_days = current_service.get_days_of_retention(
+        job.template_type, "seven_day"
+    )
+    # As well as the job itself, include anything time-based the partials show
+    return [
+        job._dict,
+        request.args.get("status"),
+        request.referrer is not None and "check" in request.referrer,
+        get_time_left(
+            job.created_at, service_data_retention_days=service_data_retention_days
+        ),
+        job.scheduled_for and format_datetime_relative(job.scheduled_for),
+        job.awaiting_processing_or_recently_processed,
+    ]
+
+
 def get_job_partials(job):
     filter_args = parse_filter_args(request.args)
     filter_args["status"] = set_status_filters(filter_args)
     notifications = job.get_notifications(status=filter_args["status"])
     number_of_days = "seven_day"
-    counts = render_template(
+    job_counts = _get_job_counts(job)
+    counts = fragment_cache.render_template(
         "partials/count.html",
-        counts=_get_job_counts(job),
+        [job_counts, request.args.get("status", "")],
+        counts=job_counts,
         status=filter_args["status"],
         notifications_deleted=(
             job.status == "finished" and not notifications["notifications"]
@@ -410,6 +472,7 @@ def get_job_partials(job):
 
     return {
         "counts": counts,
+        # Not cached because it has a CSRF token in it when the job is scheduled
         "notifications": render_template(
             "partials/jobs/notifications.html",
             notifications=list(
@@ -428,8 +491,15 @@ def get_job_partials(job):
             job=job,
             service_data_retention_days=service_data_retention_days,
         ),
-        "status": render_template(
+        "status": fragment_cache.render_template(
             "partials/jobs/status.html",
+            [
+                job._dict,
+                arrived_from_preview_page_url,
+                current_service.name,
+                current_service.message_limit,
+                get_user_preferred_timezone(),
+            ],
             job=job,
             arrived_from_preview_page_url=arrived_from_preview_page_url,
         ),
@@ -446,22 +516,35 @@ def add_preview_of_content_to_notifications(notifications):
 
 
 def get_preview_of_content(notification):
-    if notification["template"].get("redact_personalisation"):
+    template = notification["template"]
+    if template.get("redact_personalisation"):
         notification["personalisation"] = {}
 
-    if notification["template"]["template_type"] == "sms":
-        return str(
-            SMSBodyPreviewTemplate(
-                notification["template"],
+    cache_key = preview_cache_key(
+        template["template_type"],
+        template.get("id"),
+        template.get("version"),
+        template.get("redact_personalisation"),
+        notification["personalisation"],
+    )
+
+    if template["template_type"] == "sms":
+        return preview_cache.get_or_render(
+            cache_key,
+            lambda: SMSBodyPreviewTemplate(
+                template,
                 notification["personalisation"],
-            )
+            ),
         )
 
-    if notification["template"]["template_type"] == "email":
+    if template["template_type"] == "email":
         return Markup(
-            EmailPreviewTemplate(
-                notification["template"],
-                notification["personalisation"],
-                redact_missing_personalisation=True,
-            ).subject
+            preview_cache.get_or_render(
+                cache_key,
+                lambda: EmailPreviewTemplate(
+                    template,
+                    notification["personalisation"],
+                    redact_missing_personalisation=True,
+                ).subject,
+            )
         )
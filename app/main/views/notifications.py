@@ -4,7 +4,6 @@ from datetime import datetime
 from flask import (
     Response,
     flash,
-    jsonify,
     render_template,
     request,
     stream_with_context,
@@ -17,6 +16,7 @@ from app.notify_client.api_key_api_client import KEY_TYPE_TEST
 from app.utils import (
     DELIVERED_STATUSES,
     FAILURE_STATUSES,
+    conditional_json_response,
     get_help_argument,
     parse_filter_args,
     set_status_filters,
@@ -102,10 +102,15 @@ def view_notification(service_id, notification_id, error_message=None):
 @main.route("/services/<uuid:service_id>/notification/<uuid:notification_id>.json")
 @user_has_permissions("view_activity", "send_messages")
 def view_notification_updates(service_id, notification_id):
-    return jsonify(
-        **get_single_notification_partials(
-            notification_api_client.get_notification(service_id, notification_id)
-        )
+    notification = notification_api_client.get_notification(service_id, notification_id)
+    return conditional_json_response(
+        [
+            notification["status"],
+            notification["notification_type"],
+            notification["template"]["template_type"],
+            notification.get("key_type"),
+        ],
+        lambda: get_single_notification_partials(notification),
     )
 
 
@@ -1,20 +1,10 @@
-import csv
 import itertools
 import json
 from collections import OrderedDict
 from datetime import datetime
-from io import StringIO
-
-from flask import (
-    Response,
-    abort,
-    current_app,
-    flash,
-    render_template,
-    request,
-    session,
-    url_for,
-)
+
+from flask import abort, current_app, flash, redirect, render_template, request, url_for
+from flask_login import current_user
 from notifications_python_client.errors import HTTPError
 
 from app import (
@@ -30,16 +20,18 @@ from app.extensions import redis_client
 from app.main import main
 from app.main.forms import (
     AdminClearCacheForm,
+    AdminLoadTestForm,
     BillingReportDateFilterForm,
     DateFilterForm,
     RequiredDateFilterForm,
 )
-from app.main.views.send import _send_notification
 from app.statistics_utils import (
+    ServicesStatistics,
     get_formatted_percentage,
     get_formatted_percentage_two_dp,
 )
-from app.utils.csv import Spreadsheet
+from app.utils.csv import CSVReport
+from app.utils.load_test import load_tests, start_load_test
 from app.utils.pagination import (
     generate_next_dict,
     generate_previous_dict,
@@ -82,38 +74,30 @@ def platform_admin():
     )
 
 
+ALL_USERS_REPORT = CSVReport(
+    ("Name", "name"),
+    ("Email Address", "email_address"),
+    ("Phone Number", "mobile_number"),
+    ("Service", "service"),
+)
+
+
 @main.route("/platform-admin/download-all-users")
 @user_is_platform_admin
 def download_all_users():
-
-    # Create a CSV string from the user data
     users = user_api_client.get_all_users_detailed()
 
     if len(users) == 0:
         return "No data to download."
 
-    output = StringIO()
-    header = ["Name", "Email Address", "Phone Number", "Service"]
-    fieldnames = ["name", "email_address", "mobile_number", "service"]
-    writer = csv.DictWriter(
-        output,
-        fieldnames=fieldnames,
-        delimiter=",",
+    return ALL_USERS_REPORT.response(
+        (
+            {key: value.replace(",", "") for key, value in user.items()}
+            for user in users
+            if not user["name"].replace(",", "").startswith("e2e")
+        ),
+        filename="users.csv",
     )
-    # Write custom header
-    writer.writerow(dict(zip(fieldnames, header)))
-    for user in users:
-        user_no_commas = {key: value.replace(",", "") for key, value in user.items()}
-        if user_no_commas["name"].startswith("e2e"):
-            continue
-        writer.writerow(user_no_commas)
-    csv_data = output.getvalue()
-
-    # Create a direct download response with the CSV data and appropriate headers
-    response = Response(csv_data, content_type="text/csv; charset=utf-8")
-    response.headers["Content-Disposition"] = "attachment; filename=users.csv"
-
-    return response
 
 
 def is_over_threshold(number, total, threshold):
@@ -223,8 +207,9 @@ def platform_admin_services():
         api_args["start_date"] = form.start_date.data
         api_args["end_date"] = form.end_date.data or datetime.utcnow().date()
 
-    services = filter_and_sort_services(
-        service_api_client.get_services(api_args)["data"],
+    statistics = ServicesStatistics(
+        service_api_client.get_services(api_args)["data"]
+    ).filter_and_sort(
         trial_mode_services=request.endpoint == "main.trial_services",
     )
 
@@ -232,11 +217,11 @@ def platform_admin_services():
         "views/platform-admin/services.html",
         include_from_test_key=include_from_test_key,
         form=form,
-        services=list(format_stats_by_service(services)),
+        services=list(format_stats_by_service(statistics.services)),
         page_title="{} services".format(
             "Trial mode" if request.endpoint == "main.trial_services" else "Live"
         ),
-        global_stats=create_global_stats(services),
+        global_stats=statistics.global_stats,
     )
 
 
@@ -246,51 +231,59 @@ def platform_admin_reports():
     return render_template("views/platform-admin/reports.html")
 
 
+def _format_live_date(row):
+    if not row["live_date"]:
+        return row["live_date"]
+    return datetime.strptime(row["live_date"], "%a, %d %b %Y %X %Z").strftime(
+        "%d-%m-%Y"
+    )
+
+
+LIVE_SERVICES_REPORT = CSVReport(
+    ("Service ID", "service_id"),
+    ("Organization", "organization_name"),
+    ("Organization type", "organization_type"),
+    ("Service name", "service_name"),
+    ("Consent to research", "consent_to_research"),
+    ("Main contact", "contact_name"),
+    ("Contact email", "contact_email"),
+    ("Contact mobile", "contact_mobile"),
+    ("Live date", _format_live_date),
+    ("SMS volume intent", "sms_volume_intent"),
+    ("Email volume intent", "email_volume_intent"),
+    ("SMS sent this year", "sms_totals"),
+    ("Emails sent this year", "email_totals"),
+    ("Free sms allowance", "free_sms_fragment_limit"),
+)
+
+
 @main.route("/platform-admin/reports/live-services.csv")
 @user_is_platform_admin
 def live_services_csv():
     results = service_api_client.get_live_services_data()["data"]
 
-    column_names = OrderedDict(
-        [
-            ("service_id", "Service ID"),
-            ("organization_name", "Organization"),
-            ("organization_type", "Organization type"),
-            ("service_name", "Service name"),
-            ("consent_to_research", "Consent to research"),
-            ("contact_name", "Main contact"),
-            ("contact_email", "Contact email"),
-            ("contact_mobile", "Contact mobile"),
-            ("live_date", "Live date"),
-            ("sms_volume_intent", "SMS volume intent"),
-            ("email_volume_intent", "Email volume intent"),
-            ("sms_totals", "SMS sent this year"),
-            ("email_totals", "Emails sent this year"),
-            ("free_sms_fragment_limit", "Free sms allowance"),
-        ]
+    return LIVE_SERVICES_REPORT.response(
+        results,
+        filename="{} live services report.csv".format(
+            format_date_numeric(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
+        ),
+        disposition="inline",
     )
 
-    # initialise with header row
-    live_services_data = [[x for x in column_names.values()]]
-
-    for row in results:
-        if row["live_date"]:
-            row["live_date"] = datetime.strptime(
-                row["live_date"], "%a, %d %b %Y %X %Z"
-            ).strftime("%d-%m-%Y")
 
-        live_services_data.append([row[api_key] for api_key in column_names.keys()])
-
-    return (
-        Spreadsheet.from_rows(live_services_data).as_csv_data,
-        200,
-        {
-            "Content-Type": "text/csv; charset=utf-8",
-            "Content-Disposition": 'inline; filename="{} live services report.csv"'.format(
-                format_date_numeric(datetime.now().strftime("%Y-%m-%dT%H:%M:%S.%fZ")),
-            ),
-        },
-    )
+# The API returns each row as a list, already in column order
+NOTIFICATION_STATUS_BY_SERVICE_REPORT = CSVReport(
+    ("date_created", 0),
+    ("service_id", 1),
+    ("service_name", 2),
+    ("notification_type", 3),
+    ("count_sending", 4),
+    ("count_delivered", 5),
+    ("count_technical_failure", 6),
+    ("count_temporary_failure", 7),
+    ("count_permanent_failure", 8),
+    ("count_sent", 9),
+)
 
 
 @main.route(
@@ -304,32 +297,14 @@ def notifications_sent_by_service():
         start_date = form.start_date.data
         end_date = form.end_date.data
 
-        headers = [
-            "date_created",
-            "service_id",
-            "service_name",
-            "notification_type",
-            "count_sending",
-            "count_delivered",
-            "count_technical_failure",
-            "count_temporary_failure",
-            "count_permanent_failure",
-            "count_sent",
-        ]
         result = notification_api_client.get_notification_status_by_service(
             start_date, end_date
         )
-        content_disposition = (
-            'attachment; filename="{} to {} notification status '
-            'per service report.csv"'.format(start_date, end_date)
-        )
-        return (
-            Spreadsheet.from_rows([headers] + result).as_csv_data,
-            200,
-            {
-                "Content-Type": "text/csv; charset=utf-8",
-                "Content-Disposition": content_disposition,
-            },
+        return NOTIFICATION_STATUS_BY_SERVICE_REPORT.response(
+            result,
+            filename="{} to {} notification status per service report.csv".format(
+                start_date, end_date
+            ),
         )
 
     return render_template(
@@ -337,6 +312,20 @@ def notifications_sent_by_service():
     )
 
 
+BILLING_REPORT = CSVReport(
+    ("organization_id", "organization_id"),
+    ("organization_name", "organization_name"),
+    ("service_id", "service_id"),
+    ("service_name", "service_name"),
+    ("sms_cost", "sms_cost"),
+    ("sms_chargeable_units", "sms_chargeable_units"),
+    ("purchase_order_number", lambda r: r.get("purchase_order_number")),
+    ("contact_names", lambda r: r.get("contact_names")),
+    ("contact_email_addresses", lambda r: r.get("contact_email_addresses")),
+    ("billing_reference", lambda r: r.get("billing_reference")),
+)
+
+
 @main.route("/platform-admin/reports/usage-for-all-services", methods=["GET", "POST"])
 @user_is_platform_admin
 def get_billing_report():
@@ -345,18 +334,6 @@ def get_billing_report():
     if form.validate_on_submit():
         start_date = form.start_date.data
         end_date = form.end_date.data
-        headers = [
-            "organization_id",
-            "organization_name",
-            "service_id",
-            "service_name",
-            "sms_cost",
-            "sms_chargeable_units",
-            "purchase_order_number",
-            "contact_names",
-            "contact_email_addresses",
-            "billing_reference",
-        ]
         try:
             result = billing_api_client.get_data_for_billing_report(
                 start_date, end_date
@@ -370,71 +347,61 @@ def get_billing_report():
                 )
             else:
                 raise e
-        rows = [
-            [
-                r["organization_id"],
-                r["organization_name"],
-                r["service_id"],
-                r["service_name"],
-                r["sms_cost"],
-                r["sms_chargeable_units"],
-                r.get("purchase_order_number"),
-                r.get("contact_names"),
-                r.get("contact_email_addresses"),
-                r.get("billing_reference"),
-            ]
-            for r in result
-        ]
-        if rows:
-            return (
-                Spreadsheet.from_rows([headers] + rows).as_csv_data,
-                200,
-                {
-                    "Content-Type": "text/csv; charset=utf-8",
-                    "Content-Disposition": 'attachment; filename="Billing Report from {} to {}.csv"'.format(
-                        start_date, end_date
-                    ),
-                },
+        if result:
+            return BILLING_REPORT.response(
+                result,
+                filename=f"Billing Report from {start_date} to {end_date}.csv",
             )
         else:
             flash("No results for dates")
     return render_template("views/platform-admin/get-billing-report.html", form=form)
 
 
+# Rows are built by `_get_user_row`, which needs the names of every service
+USERS_REPORT = CSVReport(
+    ("name", 0),
+    ("services", 1),
+    ("platform admin", 2),
+    ("permissions", 3),
+    ("password changed at", 4),
+    ("state", 5),
+)
+
+
 @main.route("/platform-admin/reports/get-users-report", methods=["GET", "POST"])
 @user_is_platform_admin
 def get_users_report():
-    headers = [
-        "name",
-        "services",
-        "platform admin",
-        "permissions",
-        "password changed at",
-        "state",
-    ]
     try:
         result = user_api_client.get_all_users()
 
     except HTTPError as e:
         raise e
 
-    rows = []
-    for r in result:
-        rows.append(_get_user_row(r))
-    if rows:
-        return (
-            Spreadsheet.from_rows([headers] + rows).as_csv_data,
-            200,
-            {
-                "Content-Type": "text/csv; charset=utf-8",
-                "Content-Disposition": f'attachment; filename="User Report {datetime.utcnow()}.csv"',
-            },
+    if result:
+        service_names = service_api_client.get_service_names(
+            itertools.chain.from_iterable(r["services"] for r in result)
+        )
+        return USERS_REPORT.response(
+            (_get_user_row(r, service_names) for r in result),
+            filename=f"User Report {datetime.utcnow()}.csv",
         )
     else:
         flash("No results")
     return render_template("views/platform-admin/get-users-report.html")
 
 
+VOLUMES_BY_SERVICE_REPORT = CSVReport(
+    ("organization id", "organization_id"),
+    ("organization name", "organization_name"),
+    ("service id", "service_id"),
+    ("service name", "service_name"),
+    ("free allowance", "free_allowance"),
+    ("sms notifications", "sms_notifications"),
+    ("sms chargeable units", "sms_chargeable_units"),
+    ("email totals", "email_totals"),
+)
+
+
 @main.route("/platform-admin/reports/volumes-by-service", methods=["GET", "POST"])
 @user_is_platform_admin
 def get_volumes_by_service():
@@ -443,43 +410,14 @@ def get_volumes_by_service():
     if form.validate_on_submit():
         start_date = form.start_date.data
         end_date = form.end_date.data
-        headers = [
-            "organization id",
-            "organization name",
-            "service id",
-            "service name",
-            "free allowance",
-            "sms notifications",
-            "sms chargeable units",
-            "email totals",
-        ]
         result = billing_api_client.get_data_for_volumes_by_service_report(
             start_date, end_date
         )
 
-        rows = [
-            [
-                r["organization_id"],
-                r["organization_name"],
-                r["service_id"],
-                r["service_name"],
-                r["free_allowance"],
-                r["sms_notifications"],
-                r["sms_chargeable_units"],
-                r["email_totals"],
-            ]
-            for r in result
-        ]
-        if rows:
-            return (
-                Spreadsheet.from_rows([headers] + rows).as_csv_data,
-                200,
-                {
-                    "Content-Type": "text/csv; charset=utf-8",
-                    "Content-Disposition": 'attachment; filename="Volumes by service report from {} to {}.csv"'.format(
-                        start_date, end_date
-                    ),
-                },
+        if result:
+            return VOLUMES_BY_SERVICE_REPORT.response(
+                result,
+                filename=f"Volumes by service report from {start_date} to {end_date}.csv",
             )
         else:
             flash("No results for dates")
@@ -488,6 +426,15 @@ def get_volumes_by_service():
     )
 
 
+DAILY_VOLUMES_REPORT = CSVReport(
+    ("day", "day"),
+    ("sms totals", "sms_totals"),
+    ("sms fragment totals", "sms_fragment_totals"),
+    ("sms chargeable units", "sms_chargeable_units"),
+    ("email totals", "email_totals"),
+)
+
+
 @main.route("/platform-admin/reports/daily-volumes-report", methods=["GET", "POST"])
 @user_is_platform_admin
 def get_daily_volumes():
@@ -496,43 +443,30 @@ def get_daily_volumes():
     if form.validate_on_submit():
         start_date = form.start_date.data
         end_date = form.end_date.data
-        headers = [
-            "day",
-            "sms totals",
-            "sms fragment totals",
-            "sms chargeable units",
-            "email totals",
-        ]
         result = billing_api_client.get_data_for_daily_volumes_report(
             start_date, end_date
         )
 
-        rows = [
-            [
-                r["day"],
-                r["sms_totals"],
-                r["sms_fragment_totals"],
-                r["sms_chargeable_units"],
-                r["email_totals"],
-            ]
-            for r in result
-        ]
-        if rows:
-            return (
-                Spreadsheet.from_rows([headers] + rows).as_csv_data,
-                200,
-                {
-                    "Content-Type": "text/csv; charset=utf-8",
-                    "Content-Disposition": 'attachment; filename="Daily volumes report from {} to {}.csv"'.format(
-                        start_date, end_date
-                    ),
-                },
+        if result:
+            return DAILY_VOLUMES_REPORT.response(
+                result,
+                filename=f"Daily volumes report from {start_date} to {end_date}.csv",
             )
         else:
             flash("No results for dates")
     return render_template("views/platform-admin/daily-volumes-report.html", form=form)
 
 
+DAILY_SMS_PROVIDER_VOLUMES_REPORT = CSVReport(
+    ("day", "day"),
+    ("provider", "provider"),
+    ("sms totals", "sms_totals"),
+    ("sms fragment totals", "sms_fragment_totals"),
+    ("sms chargeable units", "sms_chargeable_units"),
+    ("sms cost", "sms_cost"),
+)
+
+
 @main.route(
     "/platform-admin/reports/daily-sms-provider-volumes-report", methods=["GET", "POST"]
 )
@@ -543,38 +477,14 @@ def get_daily_sms_provider_volumes():
     if form.validate_on_submit():
         start_date = form.start_date.data
         end_date = form.end_date.data
-        headers = [
-            "day",
-            "provider",
-            "sms totals",
-            "sms fragment totals",
-            "sms chargeable units",
-            "sms cost",
-        ]
         result = billing_api_client.get_data_for_daily_sms_provider_volumes_report(
             start_date, end_date
         )
 
-        rows = [
-            [
-                r["day"],
-                r["provider"],
-                r["sms_totals"],
-                r["sms_fragment_totals"],
-                r["sms_chargeable_units"],
-                r["sms_cost"],
-            ]
-            for r in result
-        ]
-        content_disp = f'attachment; filename="Daily SMS provider volumes report from {start_date} to {end_date}.csv"'
-        if rows:
-            return (
-                Spreadsheet.from_rows([headers] + rows).as_csv_data,
-                200,
-                {
-                    "Content-Type": "text/csv; charset=utf-8",
-                    "Content-Disposition": content_disp,
-                },
+        if result:
+            return DAILY_SMS_PROVIDER_VOLUMES_REPORT.response(
+                result,
+                filename=f"Daily SMS provider volumes report from {start_date} to {end_date}.csv",
             )
         else:
             flash("No results for dates")
@@ -688,51 +598,15 @@ def sum_service_usage(service):
 
 
 def filter_and_sort_services(services, trial_mode_services=False):
-    return [
-        service
-        for service in sorted(
-            services,
-            key=lambda service: (
-                service["active"],
-                sum_service_usage(service),
-                service["created_at"],
-            ),
-            reverse=True,
-        )
-        if service["restricted"] == trial_mode_services
-    ]
+    return (
+        ServicesStatistics(services)
+        .filter_and_sort(trial_mode_services=trial_mode_services)
+        .services
+    )
 
 
 def create_global_stats(services):
-    stats = {
-        "email": {"delivered": 0, "failed": 0, "requested": 0},
-        "sms": {"delivered": 0, "failed": 0, "requested": 0},
-    }
-    # Issue #1323. The back end is now sending 'failure' instead of
-    # 'failed'.  Adjust it here, but keep it flexible in case
-    # the backend reverts to 'failed'.
-    for service in services:
-        if service["statistics"]["sms"].get("failure") is not None:
-            service["statistics"]["sms"]["failed"] = service["statistics"]["sms"][
-                "failure"
-            ]
-        if service["statistics"]["email"].get("failure") is not None:
-            service["statistics"]["email"]["failed"] = service["statistics"]["email"][
-                "failure"
-            ]
-
-    for service in services:
-
-        for msg_type, status in itertools.product(
-            ("sms", "email"), ("delivered", "failed", "requested")
-        ):
-            stats[msg_type][status] += service["statistics"][msg_type][status]
-
-    for stat in stats.values():
-        stat["failure_rate"] = get_formatted_percentage(
-            stat["failed"], stat["requested"]
-        )
-    return stats
+    return ServicesStatistics(services).global_stats
 
 
 def format_stats_by_service(services):
@@ -747,7 +621,7 @@ def format_stats_by_service(services):
         }
 
 
-def _get_user_row(r):
+def _get_user_row(r, service_names):
     # [{
     #     'name': 'Kenneth Kehl',
     #     'organizations': [],
@@ -762,9 +636,9 @@ def _get_user_row(r):
     service_id_name_lookup = {}
     services = []
     for s in r["services"]:
-        my_service = service_api_client.get_service(s)
-        service_id_name_lookup[my_service["data"]["id"]] = my_service["data"]["name"]
-        services.append(my_service["data"]["name"])
+        if s in service_names:
+            service_id_name_lookup[s] = service_names[s]
+        services.append(service_names.get(s, s))
     services = str(services)
     services = services.replace("[", "")
     services = services.replace("]", "")
@@ -792,34 +666,39 @@ def load_test():
     """
     The load test assumes that a service called 'Test service' exists.  It will make
     the platform admin a member of this service if the platform is not already. All
-    messagese will be sent in this service.
+    messagese will be sent in this service, alternating between the simulated
+    success and failure numbers.
+
+    It runs in the background, so this redirects straight to its results.
     """
-    service = _find_load_test_service()
-    _prepare_load_test_service(service)
-    example_template = _find_example_template(service)
-
-    # Simulated success
-    for _ in range(0, 250):
-        session["recipient"] = current_app.config["SIMULATED_SMS_NUMBERS"][0]
-        session["placeholders"] = {
-            "day of week": "Monday",
-            "color": "blue",
-            "phone number": current_app.config["SIMULATED_SMS_NUMBERS"][0],
-        }
-        _send_notification(service["id"], example_template["id"])
-    # Simulated failure
-    for _ in range(0, 250):
-        session["recipient"] = current_app.config["SIMULATED_SMS_NUMBERS"][1]
-        session["placeholders"] = {
-            "day of week": "Wednesday",
-            "color": "orange",
-            "phone number": current_app.config["SIMULATED_SMS_NUMBERS"][1],
-        }
-        _send_notification(service["id"], example_template["id"])
+    form = AdminLoadTestForm()
 
-    # For now, just redirect to the splash page so we know it's done
+    if form.validate_on_submit():
+        service = _find_load_test_service()
+        _prepare_load_test_service(service)
+        example_template = _find_example_template(service)
+
+        load_test_id = start_load_test(
+            current_user._get_current_object(),
+            service,
+            example_template["id"],
+            form.message_count.data,
+            form.concurrency.data,
+            form.rate.data,
+        )
+        return redirect(url_for(".load_test_results", load_test_id=load_test_id))
+
+    return render_template("views/platform-admin/load-test.html", form=form)
+
+
+@main.route("/platform-admin/load-test/<uuid:load_test_id>")
+@user_is_platform_admin
+def load_test_results(load_test_id):
+    results = load_tests.get(load_test_id)
+    if results is None:
+        abort(404)
     return render_template(
-        "views/platform-admin/splash-page.html",
+        "views/platform-admin/load-test-results.html", results=results
     )
 
 
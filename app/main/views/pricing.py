@@ -5,7 +5,9 @@ from app.main import main
 from app.main.forms import SearchByNameForm
 from app.main.views.sub_navigation_dictionaries import using_notify_nav
 from app.utils.user import user_is_logged_in
-from notifications_utils.international_billing_rates import INTERNATIONAL_BILLING_RATES
+from notifications_utils.international_billing_rates import (
+    get_international_billing_rates,
+)
 
 CURRENT_SMS_RATE = "1.72"
 
@@ -19,7 +21,7 @@ def pricing():
         international_sms_rates=sorted(
             [
                 (cc, country["names"], country["billable_units"])
-                for cc, country in INTERNATIONAL_BILLING_RATES.items()
+                for cc, country in get_international_billing_rates().items()
             ],
             key=lambda x: x[0],
         ),
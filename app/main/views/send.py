@@ -483,7 +483,7 @@ def send_one_off_step(service_id, template_id, step_index):
         link_to_upload=(
             request.endpoint == "main.send_one_off_step" and step_index == 0
         ),
-        errors=form.errors if form.errors else None
+        errors=form.errors if form.errors else None,
     )
 
 
@@ -530,31 +530,7 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
         **kwargs,
     )
 
-    allow_list = []
-    if current_service.trial_mode:
-        # Adding the simulated numbers to allow list
-        # so they can be sent in trial mode
-        for user in Users(service_id):
-            allow_list.extend([user.name, user.mobile_number, user.email_address])
-        # Failed sms number
-        allow_list.extend(
-            ["simulated user (fail)", "+14254147167", "simulated@simulated.gov"]
-        )
-        # Success sms number
-        allow_list.extend(
-            ["simulated user (success)", "+14254147755", "simulatedtwo@simulated.gov"]
-        )
-    else:
-        allow_list = None
-    recipients = RecipientCSV(
-        contents,
-        template=template,
-        max_initial_rows_shown=50,
-        max_errors_shown=50,
-        guestlist=allow_list,
-        remaining_messages=remaining_messages,
-        allow_international_sms=current_service.has_permission("international_sms"),
-    )
+    recipients = get_recipients(service_id, contents, template, remaining_messages)
 
     if request.args.get("from_test"):
         # TODO: may not be required after letters code removed
@@ -612,6 +588,38 @@ def _check_messages(service_id, template_id, upload_id, preview_row, **kwargs):
     )
 
 
+def get_allow_list(service_id):
+    if not current_service.trial_mode:
+        return None
+
+    allow_list = []
+    # Adding the simulated numbers to allow list
+    # so they can be sent in trial mode
+    for user in Users(service_id):
+        allow_list.extend([user.name, user.mobile_number, user.email_address])
+    # Failed sms number
+    allow_list.extend(
+        ["simulated user (fail)", "+14254147167", "simulated@simulated.gov"]
+    )
+    # Success sms number
+    allow_list.extend(
+        ["simulated user (success)", "+14254147755", "simulatedtwo@simulated.gov"]
+    )
+    return allow_list
+
+
+def get_recipients(service_id, contents, template, remaining_messages):
+    return RecipientCSV(
+        contents,
+        template=template,
+        max_initial_rows_shown=50,
+        max_errors_shown=50,
+        guestlist=get_allow_list(service_id),
+        remaining_messages=remaining_messages,
+        allow_international_sms=current_service.has_permission("international_sms"),
+    )
+
+
 @main.route(
     "/services/<uuid:service_id>/<uuid:template_id>/check/<uuid:upload_id>",
     methods=["GET"],
@@ -907,6 +915,10 @@ def get_template_error_dict(exception):
     else:
         raise exception
 
+    return get_error_dict(error)
+
+
+def get_error_dict(error):
     return {
         "error": error,
         "SMS_CHAR_COUNT_LIMIT": SMS_CHAR_COUNT_LIMIT,
@@ -960,6 +972,26 @@ def send_notification(service_id, template_id):
                 template_id=template_id,
             )
         )
+
+    # For load testing we want to skip these checks, because the load test
+    # just blasts messages
+    if os.getenv("NOTIFY_ENVIRONMENT") not in ("development", "staging", "demo"):
+        if error := _check_one_off_notification(
+            service_id, template_id, session["placeholders"]
+        ):
+            return render_template(
+                "views/notifications/preview.html",
+                **_check_notification(
+                    service_id,
+                    template_id,
+                    show_recipient=False,
+                    force_hide_sender=True,
+                ),
+                **get_error_dict(error),
+                scheduled_for=session.get("scheduled_for", ""),
+                recipient=recipient,
+            )
+
     upload_id = _send_notification(service_id, template_id)
 
     session.pop("recipient", "")
@@ -1011,30 +1043,70 @@ def send_notification(service_id, template_id):
     )
 
 
-def _send_notification(service_id, template_id):
-    scheduled_for = session.pop("scheduled_for", "")
-
+def _get_one_off_csv(placeholders):
     keys = []
     values = []
     # Guarantee that the real phone number comes last, because some
     # users will have placeholders like "add your second phone number"
     # or something like as custom placeholders.
-    for k, v in session["placeholders"].items():
+    for k, v in placeholders.items():
         if k != "phone number":
             keys.append(k)
             values.append(v)
-    if "phone number" in session["placeholders"].keys():
+    if "phone number" in placeholders.keys():
         keys.append("phone number")
-        values.append(session["placeholders"]["phone number"])
+        values.append(placeholders["phone number"])
 
     data = ",".join(keys)
     vals = ",".join(values)
-    data = f"{data}\r\n{vals}"
+    return f"{data}\r\n{vals}"
+
+
+def _check_one_off_notification(service_id, template_id, placeholders):
+    """
+    Checks the one-off message against the same rules as an uploaded
+    spreadsheet, without uploading it. Returns the error to show on the
+    preview page, if there is one.
+    """
+    notification_count = service_api_client.get_notification_count(service_id)
+    remaining_messages = current_service.message_limit - notification_count
+    template = get_template(
+        current_service.get_template_with_user_permission_or_403(
+            template_id, current_user
+        ),
+        current_service,
+        show_recipient=False,
+    )
+    recipients = get_recipients(
+        service_id, _get_one_off_csv(placeholders), template, remaining_messages
+    )
+
+    if not recipients.allowed_to_send_to:
+        return "not-allowed-to-send-to"
+    if recipients.more_rows_than_can_send:
+        return "too-many-messages"
+    if any(recipients.rows_with_message_too_long):
+        return "message-too-long"
+    return None
+
+
+def _upload_one_off(service_id, template_id, placeholders, sender_id=None):
+    data = _get_one_off_csv(placeholders)
     filename = (
         f"one-off-{uuid.uuid4()}.csv"  # {current_user.name} removed from filename
     )
     my_data = {"filename": filename, "template_id": template_id, "data": data}
-    upload_id = s3upload(service_id, my_data)
+    # Set the metadata the API needs to process the job as part of the
+    # upload, rather than copying the object again afterwards
+    metadata = {
+        "notification_count": 1,
+        "template_id": template_id,
+        "valid": True,
+        "original_file_name": filename,
+    }
+    if sender_id:
+        metadata["sender_id"] = sender_id
+    upload_id = s3upload(service_id, my_data, metadata=metadata)
     # To debug messages that the user reports have not been sent, we log
     # the csv filename and the job id.  The user will give us the file name,
     # so we can search on that to obtain the job id, which we can use elsewhere
@@ -1044,18 +1116,10 @@ def _send_notification(service_id, template_id):
             f"One-off file: {filename} job_id: {upload_id} s3 location: {service_id}-service-notify/{upload_id}.csv"
         )
     )
+    return upload_id, filename
 
-    # For load testing we want to skip these checks.  They are doing some fine-grained
-    # comparison about what is in the preview, but the load test just blast messages
-    # and doesn't care about the preview.
-    if os.getenv("NOTIFY_ENVIRONMENT") not in ("development", "staging", "demo"):
-        form = CsvUploadForm()
-        form.file.data = my_data
-        form.file.name = filename
-        check_message_output = check_messages(service_id, template_id, upload_id, 2)
-        if "You cannot send to" in check_message_output:
-            return check_messages(service_id, template_id, upload_id, 2)
 
+def _create_one_off_job(service_id, template_id, upload_id, filename, scheduled_for):
     job_api_client.create_job(
         upload_id,
         service_id,
@@ -1065,6 +1129,17 @@ def _send_notification(service_id, template_id):
         notification_count=1,
         valid="True",
     )
+
+
+def _send_notification(service_id, template_id):
+    scheduled_for = session.pop("scheduled_for", "")
+    upload_id, filename = _upload_one_off(
+        service_id,
+        template_id,
+        session["placeholders"],
+        sender_id=session.get("sender_id"),
+    )
+    _create_one_off_job(service_id, template_id, upload_id, filename, scheduled_for)
     return upload_id
 
 
@@ -1,3 +1,5 @@
+from collections import defaultdict
+
 from flask import abort, current_app
 from werkzeug.utils import cached_property
 
@@ -205,10 +207,33 @@ class Service(JSONModel, SortByNameMixin):
 
         return User.from_id(user_id)
 
+    @classmethod
+    def load_templates_and_folders(cls, services):
+        """
+        Fetch the templates and folders for many services in bulk, rather than
+        one request per service when each one's `all_templates` and
+        `all_template_folders` are first used.
+        """
+        service_ids = [service.id for service in services]
+        templates = service_api_client.get_service_templates_for_services(service_ids)
+        folders = template_folder_api_client.get_template_folders_for_services(
+            service_ids
+        )
+        for service in services:
+            service.all_templates = service._filter_templates(
+                templates[service.id]["data"]
+            )
+            service.all_template_folders = service._sort_template_folders(
+                folders[service.id]
+            )
+
     @cached_property
     def all_templates(self):
-        templates = service_api_client.get_service_templates(self.id)["data"]
+        return self._filter_templates(
+            service_api_client.get_service_templates(self.id)["data"]
+        )
 
+    def _filter_templates(self, templates):
         return [
             template
             for template in templates
@@ -219,6 +244,19 @@ class Service(JSONModel, SortByNameMixin):
     def all_template_ids(self):
         return {template["id"] for template in self.all_templates}
 
+    @cached_property
+    def templates_by_folder(self):
+        """
+        Templates grouped by folder ID and then by template type, with an extra
+        `all` group per folder. Each group keeps the order of `all_templates`.
+        """
+        templates_by_folder = defaultdict(lambda: defaultdict(list))
+        for template in self.all_templates:
+            folder = templates_by_folder[template.get("folder")]
+            folder["all"].append(template)
+            folder[template["template_type"]].append(template)
+        return templates_by_folder
+
     def get_template(self, template_id, version=None):
         return service_api_client.get_service_template(self.id, template_id, version)[
             "data"
@@ -443,15 +481,22 @@ class Service(JSONModel, SortByNameMixin):
 
     @cached_property
     def all_template_folders(self):
-        return sorted(
-            template_folder_api_client.get_template_folders(self.id),
-            key=lambda folder: folder["name"].lower(),
+        return self._sort_template_folders(
+            template_folder_api_client.get_template_folders(self.id)
         )
 
+    @staticmethod
+    def _sort_template_folders(folders):
+        return sorted(folders, key=lambda folder: folder["name"].lower())
+
     @cached_property
     def all_template_folder_ids(self):
         return {folder["id"] for folder in self.all_template_folders}
 
+    @cached_property
+    def template_folders_by_id(self):
+        return {folder["id"]: folder for folder in self.all_template_folders}
+
     def get_template_folder(self, folder_id):
         if folder_id is None:
             return {
@@ -459,7 +504,10 @@ class Service(JSONModel, SortByNameMixin):
                 "name": "Templates",
                 "parent_id": None,
             }
-        return self._get_by_id(self.all_template_folders, folder_id)
+        try:
+            return self.template_folders_by_id[str(folder_id)]
+        except KeyError:
+            abort(404)
 
     def get_template_folder_path(self, template_folder_id):
         folder = self.get_template_folder(template_folder_id)
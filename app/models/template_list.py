@@ -1,6 +1,9 @@
+from collections import defaultdict
+
 from werkzeug.utils import cached_property
 
 from app import format_notification_type
+from app.models.service import Service
 
 
 class TemplateList:
@@ -60,20 +63,39 @@ class TemplateList:
     def get_templates(self, template_type="all", template_folder_id=None):
         if self.user and template_folder_id:
             folder = self.service.get_template_folder(template_folder_id)
-            if not self.user.has_template_folder_permission(folder):
+            if not self._has_template_folder_permission(folder):
                 return []
 
         if isinstance(template_type, str):
             template_type = [template_type]
         if template_folder_id:
             template_folder_id = str(template_folder_id)
+
+        templates_in_folder = self.service.templates_by_folder.get(
+            template_folder_id, {}
+        )
+        if "all" in template_type:
+            return list(templates_in_folder.get("all", []))
+        if len(template_type) == 1:
+            return list(templates_in_folder.get(template_type[0], []))
         return [
             template
-            for template in self.service.all_templates
-            if (set(template_type) & {"all", template["template_type"]})
-            and template.get("folder") == template_folder_id
+            for template in templates_in_folder.get("all", [])
+            if template["template_type"] in template_type
         ]
 
+    def _has_template_folder_permission(self, folder):
+        folder_id = folder["id"] if folder else None
+        if folder_id not in self._template_folder_permissions:
+            self._template_folder_permissions[folder_id] = (
+                self.user.has_template_folder_permission(folder, service=self.service)
+            )
+        return self._template_folder_permissions[folder_id]
+
+    @cached_property
+    def _template_folder_permissions(self):
+        return {}
+
     @cached_property
     def user_template_folders(self):
         """Returns a modified list of folders a user has permission to view
@@ -91,12 +113,10 @@ class TemplateList:
         """
         user_folders = []
         for folder in self.service.all_template_folders:
-            if not self.user.has_template_folder_permission(
-                folder, service=self.service
-            ):
+            if not self._has_template_folder_permission(folder):
                 continue
             parent = self.service.get_template_folder(folder["parent_id"])
-            if self.user.has_template_folder_permission(parent, service=self.service):
+            if self._has_template_folder_permission(parent):
                 user_folders.append(folder)
             else:
                 folder_attrs = {
@@ -115,46 +135,57 @@ class TemplateList:
                     else:
                         parent = self.service.get_template_folder(parent["parent_id"])
                         folder_attrs["parent_id"] = parent.get("id", None)
-                        if self.user.has_template_folder_permission(
-                            parent, service=self.service
-                        ):
+                        if self._has_template_folder_permission(parent):
                             break
                 user_folders.append(folder_attrs)
         return user_folders
 
-    def get_template_folders(self, template_type="all", parent_folder_id=None):
+    @cached_property
+    def _template_folders_by_parent(self):
         if self.user:
             folders = self.user_template_folders
         else:
             folders = self.service.all_template_folders
+
+        folders_by_parent = defaultdict(list)
+        for folder in folders:
+            folders_by_parent[folder["parent_id"]].append(folder)
+        return folders_by_parent
+
+    def get_template_folders(self, template_type="all", parent_folder_id=None):
         if parent_folder_id:
             parent_folder_id = str(parent_folder_id)
 
         return [
             folder
-            for folder in folders
-            if (
-                folder["parent_id"] == parent_folder_id
-                and self.is_folder_visible(folder["id"], template_type)
-            )
+            for folder in self._template_folders_by_parent.get(parent_folder_id, [])
+            if self.is_folder_visible(folder["id"], template_type)
         ]
 
+    @cached_property
+    def _folder_visibility(self):
+        return {}
+
     def is_folder_visible(self, template_folder_id, template_type="all"):
         if template_type == "all":
             return True
 
-        if self.get_templates(template_type, template_folder_id):
-            return True
-
-        if any(
-            self.is_folder_visible(child_folder["id"], template_type)
-            for child_folder in self.get_template_folders(
-                template_type, template_folder_id
+        # Visibility depends on every folder below this one, so remember the
+        # answer for each folder rather than walking the same subtree again
+        key = (
+            str(template_folder_id) if template_folder_id else template_folder_id,
+            template_type if isinstance(template_type, str) else tuple(template_type),
+        )
+        if key not in self._folder_visibility:
+            self._folder_visibility[key] = bool(
+                self.get_templates(template_type, template_folder_id)
+            ) or any(
+                self.is_folder_visible(child_folder["id"], template_type)
+                for child_folder in self.get_template_folders(
+                    template_type, template_folder_id
+                )
             )
-        ):
-            return True
-
-        return False
+        return self._folder_visibility[key]
 
     @property
     def as_id_and_name(self):
@@ -208,6 +239,10 @@ class TemplateLists:
             )
             return
 
+        # Each service's list is only built as the iteration reaches it, but
+        # fetch everything it will need up front in one go
+        Service.load_templates_and_folders(self.services)
+
         for service in self.services:
             yield from ServiceTemplateList(
                 service=service,
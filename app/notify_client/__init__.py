@@ -1,29 +1,192 @@
+import json
 import os
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-from flask import abort, current_app, has_request_context, request
+from flask import abort, current_app, g, has_app_context, has_request_context, request
 from flask_login import current_user
 from notifications_python_client import __version__
+from notifications_python_client.authentication import create_jwt_token
 from notifications_python_client.base import BaseAPIClient
+from notifications_python_client.errors import HTTPError
+from requests import Session
+from requests.adapters import HTTPAdapter
 
 from app.extensions import redis_client
+from app.notify_client.resilience import DEADLINE_KEY, api_resilience
 from notifications_utils.clients.redis import RequestCache
+from notifications_utils.request_timings import (
+    ENVIRON_KEY,
+    get_endpoint_template,
+    timer,
+)
 
 cache = RequestCache(redis_client)
 
 
+# How many API requests to have in flight at once when fetching the same kind of
+# data for many services
+MAX_CONCURRENT_REQUESTS = 8
+
+
 def _attach_current_user(data):
     return dict(created_by=current_user.id, **data)
 
 
+def _get_request_state():
+    """
+    What API calls need from the current request, to make them from a thread
+    which isn’t in it.
+    """
+    if not has_request_context():
+        return {}
+    return {
+        "request_id": request.request_id,
+        "span_id": request.span_id,
+        "api_deadline": request.environ.get(DEADLINE_KEY),
+        "request_timings": request.environ.get(ENVIRON_KEY),
+    }
+
+
+def _call_in_app_context(app, request_state, function, *args):
+    # Request contexts can’t be shared between threads, so each call gets an
+    # app context of its own, with the request’s state on `g`
+    with app.app_context():
+        for name, value in request_state.items():
+            setattr(g, name, value)
+        return function(*args)
+
+
+def get_many_cached(key_format, client_method, service_ids):
+    """
+    Calls a client method which is cached with `@cache.set(key_format)` once
+    for each service, returning a dict of responses keyed by service ID.
+
+    Responses already in Redis are read with a single MGET. The rest are fetched
+    from the API concurrently, rather than one service after another, and are
+    cached by `client_method` as usual.
+    """
+    service_ids = list(dict.fromkeys(service_ids))
+    cached = redis_client.get_many(
+        [key_format.format(service_id=service_id) for service_id in service_ids]
+    )
+    responses = {
+        service_id: json.loads(value)
+        for service_id, value in zip(service_ids, cached)
+        if value
+    }
+
+    misses = [service_id for service_id in service_ids if service_id not in responses]
+    client_method = partial(
+        _call_in_app_context,
+        current_app._get_current_object(),
+        _get_request_state(),
+        client_method,
+    )
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_REQUESTS) as executor:
+        responses.update(zip(misses, executor.map(client_method, misses)))
+
+    return responses
+
+
+class APISession(Session):
+    """
+    One session for every API client in a worker, so that they share a pool of
+    keep-alive connections to the API rather than each opening their own.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.pool_size = 10
+
+    def init_app(self, app):
+        self.pool_size = app.config["API_POOL_SIZE"]
+        self.reset()
+
+    def reset(self):
+        """
+        Drops every connection in the pool without closing it, for a forked
+        worker which mustn’t use the connections it inherited.
+        """
+        adapter = HTTPAdapter(pool_maxsize=self.pool_size)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    @property
+    def stats(self):
+        """
+        How many requests this worker has made, and how many of them reused a
+        connection rather than opening a new one.
+        """
+        pools = [
+            adapter.poolmanager.pools[key]
+            for adapter in set(self.adapters.values())
+            for key in adapter.poolmanager.pools.keys()
+        ]
+        requests = sum(pool.num_requests for pool in pools)
+        connections = sum(pool.num_connections for pool in pools)
+        return {
+            "pool_size": self.pool_size,
+            "requests": requests,
+            "new_connections": connections,
+            "reused_connections": requests - connections,
+            "reuse_rate": (
+                round((requests - connections) / requests, 3) if requests else None
+            ),
+        }
+
+
+api_session = APISession()
+
+
+class TokenCache:
+    """
+    Signs a token for each API key, and reuses it until it’s `max_age` seconds
+    old.
+    """
+
+    def __init__(self):
+        self._tokens = {}
+
+    def get(self, secret, client_id, max_age):
+        token, signed_at = self._tokens.get((secret, client_id), (None, None))
+        if token is None or time.monotonic() - signed_at >= max_age:
+            token, signed_at = create_jwt_token(secret, client_id), time.monotonic()
+            self._tokens[secret, client_id] = token, signed_at
+        return token
+
+
+api_tokens = TokenCache()
+
+
 class NotifyAdminAPIClient(BaseAPIClient):
     def __init__(self):
         super().__init__("a" * 73, "b")
+        self.token_max_age = 0
 
     def init_app(self, app):
         self.base_url = app.config["API_HOST_NAME"]
         self.service_id = app.config["ADMIN_CLIENT_USER_NAME"]
         self.api_key = app.config["ADMIN_CLIENT_SECRET"]
         self.route_secret = app.config["ROUTE_SECRET_KEY_1"]
+        self.token_max_age = app.config["API_TOKEN_MAX_AGE"]
+        self.timeout = (
+            app.config["API_CONNECT_TIMEOUT"],
+            app.config["API_READ_TIMEOUT"],
+        )
+        self.request_session = api_session
+
+    def _create_request_objects(self, url, data, params):
+        # Like `BaseAPIClient`, but not signing a new token for every request
+        api_token = api_tokens.get(self.api_key, self.service_id, self.token_max_age)
+        kwargs = {"headers": self.generate_headers(api_token), "timeout": self.timeout}
+        if data is not None:
+            kwargs.update(data=self._serialize_data(data))
+        if params is not None:
+            kwargs.update(params=params)
+        return urllib.parse.urljoin(str(self.base_url), str(url)), kwargs
 
     def generate_headers(self, api_token):
         headers = {
@@ -34,12 +197,32 @@ class NotifyAdminAPIClient(BaseAPIClient):
         }
         return self._add_request_id_header(headers)
 
+    def _perform_request(self, method, url, kwargs):
+        name = f"{method} {get_endpoint_template(url)}"
+        with timer("api", name) as outcome:
+            try:
+                response = api_resilience.call(
+                    name,
+                    method,
+                    url,
+                    partial(super()._perform_request, method, url),
+                    kwargs,
+                )
+            except HTTPError as error:
+                outcome["status"] = error.status_code
+                raise
+            outcome["status"] = response.status_code
+            return response
+
     @staticmethod
     def _add_request_id_header(headers):
-        if not has_request_context():
-            return headers
-        headers["X-B3-TraceId"] = request.request_id
-        headers["X-B3-SpanId"] = request.span_id
+        if has_request_context():
+            headers["X-B3-TraceId"] = request.request_id
+            headers["X-B3-SpanId"] = request.span_id
+        elif has_app_context() and "request_id" in g:
+            # Called from `get_many_cached`’s threads
+            headers["X-B3-TraceId"] = g.request_id
+            headers["X-B3-SpanId"] = g.span_id
         return headers
 
     def check_inactive_service(self):
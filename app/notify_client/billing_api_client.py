@@ -1,16 +1,105 @@
+import json
+from datetime import date, datetime, timedelta
+
+from app.extensions import redis_client
 from app.notify_client import NotifyAdminAPIClient
 
+# The API recalculates billing for the last few days every night, so a period
+# is only final once this long has passed since it ended
+SETTLEMENT_PERIOD = timedelta(days=4)
+
+CLOSED_PERIOD_TTL = int(timedelta(days=365).total_seconds())
+OPEN_PERIOD_TTL = int(timedelta(minutes=5).total_seconds())
+
+
+def is_closed_period(end_date):
+    return end_date < datetime.utcnow().date() - SETTLEMENT_PERIOD
+
+
+def split_into_months(start_date, end_date):
+    """
+    The first and last day of each calendar month which an inclusive date range
+    touches, so that whole months can be fetched and cached whatever range is
+    asked for.
+    """
+    month_start = start_date.replace(day=1)
+    while month_start <= end_date:
+        next_month = (month_start + timedelta(days=32)).replace(day=1)
+        yield month_start, next_month - timedelta(days=1)
+        month_start = next_month
+
+
+def _as_date(value):
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
 
 class BillingAPIClient(NotifyAdminAPIClient):
+    def _get_for_period(self, redis_key, period_end, url, params):
+        """
+        Billing data for a period which has closed will never change, so keep it
+        for a long time. The period we're in is only cached briefly.
+        """
+        cached = redis_client.get(redis_key)
+        if cached:
+            return json.loads(cached.decode("utf-8"))
+        api_response = self.get(url=url, params=params)
+        redis_client.set(
+            redis_key,
+            json.dumps(api_response),
+            ex=CLOSED_PERIOD_TTL if is_closed_period(period_end) else OPEN_PERIOD_TTL,
+        )
+        return api_response
+
+    def _get_report(self, report_name, url, start_date, end_date):
+        # Each row is a total for the whole range, so it can't be put together
+        # from months like the daily reports can
+        return self._get_for_period(
+            f"billing-report-{report_name}-{start_date}-{end_date}",
+            _as_date(end_date),
+            url=url,
+            params={
+                "start_date": str(start_date),
+                "end_date": str(end_date),
+            },
+        )
+
+    def _get_daily_report(self, report_name, url, start_date, end_date):
+        # Each row is a single day, so the report can be put together from whole
+        # months and cut down to the dates asked for. Only months which haven't
+        # closed are refetched
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        return [
+            row
+            for month_start, month_end in split_into_months(start_date, end_date)
+            for row in self._get_for_period(
+                f"billing-report-{report_name}-{month_start:%Y-%m}",
+                month_end,
+                url=url,
+                params={"start_date": str(month_start), "end_date": str(month_end)},
+            )
+            if start_date <= _as_date(row["day"]) <= end_date
+        ]
+
     def get_monthly_usage_for_service(self, service_id, year):
-        return self.get(
-            "/service/{0}/billing/monthly-usage".format(service_id),
+        return self._get_for_period(
+            f"service-{service_id}-monthly-usage-{year}",
+            date(int(year), 12, 31),
+            url="/service/{0}/billing/monthly-usage".format(service_id),
             params=dict(year=year),
         )
 
     def get_annual_usage_for_service(self, service_id, year=None):
-        return self.get(
-            "/service/{0}/billing/yearly-usage-summary".format(service_id),
+        if year is None:
+            return self.get(
+                "/service/{0}/billing/yearly-usage-summary".format(service_id),
+                params=dict(year=year),
+            )
+        return self._get_for_period(
+            f"service-{service_id}-yearly-usage-{year}",
+            date(int(year), 12, 31),
+            url="/service/{0}/billing/yearly-usage-summary".format(service_id),
             params=dict(year=year),
         )
 
@@ -30,45 +119,48 @@ class BillingAPIClient(NotifyAdminAPIClient):
             "free_sms_fragment_limit": free_sms_fragment_limit,
         }
 
-        return self.post(
+        response = self.post(
             url="/service/{0}/billing/free-sms-fragment-limit".format(service_id),
             data=data,
         )
+        # The allowance changes the cost of usage in the years it applies to
+        year = year or datetime.utcnow().year
+        redis_client.delete(
+            f"service-{service_id}-monthly-usage-{year}",
+            f"service-{service_id}-yearly-usage-{year}",
+        )
+        return response
 
     def get_data_for_billing_report(self, start_date, end_date):
-        return self.get(
-            url="/platform-stats/data-for-billing-report",
-            params={
-                "start_date": str(start_date),
-                "end_date": str(end_date),
-            },
+        return self._get_report(
+            "billing",
+            "/platform-stats/data-for-billing-report",
+            start_date,
+            end_date,
         )
 
     def get_data_for_volumes_by_service_report(self, start_date, end_date):
-        return self.get(
-            url="/platform-stats/volumes-by-service",
-            params={
-                "start_date": str(start_date),
-                "end_date": str(end_date),
-            },
+        return self._get_report(
+            "volumes-by-service",
+            "/platform-stats/volumes-by-service",
+            start_date,
+            end_date,
         )
 
     def get_data_for_daily_volumes_report(self, start_date, end_date):
-        return self.get(
-            url="/platform-stats/daily-volumes-report",
-            params={
-                "start_date": str(start_date),
-                "end_date": str(end_date),
-            },
+        return self._get_daily_report(
+            "daily-volumes",
+            "/platform-stats/daily-volumes-report",
+            start_date,
+            end_date,
         )
 
     def get_data_for_daily_sms_provider_volumes_report(self, start_date, end_date):
-        return self.get(
-            url="/platform-stats/daily-sms-provider-volumes-report",
-            params={
-                "start_date": str(start_date),
-                "end_date": str(end_date),
-            },
+        return self._get_daily_report(
+            "daily-sms-provider-volumes",
+            "/platform-stats/daily-sms-provider-volumes-report",
+            start_date,
+            end_date,
         )
 
 
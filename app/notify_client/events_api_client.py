@@ -1,3 +1,5 @@
+from notifications_python_client.base import BaseAPIClient
+
 from app.notify_client import NotifyAdminAPIClient
 
 
@@ -7,5 +9,12 @@ class EventsApiClient(NotifyAdminAPIClient):
         resp = self.post(url="/events", data=data)
         return resp["data"]
 
+    def create_queued_event(self, event_type, event_data):
+        # Sent from `event_queue`’s thread, outside of any request, so it can’t
+        # check the user and service – `event_queue` does that when it’s queued
+        data = {"event_type": event_type, "data": event_data}
+        resp = BaseAPIClient.post(self, url="/events", data=data)
+        return resp["data"]
+
 
 events_api_client = EventsApiClient()
@@ -0,0 +1,270 @@
+"""
+Stops a slow or failing API from tying up every worker.
+
+Each request has API_REQUEST_DEADLINE seconds for all of its API calls, and
+each call’s timeout is cut down to whatever’s left. A response which is streamed
+has already been sent with a 200 by the time it calls the API, so its calls
+aren’t held to the deadline, only their own timeouts. Calls to an endpoint which
+keeps failing fail straight away, or get the last response it gave if that’s
+recent enough, until it recovers. If API_HEDGE_AFTER is set, a GET which hasn’t
+been answered by then is sent again, and whichever answer comes back first is
+used.
+"""
+
+import json
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from threading import Lock
+from time import monotonic
+
+from flask import (
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    request_finished,
+    request_started,
+)
+from notifications_python_client.errors import HTTP503Error, HTTPError
+
+DEADLINE_KEY = "notify.api_deadline"
+
+
+class APIDeadlineExceeded(HTTP503Error):
+    pass
+
+
+class APICircuitOpen(HTTP503Error):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens once `failure_rate` of the calls to an endpoint in the last `window`
+    seconds have failed, if there have been at least `min_calls`. While it’s
+    open no calls are let through. After `cooldown` seconds it’s half open and
+    lets one call through: if that succeeds it closes, otherwise it opens again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name, logger, failure_rate, min_calls, window, cooldown):
+        self.name = name
+        self.logger = logger
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = None
+        self.calls = deque()
+        self.lock = Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if (
+                self.state == self.OPEN
+                and monotonic() - self.opened_at >= self.cooldown
+            ):
+                self._change_state(self.HALF_OPEN)
+                return True
+            return False
+
+    def record(self, failed):
+        now = monotonic()
+        with self.lock:
+            if self.state == self.HALF_OPEN:
+                self._change_state(self.OPEN if failed else self.CLOSED)
+                return
+            self.calls.append((now, failed))
+            while self.calls[0][0] < now - self.window:
+                self.calls.popleft()
+            failures = sum(failed for _, failed in self.calls)
+            if (
+                self.state == self.CLOSED
+                and len(self.calls) >= self.min_calls
+                and failures >= self.failure_rate * len(self.calls)
+            ):
+                self._change_state(self.OPEN)
+
+    def _change_state(self, state):
+        self.logger.warning("API circuit for %s is %s", self.name, state)
+        self.state = state
+        if state == self.OPEN:
+            self.opened_at = monotonic()
+        if state == self.CLOSED:
+            self.calls.clear()
+
+
+class StaleResponses:
+    """
+    The last response to the most recent `size` GET requests.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.responses = OrderedDict()
+        self.lock = Lock()
+
+    @staticmethod
+    def _key(url, params):
+        return url, json.dumps(params, sort_keys=True, default=str)
+
+    def save(self, url, params, response):
+        key = self._key(url, params)
+        with self.lock:
+            self.responses[key] = monotonic(), response
+            self.responses.move_to_end(key)
+            while len(self.responses) > self.size:
+                self.responses.popitem(last=False)
+
+    def get(self, url, params, max_age):
+        with self.lock:
+            saved_at, response = self.responses.get(
+                self._key(url, params), (None, None)
+            )
+        if response is None or monotonic() - saved_at > max_age:
+            return None
+        return response
+
+
+class APIResilience:
+    def __init__(self):
+        self.breakers = {}
+        self.events = Counter()
+        self.lock = Lock()
+        self.stale_responses = StaleResponses(0)
+        self._executor = None
+
+    def init_app(self, app):
+        self.logger = app.logger
+        self.deadline = app.config["API_REQUEST_DEADLINE"]
+        self.circuit_settings = {
+            "failure_rate": app.config["API_CIRCUIT_FAILURE_RATE"],
+            "min_calls": app.config["API_CIRCUIT_MIN_CALLS"],
+            "window": app.config["API_CIRCUIT_WINDOW"],
+            "cooldown": app.config["API_CIRCUIT_COOLDOWN"],
+        }
+        self.stale_max_age = app.config["API_STALE_MAX_AGE"]
+        self.stale_responses = StaleResponses(app.config["API_STALE_CACHE_SIZE"])
+        self.hedge_after = app.config["API_HEDGE_AFTER"]
+        self.hedge_workers = app.config["API_POOL_SIZE"]
+        request_started.connect(self._start_deadline, app)
+        request_finished.connect(self._end_deadline_if_streamed, app)
+
+    def _start_deadline(self, app, **extra):
+        request.environ[DEADLINE_KEY] = monotonic() + self.deadline
+
+    def _end_deadline_if_streamed(self, app, response, **extra):
+        # Running out of time part way through a streamed response would cut
+        # it short without an error
+        if response.is_streamed:
+            request.environ.pop(DEADLINE_KEY, None)
+
+    def _record_event(self, event, name):
+        with self.lock:
+            self.events[event, name] += 1
+
+    def get_breaker(self, name):
+        with self.lock:
+            if name not in self.breakers:
+                self.breakers[name] = CircuitBreaker(
+                    name, self.logger, **self.circuit_settings
+                )
+            return self.breakers[name]
+
+    def get_timeout(self, name, timeout):
+        """
+        Cuts `timeout` down to the time left before the current request’s
+        deadline, or fails if there’s none left.
+        """
+        if has_request_context():
+            deadline = request.environ.get(DEADLINE_KEY)
+        else:
+            # Threads making calls for a request put its deadline on `g`
+            deadline = g.get("api_deadline") if has_app_context() else None
+        if deadline is None:
+            return timeout
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            self._record_event("deadline_exceeded", name)
+            self.logger.warning("Ran out of time for API calls before %s", name)
+            raise APIDeadlineExceeded(message=f"Ran out of time before {name}")
+        if timeout is None:
+            return remaining
+        if isinstance(timeout, tuple):
+            return tuple(min(part, remaining) for part in timeout)
+        return min(timeout, remaining)
+
+    def call(self, name, method, url, send, kwargs):
+        """
+        Calls `send` with `kwargs`, unless the circuit for `name` is open.
+        """
+        kwargs = {**kwargs, "timeout": self.get_timeout(name, kwargs.get("timeout"))}
+        params = kwargs.get("params")
+        breaker = self.get_breaker(name)
+        if not breaker.allow():
+            response = self.stale_responses.get(url, params, self.stale_max_age)
+            if method == "GET" and response is not None:
+                self._record_event("stale_response", name)
+                return response
+            self._record_event("circuit_open", name)
+            raise APICircuitOpen(message=f"Not calling {name} while it’s failing")
+
+        failed = True
+        try:
+            if method == "GET" and self.hedge_after:
+                response = self._hedge(name, send, kwargs)
+            else:
+                response = send(kwargs)
+            failed = False
+        except HTTPError as error:
+            failed = error.status_code >= 500
+            raise
+        finally:
+            breaker.record(failed)
+
+        if method == "GET":
+            self.stale_responses.save(url, params, response)
+        return response
+
+    def _hedge(self, name, send, kwargs):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.hedge_workers)
+        futures = [self._executor.submit(send, kwargs)]
+        done, _ = wait(futures, timeout=self.hedge_after)
+        if not done:
+            self._record_event("hedged", name)
+            futures.append(self._executor.submit(send, kwargs))
+        unanswered = len(futures)
+        for future in as_completed(futures):
+            unanswered -= 1
+            try:
+                return future.result()
+            except HTTPError as error:
+                # Only a server error is worth waiting for the other answer
+                if error.status_code < 500 or not unanswered:
+                    raise
+
+    @property
+    def stats(self):
+        with self.lock:
+            breakers = list(self.breakers.values())
+            events = list(self.events.items())
+        stats = {
+            "circuits": {breaker.name: breaker.state for breaker in breakers},
+            "deadline_exceeded": {},
+            "circuit_open": {},
+            "stale_response": {},
+            "hedged": {},
+        }
+        for (event, name), count in events:
+            stats[event][name] = count
+        return stats
+
+
+api_resilience = APIResilience()
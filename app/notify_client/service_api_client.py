@@ -1,7 +1,13 @@
+import json
 from datetime import datetime, timezone
 
 from app.extensions import redis_client
-from app.notify_client import NotifyAdminAPIClient, _attach_current_user, cache
+from app.notify_client import (
+    NotifyAdminAPIClient,
+    _attach_current_user,
+    cache,
+    get_many_cached,
+)
 
 
 class ServiceAPIClient(NotifyAdminAPIClient):
@@ -71,6 +77,34 @@ class ServiceAPIClient(NotifyAdminAPIClient):
         """
         return self.get("/service", params=params_dict)
 
+    def get_service_names(self, service_ids):
+        """
+        Look up the names of many services at once, as a dict keyed by service ID.
+
+        Services already cached by `get_service` are read from Redis in one MGET.
+        If any are missing, every service is fetched with a single API call
+        rather than one call per missing service.
+        """
+        service_ids = list(dict.fromkeys(service_ids))
+        cached = redis_client.get_many(
+            [f"service-{service_id}" for service_id in service_ids]
+        )
+        names = {
+            service_id: json.loads(value)["data"]["name"]
+            for service_id, value in zip(service_ids, cached)
+            if value
+        }
+
+        wanted = set(service_ids) - names.keys()
+        if wanted:
+            names.update(
+                (service["id"], service["name"])
+                for service in self.get_services()["data"]
+                if service["id"] in wanted
+            )
+
+        return names
+
     def find_services_by_name(self, service_name):
         return self.get(
             "/service/find-services-by-name", params={"service_name": service_name}
@@ -282,6 +316,15 @@ class ServiceAPIClient(NotifyAdminAPIClient):
         )
         return self.get(endpoint)
 
+    def get_service_templates_for_services(self, service_ids):
+        """
+        Retrieve all templates for many services at once, as a dict keyed by
+        service ID.
+        """
+        return get_many_cached(
+            "service-{service_id}-templates", self.get_service_templates, service_ids
+        )
+
     # This doesn’t need caching because it calls through to a method which is cached
     def count_service_templates(self, service_id, template_type=None):
         return len(
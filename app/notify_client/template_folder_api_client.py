@@ -1,5 +1,5 @@
 from app.extensions import redis_client
-from app.notify_client import NotifyAdminAPIClient, cache
+from app.notify_client import NotifyAdminAPIClient, cache, get_many_cached
 
 
 class TemplateFolderAPIClient(NotifyAdminAPIClient):
@@ -16,6 +16,13 @@ class TemplateFolderAPIClient(NotifyAdminAPIClient):
             "template_folders"
         ]
 
+    def get_template_folders_for_services(self, service_ids):
+        return get_many_cached(
+            "service-{service_id}-template-folders",
+            self.get_template_folders,
+            service_ids,
+        )
+
     def get_template_folder(self, service_id, folder_id):
         if folder_id is None:
             return {
@@ -5,6 +5,8 @@ from boto3 import Session
 from botocore.config import Config
 from flask import current_app
 
+from notifications_utils.request_timings import timed
+
 AWS_CLIENT_CONFIG = Config(
     # This config is required to enable S3 to connect to FIPS-enabled
     # endpoints.  See https://aws.amazon.com/compliance/fips/ for more
@@ -48,6 +50,7 @@ def get_s3_object(
     return obj
 
 
+@timed("s3")
 def get_s3_metadata(obj):
     try:
         return obj.get()["Metadata"]
@@ -58,6 +61,7 @@ def get_s3_metadata(obj):
         raise client_error
 
 
+@timed("s3")
 def set_s3_metadata(obj, **kwargs):
     copy_from_object_result = obj.copy_from(
         CopySource=f"{obj.bucket_name}/{obj.key}",
@@ -68,6 +72,7 @@ def set_s3_metadata(obj, **kwargs):
     return copy_from_object_result
 
 
+@timed("s3")
 def get_s3_contents(obj):
     contents = ""
     try:
@@ -28,7 +28,7 @@ def get_csv_upload(service_id, upload_id):
     return get_s3_object(*get_csv_location(service_id, upload_id))
 
 
-def s3upload(service_id, filedata):
+def s3upload(service_id, filedata, metadata=None):
 
     upload_id = str(uuid.uuid4())
     bucket_name, file_location, access_key, secret_key, region = get_csv_location(
@@ -47,6 +47,9 @@ def s3upload(service_id, filedata):
         region=region,
         bucket_name=bucket_name,
         file_location=file_location,
+        metadata=(
+            {key: str(value) for key, value in metadata.items()} if metadata else None
+        ),
         access_key=access_key,
         secret_key=secret_key,
     )
@@ -4,6 +4,7 @@ from boto3 import Session
 from flask import current_app
 
 from app.s3_client import get_s3_object
+from notifications_utils.request_timings import timed, timer
 from notifications_utils.s3 import s3upload as utils_s3upload
 
 TEMP_TAG = "temp-{user_id}_"
@@ -24,6 +25,7 @@ def bucket_creds(key):
     return current_app.config["LOGO_UPLOAD_BUCKET"][key]
 
 
+@timed("s3")
 def delete_s3_object(filename):
     get_s3_object(*get_logo_location(filename)).delete()
 
@@ -32,9 +34,10 @@ def persist_logo(old_name, new_name):
     if old_name == new_name:
         return
     bucket_name, filename, access_key, secret_key, region = get_logo_location(new_name)
-    get_s3_object(bucket_name, filename, access_key, secret_key, region).copy_from(
-        CopySource="{}/{}".format(bucket_name, old_name)
-    )
+    with timer("s3", "persist_logo"):
+        get_s3_object(bucket_name, filename, access_key, secret_key, region).copy_from(
+            CopySource="{}/{}".format(bucket_name, old_name)
+        )
     delete_s3_object(old_name)
 
 
@@ -1,6 +1,6 @@
 from datetime import datetime
-from functools import reduce
 
+import numpy as np
 import pytz
 from dateutil import parser
 
@@ -20,10 +20,12 @@ def sum_of_statistics(delivery_statistics):
     if not delivery_statistics or not delivery_statistics[0]:
         return {key: 0 for key in statistics_keys}
 
-    return reduce(
-        lambda x, y: {key: x.get(key, 0) + y.get(key, 0) for key in statistics_keys},
-        delivery_statistics,
-    )
+    totals = np.array(
+        [[row.get(key, 0) for key in statistics_keys] for row in delivery_statistics],
+        dtype=np.int64,
+    ).sum(axis=0)
+
+    return {key: int(total) for key, total in zip(statistics_keys, totals)}
 
 
 def add_rates_to(delivery_statistics):
@@ -80,3 +82,98 @@ def statistics_by_state(statistics):
             "failed": statistics["emails_failed"],
         },
     }
+
+
+class ServicesStatistics:
+    """
+    The notification counts for many services, read out of the API’s nested
+    dicts once and kept as arrays so that totals, filtering and sorting don’t
+    need to loop over every service in Python again.
+    """
+
+    NOTIFICATION_TYPES = ("sms", "email")
+    STATUSES = ("delivered", "failed", "requested")
+
+    def __init__(self, services):
+        self.services = list(services)
+        self.counts = np.fromiter(
+            self._get_counts(),
+            dtype=np.int64,
+            count=len(self.services)
+            * len(self.NOTIFICATION_TYPES)
+            * len(self.STATUSES),
+        ).reshape(-1, len(self.NOTIFICATION_TYPES), len(self.STATUSES))
+        self.requested = np.fromiter(
+            (
+                sum(stats["requested"] for stats in service["statistics"].values())
+                for service in self.services
+            ),
+            dtype=np.int64,
+            count=len(self.services),
+        )
+        self.active = np.fromiter(
+            (service["active"] for service in self.services),
+            dtype=bool,
+            count=len(self.services),
+        )
+        self.restricted = np.fromiter(
+            (service["restricted"] for service in self.services),
+            dtype=bool,
+            count=len(self.services),
+        )
+        self.created_at = np.array(
+            [service["created_at"] for service in self.services], dtype=str
+        )
+
+    def _get_counts(self):
+        # One row per service, then one per notification type, then one column
+        # per status, in the order of `STATUSES`
+        for service in self.services:
+            for notification_type in self.NOTIFICATION_TYPES:
+                statistics = service["statistics"][notification_type]
+                yield statistics["delivered"]
+                # Issue #1323. The back end is now sending 'failure' instead of
+                # 'failed'.  Adjust it here, but keep it flexible in case
+                # the backend reverts to 'failed'.
+                failure = statistics.get("failure")
+                yield statistics["failed"] if failure is None else failure
+                yield statistics["requested"]
+
+    def _take(self, indexes):
+        taken = object.__new__(type(self))
+        taken.services = [self.services[index] for index in indexes]
+        for name in ("counts", "requested", "active", "restricted", "created_at"):
+            setattr(taken, name, getattr(self, name)[indexes])
+        return taken
+
+    def filter_and_sort(self, trial_mode_services=False):
+        """
+        Keeps only live or only trial mode services, with active services
+        first, then the most used, then the most recently created.
+        """
+        _, created_at_order = np.unique(self.created_at, return_inverse=True)
+        # lexsort is stable and sorts by the last key first. Negating the keys
+        # puts the biggest first while keeping ties in their original order.
+        order = np.lexsort(
+            (
+                -created_at_order,
+                -self.requested,
+                -self.active.astype(np.int64),
+            )
+        )
+        return self._take(order[self.restricted[order] == trial_mode_services])
+
+    @property
+    def global_stats(self):
+        totals = self.counts.sum(axis=0)
+        stats = {}
+        for type_index, notification_type in enumerate(self.NOTIFICATION_TYPES):
+            stat = {
+                status: int(totals[type_index][status_index])
+                for status_index, status in enumerate(self.STATUSES)
+            }
+            stat["failure_rate"] = get_formatted_percentage(
+                stat["failed"], stat["requested"]
+            )
+            stats[notification_type] = stat
+        return stats
@@ -7,7 +7,12 @@ from redis import RedisError
 
 from app import status_api_client, version
 from app.extensions import redis_client
+from app.notify_client import api_session
+from app.notify_client.resilience import api_resilience
 from app.status import status
+from app.utils.event_queue import event_queue
+from app.utils.render_cache import fragment_cache, preview_cache
+from notifications_utils.request_timings import latency_histograms
 
 
 @status.route("/_status", methods=["GET"])
@@ -83,3 +88,32 @@ def show_redis_status():
             ),
             500,
         )
+
+
+@status.route("/_status/caches", methods=["GET"])
+def show_cache_status():
+    return (
+        jsonify(
+            preview=preview_cache.stats,
+            fragments=fragment_cache.stats,
+            redis=redis_client.circuit.stats,
+        ),
+        200,
+    )
+
+
+@status.route("/_status/timings", methods=["GET"])
+def show_request_timings():
+    return jsonify(latency_histograms.stats), 200
+
+
+@status.route("/_status/api-connections", methods=["GET"])
+def show_api_connection_status():
+    return (
+        jsonify(
+            connections=api_session.stats,
+            events=event_queue.stats,
+            **api_resilience.stats,
+        ),
+        200,
+    )
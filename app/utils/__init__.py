@@ -1,12 +1,13 @@
 from functools import wraps
 from itertools import chain
 
-from flask import abort, g, make_response, request
+from flask import abort, g, jsonify, make_response, request
 from flask_login import current_user
 from ordered_set import OrderedSet
 from werkzeug.datastructures import MultiDict
 from werkzeug.routing import RequestRedirect
 
+from app.utils.render_cache import digest
 from notifications_utils.field import Field
 
 SENDING_STATUSES = ["created", "pending", "sending"]
@@ -118,6 +119,28 @@ def hide_from_search_engines(f):
     return decorated_function
 
 
+def conditional_json_response(fingerprint, get_json):
+    """
+    For JSON endpoints which pages poll for updates. `fingerprint` should be
+    cheap to get and change whenever the response would. If the browser already
+    has the response for this fingerprint it gets a `304 Not Modified` and
+    `get_json` is never called, so nothing needs rendering.
+    """
+    if request.method != "GET":
+        return jsonify(get_json())
+
+    etag = digest(fingerprint)
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        response = jsonify(get_json())
+    response.set_etag(etag)
+    # Browsers can keep the response but must check it’s current every time
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
 # Function used for debugging.
 # Do print(hilite(message)) while debugging, then remove your print statements
 def hilite(message):
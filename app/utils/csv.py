@@ -1,7 +1,9 @@
+import csv
 import datetime
+from io import StringIO
 
 import pytz
-from flask import current_app, json
+from flask import Response, current_app, json
 from flask_login import current_user
 
 from app.models.spreadsheet import Spreadsheet
@@ -64,6 +66,69 @@ def get_errors_for_csv(recipients, template_type):
     return errors
 
 
+def stream_csv(rows):
+    """
+    Yields each row as a line of CSV as soon as it's available, so a response can
+    be sent in chunks rather than building the whole file in memory first.
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+class CSVReport:
+    """
+    A CSV report, described by its columns so the file can be streamed out one
+    row at a time.
+
+    Every row is worked out before the response is returned, so that a result
+    which can’t be turned into a row is an error rather than a file which
+    stops part way through.
+
+    Each column is a `(heading, value)` pair, where `value` is either a key (or
+    index) to look up in each result, or a function which takes the result and
+    returns what to put in the cell:
+
+        report = CSVReport(
+            ("Service ID", "service_id"),
+            ("Service name", lambda result: result["name"].strip()),
+        )
+
+        return report.response(results, filename="Services.csv")
+    """
+
+    def __init__(self, *columns):
+        self.columns = columns
+
+    @property
+    def headers(self):
+        return [heading for heading, _ in self.columns]
+
+    def get_row(self, result):
+        return [
+            value(result) if callable(value) else result[value]
+            for _, value in self.columns
+        ]
+
+    def rows(self, results):
+        yield self.headers
+        for result in results:
+            yield self.get_row(result)
+
+    def response(self, results, filename, disposition="attachment"):
+        return Response(
+            stream_csv(list(self.rows(results))),
+            headers={
+                "Content-Type": "text/csv; charset=utf-8",
+                "Content-Disposition": f'{disposition}; filename="{filename}"',
+            },
+        )
+
+
 def generate_notifications_csv(**kwargs):
     from app import notification_api_client
     from app.s3_client.s3_csv_client import s3download
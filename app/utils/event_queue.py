@@ -0,0 +1,169 @@
+"""
+Sends audit events to the API from a background thread, so that signing in or
+changing a user’s permissions doesn’t wait for the API to record it.
+"""
+
+import atexit
+import os
+import time
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+
+from notifications_python_client.errors import HTTPError
+
+from app.notify_client.events_api_client import events_api_client
+
+# Put on the queue to tell the thread to stop once it’s sent everything before it
+_STOP = object()
+
+
+class EventQueue:
+    """
+    Queues events for a background thread, which sends up to `batch_size` of
+    them at a time, one after another over the same connection. Events which
+    fail with a server error are tried again, waiting `retry_backoff` seconds
+    and then twice as long each time, up to `max_attempts` times. Events still
+    waiting when the process exits are sent if that takes less than
+    `flush_timeout` seconds.
+
+    If `maxsize` events are already waiting, more are dropped. A `maxsize` of
+    0 sends events straight away instead.
+
+    Under gunicorn’s eventlet workers the thread is green.
+    """
+
+    DEFAULT_MAXSIZE = 1000
+    DEFAULT_BATCH_SIZE = 20
+    DEFAULT_MAX_ATTEMPTS = 5
+    DEFAULT_RETRY_BACKOFF = 0.5
+    DEFAULT_FLUSH_TIMEOUT = 5
+
+    def __init__(self):
+        self.lock = Lock()
+        self.maxsize = 0
+        self.queue = Queue()
+        self.counts = dict.fromkeys(("sent", "retried", "failed", "dropped"), 0)
+        self._thread = None
+        self._pid = None
+        atexit.register(self.stop)
+
+    def init_app(self, app):
+        self._app = app
+        self.logger = app.logger
+        self.maxsize = app.config.get("EVENT_QUEUE_SIZE", self.DEFAULT_MAXSIZE)
+        self.batch_size = app.config.get("EVENT_BATCH_SIZE", self.DEFAULT_BATCH_SIZE)
+        self.max_attempts = app.config.get(
+            "EVENT_MAX_ATTEMPTS", self.DEFAULT_MAX_ATTEMPTS
+        )
+        self.retry_backoff = app.config.get(
+            "EVENT_RETRY_BACKOFF", self.DEFAULT_RETRY_BACKOFF
+        )
+        self.flush_timeout = app.config.get(
+            "EVENT_FLUSH_TIMEOUT", self.DEFAULT_FLUSH_TIMEOUT
+        )
+
+    def _count(self, outcome):
+        with self.lock:
+            self.counts[outcome] += 1
+
+    def put(self, event_type, event_data):
+        if not self.maxsize:
+            events_api_client.create_event(event_type, event_data)
+            return
+        # The background thread isn’t in this request, so check it’s allowed
+        # to change the service now
+        events_api_client.check_inactive_service()
+        with self.lock:
+            # A forked process doesn’t get the background thread, so needs to
+            # start its own
+            if self._pid != os.getpid():
+                self._start()
+        try:
+            self.queue.put_nowait((event_type, event_data))
+        except Full:
+            self._count("dropped")
+            self.logger.error(
+                "Dropped %s event because %s are waiting to be sent",
+                event_type,
+                self.maxsize,
+            )
+
+    def _start(self):
+        # Callers hold `self.lock`
+        self.queue = Queue(self.maxsize)
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._pid = os.getpid()
+
+    def _get_batch(self):
+        batch = [self.queue.get()]
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            try:
+                batch.append(self.queue.get_nowait())
+            except Empty:
+                break
+        return batch
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                batch = self._get_batch()
+                for event in batch:
+                    if event is not _STOP:
+                        self._send(*event)
+                if batch[-1] is _STOP:
+                    return
+
+    def _send(self, event_type, event_data):
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                events_api_client.create_queued_event(event_type, event_data)
+            except Exception as error:
+                # Connection errors come back as 503s
+                if (
+                    isinstance(error, HTTPError)
+                    and error.status_code >= 500
+                    and attempt < self.max_attempts
+                ):
+                    self.logger.warning(
+                        "Error sending %s event, attempt %s of %s",
+                        event_type,
+                        attempt,
+                        self.max_attempts,
+                    )
+                    self._count("retried")
+                    time.sleep(self.retry_backoff * 2 ** (attempt - 1))
+                    continue
+                self._count("failed")
+                self.logger.exception("Gave up sending %s event", event_type)
+                return
+            self._count("sent")
+            return
+
+    def stop(self):
+        """
+        Sends any events still waiting.
+        """
+        with self.lock:
+            if self._thread is None or self._pid != os.getpid():
+                return
+            thread, self._thread, self._pid = self._thread, None, None
+        try:
+            self.queue.put(_STOP, timeout=self.flush_timeout)
+        except Full:
+            pass
+        thread.join(self.flush_timeout)
+        if thread.is_alive():
+            self.logger.error("Exited with %s events not sent", self.queue.qsize())
+
+    @property
+    def stats(self):
+        with self.lock:
+            return {
+                "waiting": self.queue.qsize(),
+                "maxsize": self.maxsize,
+                **self.counts,
+            }
+
+
+event_queue = EventQueue()
@@ -0,0 +1,90 @@
+import hashlib
+import os
+import stat
+import time
+
+import click
+import jinja2
+
+from app.utils.govuk_frontend_jinja import templates as govuk_frontend_templates
+
+TEMPLATE_EXTENSIONS = ("html", "njk", "jinja2")
+
+
+def _get_compiler_version():
+    # Bytecode is only checked against the template source, but what
+    # govuk-frontend templates compile to also depends on how we convert them
+    # from Nunjucks, and on the version of Jinja doing the compiling
+    with open(govuk_frontend_templates.__file__, "rb") as converter:
+        converter_digest = hashlib.sha1(converter.read()).hexdigest()[:12]
+    return f"{jinja2.__version__}-{converter_digest}"
+
+
+def get_bytecode_cache(directory):
+    """
+    A bytecode cache in `directory` which every worker on the same filesystem can
+    share, or `None` if `directory` isn’t set.
+
+    Anyone who can write to the cache can run code in the app, so `directory`
+    is refused unless it belongs to this user and no one else can use it.
+    """
+    if not directory:
+        return None
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    status = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(status.st_mode)
+        or status.st_uid != os.getuid()
+        or stat.S_IMODE(status.st_mode) & 0o077
+    ):
+        raise RuntimeError(
+            f"Not using {directory} for compiled templates because other users "
+            "can change it"
+        )
+    return jinja2.FileSystemBytecodeCache(
+        directory, pattern=f"__jinja2_{_get_compiler_version()}_%s.cache"
+    )
+
+
+def compile_templates(environment, logger=None):
+    """
+    Loads every template the environment can find, which compiles them into
+    its bytecode cache (if it has one) and its in-memory cache.
+
+    Returns how many templates were compiled.
+    """
+    names = environment.list_templates(extensions=TEMPLATE_EXTENSIONS)
+    for name in names:
+        try:
+            environment.get_template(name)
+        except jinja2.TemplateError:
+            if logger is None:
+                raise
+            logger.exception("Error compiling template %s", name)
+    return len(names)
+
+
+def init_jinja_cache(application, *environments):
+    bytecode_cache = get_bytecode_cache(
+        application.config.get("JINJA_BYTECODE_CACHE_DIR")
+    )
+    for environment in environments:
+        environment.bytecode_cache = bytecode_cache
+
+    @application.cli.command("compile-templates")
+    def compile_templates_command():
+        """Compile every template into JINJA_BYTECODE_CACHE_DIR."""
+        if bytecode_cache is None:
+            raise click.ClickException("JINJA_BYTECODE_CACHE_DIR is not set")
+        compiled = sum(compile_templates(environment) for environment in environments)
+        click.echo(f"Compiled {compiled} templates into {bytecode_cache.directory}")
+
+    if application.config.get("JINJA_WARM_UP"):
+        start = time.perf_counter()
+        compiled = sum(
+            compile_templates(environment, logger=application.logger)
+            for environment in environments
+        )
+        application.logger.info(
+            "Compiled %s templates in %.2fs", compiled, time.perf_counter() - start
+        )
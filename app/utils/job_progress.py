@@ -0,0 +1,194 @@
+import json
+import time
+from queue import Empty, Queue
+from threading import Lock, Thread
+
+from flask import current_app
+
+from app.models.job import Job
+from app.notify_client.job_api_client import job_api_client
+
+
+def get_job_progress(job):
+    return {
+        "status": job.status,
+        # Keyed by the `status` query parameter each count links to
+        "counts": {
+            "": job.notification_count,
+            "pending": job.notifications_sending,
+            "delivered": job.notifications_delivered,
+            "failed": job.notifications_failed,
+        },
+        "finished": job.cancelled
+        or (job.status == "finished" and not job.notifications_sending),
+    }
+
+
+def get_progress_delta(previous, progress):
+    if previous is None:
+        return progress
+    delta = {
+        key: value
+        for key, value in progress.items()
+        if key != "counts" and previous.get(key) != value
+    }
+    counts = {
+        key: count
+        for key, count in progress["counts"].items()
+        if previous["counts"].get(key) != count
+    }
+    if counts:
+        delta["counts"] = counts
+    return delta
+
+
+class JobProgressPoller:
+    """
+    Gets one job from the API every `interval` seconds for as long as anyone is
+    subscribed, and passes what’s changed on to every subscriber.
+    """
+
+    def __init__(self, app, job_progress, service_id, job_id):
+        self.job_progress = job_progress
+        self.key = (str(service_id), str(job_id))
+        self.subscribers = set()
+        self.latest = None
+        self._app = app
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def subscribe(self):
+        # Callers hold `job_progress.lock`, which `_run` also takes before
+        # changing `latest` or stopping
+        queue = Queue()
+        self.subscribers.add(queue)
+        if self.latest is not None:
+            queue.put(("progress", self.latest))
+        return queue
+
+    def _publish(self, event, data):
+        for queue in self.subscribers:
+            queue.put((event, data))
+
+    def _run(self):
+        with self._app.app_context():
+            while True:
+                with self.job_progress.lock:
+                    if not self.subscribers:
+                        self.job_progress.remove(self)
+                        return
+                try:
+                    job = Job(job_api_client.get_job(*self.key)["data"])
+                    progress = get_job_progress(job)
+                except Exception:
+                    current_app.logger.exception(
+                        "Error getting progress of job %s", self.key[1]
+                    )
+                    progress = None
+
+                with self.job_progress.lock:
+                    if progress is None:
+                        # Viewers go back to polling the page for updates
+                        self._publish("fallback", {})
+                        self.job_progress.remove(self)
+                        return
+                    delta = get_progress_delta(self.latest, progress)
+                    self.latest = progress
+                    if delta:
+                        self._publish("progress", delta)
+                    if progress["finished"]:
+                        self._publish("end", progress)
+                        self.job_progress.remove(self)
+                        return
+
+                time.sleep(self.job_progress.interval)
+
+
+class JobProgress:
+    """
+    Pushes the counts and status of jobs to browsers as server-sent events.
+
+    However many people are watching a job, each worker only has one poller
+    getting it from the API. The stream ends when the job has finished.
+    """
+
+    DEFAULT_INTERVAL = 2
+    DEFAULT_KEEP_ALIVE = 15
+    DEFAULT_MAX_DURATION = 60 * 60
+
+    def __init__(self):
+        self.lock = Lock()
+        self.pollers = {}
+        self.interval = self.DEFAULT_INTERVAL
+        self.keep_alive = self.DEFAULT_KEEP_ALIVE
+        self.max_duration = self.DEFAULT_MAX_DURATION
+
+    def init_app(self, app):
+        self.interval = app.config.get(
+            "JOB_PROGRESS_POLL_INTERVAL", self.DEFAULT_INTERVAL
+        )
+        self.keep_alive = app.config.get(
+            "JOB_PROGRESS_KEEP_ALIVE", self.DEFAULT_KEEP_ALIVE
+        )
+        self.max_duration = app.config.get(
+            "JOB_PROGRESS_MAX_DURATION", self.DEFAULT_MAX_DURATION
+        )
+
+    def subscribe(self, app, service_id, job_id):
+        key = (str(service_id), str(job_id))
+        with self.lock:
+            poller = self.pollers.get(key)
+            if poller is None:
+                poller = self.pollers[key] = JobProgressPoller(app, self, *key)
+                poller.start()
+            return poller, poller.subscribe()
+
+    def unsubscribe(self, poller, queue):
+        with self.lock:
+            poller.subscribers.discard(queue)
+
+    def remove(self, poller):
+        # Callers hold `self.lock`
+        if self.pollers.get(poller.key) is poller:
+            del self.pollers[poller.key]
+
+    def stream(self, service_id, job_id):
+        # Responses are streamed after the request has finished, so get hold
+        # of the app while there is still one to get
+        return self._stream(current_app._get_current_object(), service_id, job_id)
+
+    def _stream(self, app, service_id, job_id):
+        poller, queue = self.subscribe(app, service_id, job_id)
+        try:
+            # Tell browsers how long to wait before reconnecting if the
+            # stream is cut off
+            yield "retry: {}\n\n".format(int(self.interval * 1000))
+            deadline = time.monotonic() + self.max_duration
+            while time.monotonic() < deadline:
+                try:
+                    event, data = queue.get(timeout=self.keep_alive)
+                except Empty:
+                    # Comments are ignored by browsers, but find out if they’ve
+                    # gone away
+                    yield ": keep-alive\n\n"
+                    continue
+                yield "event: {}\ndata: {}\n\n".format(event, json.dumps(data))
+                if event in ("end", "fallback"):
+                    return
+        finally:
+            self.unsubscribe(poller, queue)
+
+    @property
+    def stats(self):
+        with self.lock:
+            return {
+                "jobs": len(self.pollers),
+                "subscribers": sum(
+                    len(poller.subscribers) for poller in self.pollers.values()
+                ),
+            }
+
+
+job_progress = JobProgress()
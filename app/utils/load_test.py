@@ -0,0 +1,310 @@
+"""
+Sends lots of one-off messages the way a user would, to find out how many we
+can send and which stage of sending them takes the time.
+"""
+
+import json
+import math
+import time
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from threading import Lock, Thread
+
+import click
+from flask import current_app, session
+from flask.globals import request_ctx
+from flask_login import login_user
+
+from app.extensions import redis_client
+from app.models.service import Service
+
+# In the order each message goes through them
+STAGES = ("check", "upload", "create_job")
+
+# How often to save progress, so anyone watching can see it
+SAVE_EVERY = 25
+
+
+def get_simulated_recipients(numbers):
+    """
+    Placeholders for the example text message template, sending to the
+    simulated success and failure numbers in turn.
+    """
+    return [
+        {"day of week": "Monday", "color": "blue", "phone number": numbers[0]},
+        {"day of week": "Wednesday", "color": "orange", "phone number": numbers[1]},
+    ]
+
+
+def get_percentiles(durations):
+    if not durations:
+        return {"count": 0}
+    durations = sorted(durations)
+
+    def percentile(fraction):
+        # Nearest rank
+        return round(durations[math.ceil(fraction * len(durations)) - 1] * 1000, 1)
+
+    return {
+        "count": len(durations),
+        "mean_ms": round(sum(durations) * 1000 / len(durations), 1),
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": round(durations[-1] * 1000, 1),
+    }
+
+
+class LoadTest:
+    """
+    Sends `message_count` one-off messages as `user`, with up to `concurrency`
+    in flight at once and starting at most `rate` a second (or as fast as
+    possible if `rate` is 0).
+
+    Under gunicorn’s eventlet workers threads are green, so this doesn’t need
+    a real thread for each message in flight.
+    """
+
+    def __init__(
+        self,
+        app,
+        user,
+        service,
+        template_id,
+        recipients,
+        message_count,
+        concurrency,
+        rate=0,
+    ):
+        self.id = str(uuid.uuid4())
+        self.service_id = service["id"]
+        self.template_id = template_id
+        self.message_count = message_count
+        self.concurrency = concurrency
+        self.rate = rate
+        self.status = "running"
+        self.durations = {stage: [] for stage in (*STAGES, "total")}
+        self.errors = Counter()
+        self._app = app
+        self._user = user
+        self._service = service
+        self._recipients = recipients
+        self._session = None
+        self._start = None
+        self._finish = None
+        self._lock = Lock()
+
+    def _sign_in(self):
+        # Once, like a user would, rather than recording a sign-in for every
+        # message
+        with self._app.test_request_context():
+            login_user(self._user)
+            self._session = dict(session)
+
+    @contextmanager
+    def _request_context(self):
+        # Sending uses the current user and service, like it would in a request,
+        # with the user loaded from the session the sign-in gave
+        with self._app.test_request_context():
+            session.update(self._session)
+            request_ctx.service = Service(self._service)
+            yield
+
+    def run(self):
+        self._sign_in()
+        self._start = time.monotonic()
+        self.save()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            for index in range(self.message_count):
+                if self.rate:
+                    delay = self._start + index / self.rate - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+                executor.submit(self._send, index)
+        self._finish = time.monotonic()
+        self.status = "finished"
+        self.save()
+        return self.results
+
+    def _send(self, index):
+        # Imported here because the views import this module
+        from app.main.views.send import (
+            _check_one_off_notification,
+            _create_one_off_job,
+            _upload_one_off,
+        )
+
+        placeholders = self._recipients[index % len(self._recipients)]
+        durations = {}
+        stage = STAGES[0]
+        try:
+            with self._request_context():
+                start = time.monotonic()
+                if error := _check_one_off_notification(
+                    self.service_id, self.template_id, placeholders
+                ):
+                    raise ValueError(error)
+                durations[stage] = time.monotonic() - start
+
+                stage, start = "upload", time.monotonic()
+                upload_id, filename = _upload_one_off(
+                    self.service_id, self.template_id, placeholders
+                )
+                durations[stage] = time.monotonic() - start
+
+                stage, start = "create_job", time.monotonic()
+                _create_one_off_job(
+                    self.service_id, self.template_id, upload_id, filename, ""
+                )
+                durations[stage] = time.monotonic() - start
+        except Exception as e:
+            self._record(durations, error=f"{stage}: {type(e).__name__}: {e}")
+        else:
+            self._record(durations)
+
+    def _record(self, durations, error=None):
+        with self._lock:
+            for stage, duration in durations.items():
+                self.durations[stage].append(duration)
+            if error:
+                self.errors[error] += 1
+            else:
+                self.durations["total"].append(sum(durations.values()))
+            completed = self.sent + self.failed
+        if completed % SAVE_EVERY == 0:
+            self.save()
+
+    @property
+    def sent(self):
+        return len(self.durations["total"])
+
+    @property
+    def failed(self):
+        return sum(self.errors.values())
+
+    @property
+    def results(self):
+        with self._lock:
+            elapsed = (self._finish or time.monotonic()) - (
+                self._start or time.monotonic()
+            )
+            return {
+                "id": self.id,
+                "status": self.status,
+                "service_id": self.service_id,
+                "template_id": self.template_id,
+                "message_count": self.message_count,
+                "concurrency": self.concurrency,
+                "rate": self.rate,
+                "sent": self.sent,
+                "failed": self.failed,
+                "elapsed_s": round(elapsed, 2),
+                "messages_per_second": (
+                    round(self.sent / elapsed, 2) if elapsed else None
+                ),
+                "stages": {
+                    stage: get_percentiles(durations)
+                    for stage, durations in self.durations.items()
+                },
+                "errors": dict(self.errors.most_common()),
+            }
+
+    def save(self):
+        load_tests.save(self.results)
+
+
+class LoadTests:
+    """
+    Runs load tests in the background, and keeps their results in Redis so
+    that every worker can show them.
+    """
+
+    KEY = "load-test-{}"
+    TTL = 7 * 24 * 60 * 60
+    # How many runs to keep the results of in memory
+    MAX_RESULTS = 20
+
+    def __init__(self):
+        self.lock = Lock()
+        # So the latest results can be shown without Redis, from the same worker
+        self.results = OrderedDict()
+
+    def init_app(self, app):
+        @app.cli.command("load-test")
+        @click.option("--user-id", required=True, help="Who to send messages as")
+        @click.option("--service-id", required=True)
+        @click.option("--template-id", required=True)
+        @click.option("--messages", default=500, show_default=True)
+        @click.option("--concurrency", default=10, show_default=True)
+        @click.option(
+            "--rate",
+            default=0.0,
+            show_default=True,
+            help="Messages to start a second, or 0 for as many as possible",
+        )
+        def load_test_command(
+            user_id, service_id, template_id, messages, concurrency, rate
+        ):
+            """Send one-off messages and report how long each stage took."""
+            from app.models.user import User
+            from app.notify_client.service_api_client import service_api_client
+
+            load_test = LoadTest(
+                app,
+                User.from_id(user_id),
+                service_api_client.get_service(service_id)["data"],
+                template_id,
+                get_simulated_recipients(app.config["SIMULATED_SMS_NUMBERS"]),
+                messages,
+                concurrency,
+                rate,
+            )
+            click.echo(json.dumps(load_test.run(), indent=2))
+
+    def start(self, load_test):
+        Thread(target=self._run, args=(load_test,), daemon=True).start()
+        return load_test.id
+
+    def _run(self, load_test):
+        try:
+            load_test.run()
+        except Exception:
+            load_test._app.logger.exception("Load test %s failed", load_test.id)
+            load_test.status = "failed"
+            load_test.save()
+
+    def save(self, results):
+        with self.lock:
+            self.results[results["id"]] = results
+            self.results.move_to_end(results["id"])
+            while len(self.results) > self.MAX_RESULTS:
+                self.results.popitem(last=False)
+        redis_client.set(
+            self.KEY.format(results["id"]), json.dumps(results), ex=self.TTL
+        )
+
+    def get(self, load_test_id):
+        if cached := redis_client.get(self.KEY.format(load_test_id)):
+            return json.loads(cached)
+        with self.lock:
+            return self.results.get(str(load_test_id))
+
+
+load_tests = LoadTests()
+
+
+def start_load_test(user, service, template_id, message_count, concurrency, rate):
+    return load_tests.start(
+        LoadTest(
+            current_app._get_current_object(),
+            user,
+            service,
+            template_id,
+            get_simulated_recipients(current_app.config["SIMULATED_SMS_NUMBERS"]),
+            message_count,
+            concurrency,
+            rate,
+        )
+    )
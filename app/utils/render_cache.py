@@ -0,0 +1,198 @@
+import hashlib
+import json
+from collections import Counter, defaultdict
+from threading import Lock
+
+from cachetools import LRUCache
+from flask import render_template
+
+from app.extensions import redis_client
+
+
+def digest(value):
+    """
+    A stable digest of any JSON-serialisable value, so that dicts with the same
+    contents in a different order produce the same cache key.
+    """
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+
+
+class RenderCache:
+    """
+    A bounded, per-worker LRU of rendered strings, optionally backed by Redis so
+    that workers can share what they've rendered.
+
+    Only cache things whose output is fully determined by the key – for example
+    a template preview keyed by template id and version, which never change once
+    created.
+
+    Usage:
+
+        cache = RenderCache(redis_client, "PREVIEW_CACHE")
+        cache.init_app(app)
+
+        cache.get_or_render("some-key", lambda: expensive_render())
+
+    Configuration is read from `<config_prefix>_ENABLED`, `<config_prefix>_MAX_SIZE`,
+    `<config_prefix>_REDIS_ENABLED` and `<config_prefix>_REDIS_TTL`.
+    """
+
+    DEFAULT_MAX_SIZE = 5000
+    DEFAULT_REDIS_TTL = 24 * 60 * 60
+
+    def __init__(self, redis_client, config_prefix):
+        self.redis_client = redis_client
+        self.config_prefix = config_prefix
+        self.enabled = True
+        self.use_redis = False
+        self.redis_ttl = self.DEFAULT_REDIS_TTL
+        self._cache = LRUCache(maxsize=self.DEFAULT_MAX_SIZE)
+        self._lock = Lock()
+        self.counts = Counter()
+
+    def init_app(self, app):
+        prefix = self.config_prefix
+        self.enabled = app.config.get(f"{prefix}_ENABLED", True)
+        self.use_redis = app.config.get(f"{prefix}_REDIS_ENABLED", False)
+        self.redis_ttl = app.config.get(f"{prefix}_REDIS_TTL", self.DEFAULT_REDIS_TTL)
+        self._cache = LRUCache(
+            maxsize=app.config.get(f"{prefix}_MAX_SIZE", self.DEFAULT_MAX_SIZE)
+        )
+
+    def _redis_key(self, key):
+        return f"{self.config_prefix.lower().replace('_', '-')}-{key}"
+
+    def get_or_render(self, key, render):
+        if not self.enabled or key is None:
+            return render()
+
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            self._count(key, "hits")
+            return cached
+
+        if self.use_redis:
+            cached = self.redis_client.get(self._redis_key(key))
+            if cached is not None:
+                if isinstance(cached, bytes):
+                    cached = cached.decode("utf-8")
+                self._count(key, "redis_hits")
+                self._store(key, cached)
+                return cached
+
+        self._count(key, "misses")
+        rendered = str(render())
+        self._store(key, rendered)
+        if self.use_redis:
+            self.redis_client.set(self._redis_key(key), rendered, ex=self.redis_ttl)
+        return rendered
+
+    def _store(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def _count(self, key, outcome):
+        self.counts[outcome] += 1
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+        self.counts.clear()
+
+    @staticmethod
+    def _hit_rate(counts):
+        hits = counts["hits"] + counts["redis_hits"]
+        lookups = hits + counts["misses"]
+        return round(hits / lookups, 4) if lookups else 0
+
+    @property
+    def stats(self):
+        return {
+            "size": len(self._cache),
+            "max_size": self._cache.maxsize,
+            "hits": self.counts["hits"],
+            "redis_hits": self.counts["redis_hits"],
+            "misses": self.counts["misses"],
+            "hit_rate": self._hit_rate(self.counts),
+        }
+
+
+class FragmentCache(RenderCache):
+    """
+    Caches fragments of pages rendered with `render_template`, keyed by the name
+    of the template and a digest of the values the fragment depends on.
+
+    Those values must include anything the template reads from outside its
+    context, like `current_service` or the user’s timezone. Fragments with a CSRF
+    token in them can’t be cached.
+
+    Usage:
+
+        fragment_cache.render_template(
+            "views/dashboard/_totals.html",
+            [service_id, statistics],
+            service_id=service_id,
+            statistics=statistics,
+        )
+
+    Passing `None` as the values renders the fragment without caching it.
+    """
+
+    DEFAULT_MAX_SIZE = 1000
+
+    def __init__(self, redis_client, config_prefix):
+        super().__init__(redis_client, config_prefix)
+        self.fragment_counts = defaultdict(Counter)
+
+    def render_template(self, template_name, depends_on, **context):
+        return self.get_or_render(
+            None if depends_on is None else f"{template_name}:{digest(depends_on)}",
+            lambda: render_template(template_name, **context),
+        )
+
+    def _count(self, key, outcome):
+        super()._count(key, outcome)
+        with self._lock:
+            self.fragment_counts[key.rpartition(":")[0]][outcome] += 1
+
+    def clear(self):
+        super().clear()
+        with self._lock:
+            self.fragment_counts.clear()
+
+    @property
+    def stats(self):
+        with self._lock:
+            fragment_counts = sorted(self.fragment_counts.items())
+        return super().stats | {
+            "fragments": {
+                template_name: {
+                    "hits": counts["hits"],
+                    "redis_hits": counts["redis_hits"],
+                    "misses": counts["misses"],
+                    "hit_rate": self._hit_rate(counts),
+                }
+                for template_name, counts in fragment_counts
+            }
+        }
+
+
+def preview_cache_key(
+    variant, template_id, version, redact_personalisation, personalisation
+):
+    if template_id is None:
+        return None
+    return "{}-{}-{}-{}-{}".format(
+        variant,
+        template_id,
+        version,
+        int(bool(redact_personalisation)),
+        digest(personalisation or {}),
+    )
+
+
+preview_cache = RenderCache(redis_client, "PREVIEW_CACHE")
+fragment_cache = FragmentCache(redis_client, "FRAGMENT_CACHE")
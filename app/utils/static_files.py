@@ -0,0 +1,57 @@
+import mimetypes
+import os
+from functools import lru_cache
+
+from flask import current_app, request, send_from_directory
+from werkzeug.utils import safe_join
+
+# Written by the frontend build for CSS, JavaScript and SVG files, in order of
+# preference
+PRECOMPRESSED_ENCODINGS = (
+    ("br", ".br"),
+    ("gzip", ".gz"),
+)
+
+
+@lru_cache(maxsize=1024)
+def get_precompressed_encodings(static_folder, filename):
+    path = safe_join(static_folder, filename)
+    if path is None:
+        return ()
+    return tuple(
+        encoding
+        for encoding, extension in PRECOMPRESSED_ENCODINGS
+        if os.path.isfile(path + extension)
+    )
+
+
+def send_static_file(filename):
+    """
+    Serves static files in place of Flask’s view, sending a precompressed
+    version of the file if there is one the browser accepts.
+
+    Asset URLs have the file’s fingerprint in their query string, so when they
+    do the file will never change and browsers needn’t check for a new one.
+    """
+    static_folder = current_app.static_folder
+    encoding = next(
+        (
+            encoding
+            for encoding in get_precompressed_encodings(static_folder, filename)
+            if request.accept_encodings[encoding]
+        ),
+        None,
+    )
+    response = send_from_directory(
+        static_folder,
+        filename + dict(PRECOMPRESSED_ENCODINGS)[encoding] if encoding else filename,
+        mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        max_age=current_app.get_send_file_max_age(filename),
+    )
+    if encoding:
+        response.content_encoding = encoding
+    response.vary.add("Accept-Encoding")
+    if request.query_string:
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
@@ -0,0 +1,91 @@
+"""
+Used by the hooks in gunicorn_config.py to share memory between workers and keep
+an eye on how much each one uses.
+"""
+
+import gc
+import resource
+
+from app.extensions import redis_client
+from app.main.validators import get_commonly_used_passwords
+from app.notify_client import api_session
+from app.utils.jinja_cache import compile_templates
+from notifications_utils.countries import get_countries
+from notifications_utils.international_billing_rates import get_country_prefixes
+from notifications_utils.template import template_env
+
+
+def warm_up(application):
+    """
+    Loads everything which doesn’t change once it’s been loaded, before workers
+    are forked from the master process, so that they share one copy of it rather
+    than each loading their own.
+    """
+    get_country_prefixes()
+    get_countries()
+    get_commonly_used_passwords()
+    for environment in (application.jinja_env, template_env):
+        compile_templates(environment, logger=application.logger)
+
+    # Workers can’t share connections, so make sure they don’t inherit any
+    if redis_client.active:
+        redis_client.redis_store.connection_pool.disconnect()
+
+    # Stop the garbage collector touching (and so copying) objects which
+    # workers share with the master
+    gc.collect()
+    gc.freeze()
+
+
+def reinitialise_after_fork():
+    if redis_client.active:
+        redis_client.redis_store.connection_pool.reset()
+    api_session.reset()
+
+
+def get_memory_usage():
+    """
+    How much memory this process is using, in bytes.
+
+    `rss` counts memory shared with other workers, `pss` counts a fair share of
+    it and `uss` only counts memory which would be freed if the process exited.
+    Where there’s no /proc, only peak `rss` is available.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as smaps:
+            fields = dict(
+                line.split(":", 1) for line in smaps.readlines()[1:] if ":" in line
+            )
+    except OSError:
+        return {"rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024}
+
+    def kilobytes(*names):
+        return sum(int(fields[name].split()[0]) for name in names) * 1024
+
+    return {
+        "rss": kilobytes("Rss"),
+        "pss": kilobytes("Pss"),
+        "uss": kilobytes("Private_Clean", "Private_Dirty"),
+    }
+
+
+def check_memory(worker, max_memory_mb=None):
+    """
+    Logs how much memory a worker is using, and tells it to restart once it’s
+    finished its current requests if it’s using more than `max_memory_mb` of
+    its own.
+    """
+    usage = get_memory_usage()
+    worker.log.info(
+        "worker %s memory: %s",
+        worker.pid,
+        ", ".join(f"{name} {value / 2**20:.1f}MB" for name, value in usage.items()),
+    )
+    own_memory = usage.get("uss", usage["rss"])
+    if max_memory_mb and own_memory > max_memory_mb * 2**20:
+        worker.log.warning(
+            "worker %s is using more than %sMB, restarting it",
+            worker.pid,
+            max_memory_mb,
+        )
+        worker.alive = False
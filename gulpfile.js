@@ -7,6 +7,10 @@ const buffer = require('vinyl-buffer');
 const gulpMerge = require('gulp-merge');
 const uswds = require('@uswds/compile');
 const { exec } = require('child_process');
+const crypto = require('crypto');
+const fs = require('fs');
+const path = require('path');
+const zlib = require('zlib');
 const plugins = {};
 plugins.addSrc = require('gulp-add-src');
 plugins.babel = require('gulp-babel');
@@ -119,6 +123,56 @@ const copyPDF = () => {
   );
 };
 
+// List every file under a directory, recursively
+const listFiles = (directory) =>
+  fs.readdirSync(directory, { withFileTypes: true }).flatMap((entry) => {
+    const entryPath = path.join(directory, entry.name);
+    return entry.isDirectory() ? listFiles(entryPath) : [entryPath];
+  });
+
+// Task to write the fingerprint of every static file to `manifest.json`, so
+// the app doesn't have to hash them itself
+const manifest = async () => {
+  const fingerprints = {};
+  listFiles(paths.dist)
+    .map((file) => path.relative(paths.dist, file).split(path.sep).join('/'))
+    .filter((file) => file !== 'manifest.json' && !/\.(gz|br)$/.test(file))
+    .sort()
+    .forEach((file) => {
+      fingerprints[file] = crypto
+        .createHash('md5')
+        .update(fs.readFileSync(paths.dist + file))
+        .digest('hex');
+    });
+  fs.writeFileSync(
+    paths.dist + 'manifest.json',
+    JSON.stringify(fingerprints, null, 2)
+  );
+};
+
+// Task to write gzip and brotli versions of text assets alongside them, for
+// browsers which accept them
+const compress = async () => {
+  listFiles(paths.dist)
+    .filter((file) => /\.(css|js|svg)$/.test(file))
+    .forEach((file) => {
+      const contents = fs.readFileSync(file);
+      fs.writeFileSync(
+        file + '.gz',
+        zlib.gzipSync(contents, { level: zlib.constants.Z_BEST_COMPRESSION })
+      );
+      fs.writeFileSync(
+        file + '.br',
+        zlib.brotliCompressSync(contents, {
+          params: {
+            [zlib.constants.BROTLI_PARAM_QUALITY]:
+              zlib.constants.BROTLI_MAX_QUALITY,
+          },
+        })
+      );
+    });
+};
+
 // Configure USWDS paths
 uswds.settings.version = 3;
 uswds.paths.dist.css = paths.dist + 'css';
@@ -172,7 +226,9 @@ exports.default = series(
   copySetTimezone,
   copyImages,
   copyPDF,
-  copyAssets
+  copyAssets,
+  manifest,
+  compress
 );
 exports.backstopTest = backstopTest;
 exports.backstopReference = backstopReference;
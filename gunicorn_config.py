@@ -9,12 +9,54 @@ import gunicorn
 # The recommended formula is cpu_count() * 2 + 1
 # but we have an unusual configuration with a lot of cpus and not much memory
 # so adjust it.
-workers = multiprocessing.cpu_count()
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count()))
 worker_class = "eventlet"
 bind = "0.0.0.0:{}".format(os.getenv("PORT"))
 disable_redirect_access_to_syslog = True
 gunicorn.SERVER_SOFTWARE = "None"
 
+# Build the app once in the master process and fork workers from it, so that
+# they share the memory it uses rather than each building their own copy
+preload_app = os.getenv("GUNICORN_PRELOAD_APP", "0") == "1"
+
+# Log how much memory each worker uses every this many requests, and restart
+# workers using more than GUNICORN_MAX_WORKER_MEMORY_MB of their own
+memory_check_interval = int(os.getenv("GUNICORN_MEMORY_CHECK_INTERVAL", "500"))
+max_worker_memory_mb = int(os.getenv("GUNICORN_MAX_WORKER_MEMORY_MB", "0")) or None
+
+if preload_app:
+    # The app is imported before workers start, so make threading green first,
+    # otherwise each worker has to find and replace every lock the app created
+    # (touching, and so copying, all of the memory it shares with the master).
+    # Only threading though – gunicorn’s own main loop needs the blocking
+    # versions of os, select and time.
+    import eventlet
+
+    eventlet.monkey_patch(thread=True)
+
+
+def when_ready(server):
+    if preload_app:
+        from app.utils.workers import warm_up
+        from application import application
+
+        warm_up(application)
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from app.utils.workers import reinitialise_after_fork
+
+        reinitialise_after_fork()
+
+
+def post_request(worker, req, environ, resp):
+    worker.requests_handled = getattr(worker, "requests_handled", 0) + 1
+    if worker.requests_handled % memory_check_interval == 0:
+        from app.utils.workers import check_memory
+
+        check_memory(worker, max_worker_memory_mb)
+
 
 def worker_abort(worker):
     worker.log.info("worker received ABORT")
@@ -1,9 +1,15 @@
 import numbers
 import uuid
-from time import time
+from collections import namedtuple
+from threading import Lock
+from time import monotonic, time
 
 from flask import current_app
 from flask_redis import FlaskRedis
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from notifications_utils.request_timings import timed
 
 
 def prepare_value(val):
@@ -33,18 +39,124 @@ def prepare_value(val):
         raise ValueError("cannot cast {} to a string".format(type(val)))
 
 
+# Whether a request is allowed, how many more would be allowed straight after
+# it, and how many seconds until the next one would be allowed if it isn’t
+RateLimit = namedtuple("RateLimit", ["allowed", "remaining", "retry_after"])
+
+
+class RedisCircuitOpenError(RedisConnectionError):
+    pass
+
+
+class RedisCircuitBreaker:
+    """
+    Stops calling Redis for `cooldown` seconds once `max_failures` calls in a
+    row have failed to reach it, then lets one call through to see if it’s
+    back. If that call doesn’t say how it went within another `cooldown`
+    seconds, the next one is let through instead.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, max_failures=5, cooldown=30):
+        self.max_failures = max_failures
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.failures = 0
+        self.changed_at = None
+        self.lock = Lock()
+
+    def allow(self):
+        if self.state == self.CLOSED:
+            return True
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if monotonic() - self.changed_at >= self.cooldown:
+                self._change_state(self.HALF_OPEN)
+                return True
+            return False
+
+    def record_success(self):
+        if self.state == self.CLOSED and not self.failures:
+            return
+        with self.lock:
+            self.failures = 0
+            if self.state != self.CLOSED:
+                self._change_state(self.CLOSED)
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.max_failures
+            ):
+                self._change_state(self.OPEN)
+
+    def _change_state(self, state):
+        current_app.logger.warning("Redis circuit is %s", state)
+        self.state = state
+        self.changed_at = monotonic()
+
+    @property
+    def stats(self):
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
 class RedisClient:
+    """
+    Fails open: if Redis can’t be reached, reads miss and writes are skipped,
+    so a slow or broken Redis costs latency rather than errors. After
+    REDIS_CIRCUIT_MAX_FAILURES failures in a row it isn’t called at all for
+    REDIS_CIRCUIT_COOLDOWN seconds.
+    """
+
     redis_store = FlaskRedis()
     active = False
     scripts = {}
+    circuit = RedisCircuitBreaker()
 
     def init_app(self, app):
         self.active = app.config.get("REDIS_ENABLED")
+        self.circuit = RedisCircuitBreaker(
+            app.config.get("REDIS_CIRCUIT_MAX_FAILURES", 5),
+            app.config.get("REDIS_CIRCUIT_COOLDOWN", 30),
+        )
         if self.active:
-            self.redis_store.init_app(app)
+            self.redis_store.init_app(
+                app,
+                **{
+                    argument: app.config[config_key]
+                    for argument, config_key in (
+                        ("max_connections", "REDIS_MAX_CONNECTIONS"),
+                        ("socket_timeout", "REDIS_SOCKET_TIMEOUT"),
+                        ("socket_connect_timeout", "REDIS_SOCKET_CONNECT_TIMEOUT"),
+                        ("health_check_interval", "REDIS_HEALTH_CHECK_INTERVAL"),
+                    )
+                    if app.config.get(config_key) is not None
+                },
+            )
 
             self.register_scripts()
 
+    def _available(self, raise_exception):
+        """
+        Whether to call Redis, which isn’t worth it while the circuit is open.
+        """
+        if not self.active:
+            return False
+        if self.circuit.allow():
+            return True
+        if raise_exception:
+            raise RedisCircuitOpenError("Not calling Redis while it’s failing")
+        return False
+
+    def _succeeded(self, result):
+        self.circuit.record_success()
+        return result
+
     def register_scripts(self):
         # delete keys matching a pattern supplied as a parameter. Does so in batches of 5000 to prevent unpack from
         # exceeding lua's stack limit, and also to prevent errors if no keys match the pattern.
@@ -59,7 +171,30 @@ class RedisClient:
             return deleted
             """
         )
+        # Generic cell rate algorithm: KEYS[1] holds the time at which the
+        # bucket will next be empty, in microseconds. ARGV[1] requests are
+        # allowed every ARGV[2] seconds, all at once if none have been made for
+        # a while. Numbers are formatted as strings because Lua would round
+        # them to 14 digits, and Redis would truncate fractions
+        self.scripts["rate-limit"] = self.redis_store.register_script(
+            """
+            local limit = tonumber(ARGV[1])
+            local interval = tonumber(ARGV[2]) * 1000000
+            local time = redis.call('time')
+            local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+            local increment = interval / limit
+            local empty_at = math.max(tonumber(redis.call('get', KEYS[1])) or now, now)
+            local allowed_at = empty_at + increment - interval
+            if allowed_at > now then
+                return {0, 0, string.format('%.6f', (allowed_at - now) / 1000000)}
+            end
+            redis.call('set', KEYS[1], string.format('%.0f', empty_at + increment),
+                'px', math.ceil((empty_at + increment - now) / 1000))
+            return {1, math.floor((now - allowed_at) / increment + 0.001), '0'}
+            """
+        )
 
+    @timed("redis")
     def delete_by_pattern(self, pattern, raise_exception=False):
         r"""
         Deletes all keys matching a given pattern, and returns how many keys were deleted.
@@ -73,9 +208,11 @@ class RedisClient:
 
         Use \ to escape special characters if you want to match them verbatim
         """
-        if self.active:
+        if self._available(raise_exception):
             try:
-                return self.scripts["delete-keys-by-pattern"](args=[pattern])
+                return self._succeeded(
+                    self.scripts["delete-keys-by-pattern"](args=[pattern])
+                )
             except Exception as e:
                 self.__handle_exception(
                     e, raise_exception, "delete-by-pattern", pattern
@@ -83,6 +220,7 @@ class RedisClient:
 
         return 0
 
+    @timed("redis")
     def exceeded_rate_limit(self, cache_key, limit, interval, raise_exception=False):
         """
         Rate limiting.
@@ -101,6 +239,9 @@ class RedisClient:
         (4) If count > limit fail request
         (5) Ensure we expire the set key to preserve space
 
+        Being replaced by `check_rate_limit`, which keeps the same amount of
+        state however many requests there are, and needs one command.
+
         Notes:
         - Failed requests count. If over the limit and keep making requests you'll stay over the limit.
         - The actual value in the set is just the timestamp, the same as the score. We don't store any requets details.
@@ -115,7 +256,7 @@ class RedisClient:
         :return:
         """
         cache_key = prepare_value(cache_key)
-        if self.active:
+        if self._available(raise_exception):
             try:
                 pipe = self.redis_store.pipeline()
                 when = time()
@@ -123,7 +264,7 @@ class RedisClient:
                 pipe.zremrangebyscore(cache_key, "-inf", when - interval)
                 pipe.zcard(cache_key)
                 pipe.expire(cache_key, interval)
-                result = pipe.execute()
+                result = self._succeeded(pipe.execute())
                 return result[2] > limit
             except Exception as e:
                 self.__handle_exception(
@@ -133,38 +274,92 @@ class RedisClient:
         else:
             return False
 
+    @timed("redis")
+    def check_rate_limit(self, cache_key, limit, interval, raise_exception=False):
+        """
+        Whether another request is allowed, if `limit` are allowed every
+        `interval` seconds, as a `RateLimit`. Requests which aren’t allowed
+        don’t count. If Redis is inactive, or we get an exception, allow the
+        request.
+
+        Requests are allowed at an even rate, except that up to `limit` can be
+        made at once after a quiet spell – unlike a fixed window, which would
+        allow twice that either side of its edge.
+        """
+        cache_key = prepare_value(cache_key)
+        if self._available(raise_exception):
+            try:
+                allowed, remaining, retry_after = self._succeeded(
+                    self.scripts["rate-limit"](keys=[cache_key], args=[limit, interval])
+                )
+                return RateLimit(bool(allowed), remaining, float(retry_after))
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "rate-limit", cache_key)
+
+        return RateLimit(True, limit - 1, 0.0)
+
+    @timed("redis")
     def set(
         self, key, value, ex=None, px=None, nx=False, xx=False, raise_exception=False
     ):
         key = prepare_value(key)
         value = prepare_value(value)
-        if self.active:
-            self.redis_store.set(key, value, ex, px, nx, xx)
+        if self._available(raise_exception):
+            try:
+                self._succeeded(self.redis_store.set(key, value, ex, px, nx, xx))
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "set", key)
 
+    @timed("redis")
     def incr(self, key, raise_exception=False):
         key = prepare_value(key)
-        if self.active:
+        if self._available(raise_exception):
             try:
-                return self.redis_store.incr(key)
+                return self._succeeded(self.redis_store.incr(key))
             except Exception as e:
                 self.__handle_exception(e, raise_exception, "incr", key)
 
+    @timed("redis")
     def get(self, key, raise_exception=False):
         key = prepare_value(key)
-        if self.active:
-            return self.redis_store.get(key)
+        if self._available(raise_exception):
+            try:
+                return self._succeeded(self.redis_store.get(key))
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "get", key)
 
         return None
 
+    @timed("redis")
+    def get_many(self, keys, raise_exception=False):
+        """
+        Gets several keys in one round trip (MGET). Returns a list the same
+        length as `keys`, with None for any key which isn't set.
+        """
+        keys = [prepare_value(k) for k in keys]
+        if keys and self._available(raise_exception):
+            try:
+                return self._succeeded(self.redis_store.mget(keys))
+            except Exception as e:
+                self.__handle_exception(e, raise_exception, "mget", ", ".join(keys))
+
+        return [None] * len(keys)
+
+    @timed("redis")
     def delete(self, *keys, raise_exception=False):
         keys = [prepare_value(k) for k in keys]
-        if self.active:
+        if self._available(raise_exception):
             try:
-                self.redis_store.delete(*keys)
+                self._succeeded(self.redis_store.delete(*keys))
             except Exception as e:
                 self.__handle_exception(e, raise_exception, "delete", ", ".join(keys))
 
     def __handle_exception(self, e, raise_exception, operation, key_name):
+        if isinstance(e, (RedisConnectionError, RedisTimeoutError)):
+            self.circuit.record_failure()
+        else:
+            # Anything else means Redis could be reached
+            self.circuit.record_success()
         current_app.logger.exception(
             "Redis error performing {} on {}".format(operation, key_name)
         )
@@ -50,20 +50,30 @@ class CountryMapping(InsensitiveDict):
         raise CountryNotFoundError(f"Not a known country or territory ({key})")
 
 
-countries = CountryMapping(
-    dict(
-        COUNTRIES_AND_TERRITORIES
-        + UK_ISLANDS
-        + EUROPEAN_ISLANDS
-        + WELSH_NAMES
-        + ADDITIONAL_SYNONYMS
+@lru_cache(maxsize=1)
+def get_countries():
+    # Normalising every name takes a while, so only do it once something
+    # needs to look up a country
+    return CountryMapping(
+        dict(
+            COUNTRIES_AND_TERRITORIES
+            + UK_ISLANDS
+            + EUROPEAN_ISLANDS
+            + WELSH_NAMES
+            + ADDITIONAL_SYNONYMS
+        )
     )
-)
+
+
+def __getattr__(name):
+    if name == "countries":
+        return get_countries()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class Country:
     def __init__(self, given_name):
-        self.canonical_name = countries[given_name]
+        self.canonical_name = get_countries()[given_name]
 
     def __eq__(self, other):
         return self.canonical_name == other.canonical_name
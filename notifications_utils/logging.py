@@ -1,5 +1,10 @@
+import atexit
+import copy
+import importlib
 import logging
 import logging.handlers
+import os
+import queue
 import re
 import sys
 from itertools import product
@@ -18,32 +23,46 @@ TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
 
 logger = logging.getLogger(__name__)
 
-_phone_regex = re.compile("(?:\\+ *)?\\d[\\d\\- ]{7,}\\d")
-_email_regex = re.compile(r"[\w\.-]+@[\w\.-]+")  # ['alice@google.com', 'bob@abc.com']
+# A number can’t be the start of an email address, so that the whole address
+# gets masked
+_pii_regex = re.compile(
+    r"(?P<email>[\w\.-]+@[\w\.-]+)|(?P<phone>(?:\+ *)?\d[\d\- ]{7,}\d(?![\w\.-]*@))"
+)
+
+
+def _mask_pii(match: re.Match) -> str:
+    if match.lastgroup == "email":
+        return "XXXXX@XXXXXXX"
+    phone = match.group()
+    # Numbers broken up by dashes or spaces are usually dates or IDs
+    if "-" in phone or " " in phone:
+        return phone
+    return "1XXXXXXXXXX"
 
 
 def _scrub(msg: Any) -> Any:
     # Sometimes just an exception object is passed in for the message, skip those.
     if not isinstance(msg, str):
         return msg
-    phones = _phone_regex.findall(msg)
-    phones = [phone.replace("-", "").replace(" ", "") for phone in phones]
-    for phone in phones:
-        msg = msg.replace(phone, "1XXXXXXXXXX")
-
-    emails = _email_regex.findall(msg)
-    for email in emails:
-        # do something with each found email string
-        masked_email = "XXXXX@XXXXXXX"
-        msg = msg.replace(email, masked_email)
-
-    return msg
+    return _pii_regex.sub(_mask_pii, msg)
 
 
 class PIIFilter(logging.Filter):
+    """
+    Masks phone numbers and email addresses in the message, once it’s been
+    merged with its arguments, so that formatters don’t need to scrub it again.
+    """
+
     @override
     def filter(self, record: logging.LogRecord) -> logging.LogRecord:
-        record.msg = _scrub(record.msg)
+        try:
+            message = record.getMessage()
+        except Exception:
+            # Leave it for the handler to report
+            record.msg = _scrub(record.msg)
+            return record
+        record.msg = _scrub(message)
+        record.args = None
         return record
 
 
@@ -56,11 +75,16 @@ class PIIFormatter(logging.Formatter):
 def init_app(app):
     app.config.setdefault("NOTIFY_LOG_LEVEL", "INFO")
     app.config.setdefault("NOTIFY_APP_NAME", "none")
+    app.config.setdefault("NOTIFY_LOG_QUEUE_SIZE", 0)
 
     app.logger.removeHandler(default_handler)
 
     handlers = get_handlers(app)
     loglevel = logging.getLevelName(app.config["NOTIFY_LOG_LEVEL"])
+    if app.config["NOTIFY_LOG_QUEUE_SIZE"]:
+        queue_handler = QueueingHandler(handlers, app.config["NOTIFY_LOG_QUEUE_SIZE"])
+        queue_handler.setLevel(loglevel)
+        handlers = [add_context_filters(queue_handler, app)]
     loggers = [
         app.logger,
         logging.getLogger("utils"),
@@ -102,20 +126,140 @@ def get_handlers(app):
 def configure_handler(handler, app, formatter):
     handler.setLevel(logging.getLevelName(app.config["NOTIFY_LOG_LEVEL"]))
     handler.setFormatter(formatter)
+    add_context_filters(handler, app)
+    handler.addFilter(PIIFilter())
+
+    return handler
+
+
+def add_context_filters(handler, app):
     handler.addFilter(AppNameFilter(app.config["NOTIFY_APP_NAME"]))
     handler.addFilter(RequestIdFilter())
     handler.addFilter(ServiceIdFilter())
-    handler.addFilter(PIIFilter())
 
     return handler
 
 
+def _unpatched(name):
+    # Under eventlet a thread started with the patched `threading` module is
+    # green, so writing to stdout from it would still hold up every request
+    patcher = sys.modules.get("eventlet.patcher")
+    if patcher is not None and patcher.is_monkey_patched("thread"):
+        return patcher.original(name)
+    return importlib.import_module(name)
+
+
+class _QueueListener(logging.handlers.QueueListener):
+    def start(self):
+        self._thread = _unpatched("threading").Thread(target=self._monitor, daemon=True)
+        self._thread.start()
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """
+    Passes records to a background thread, which scrubs, formats and writes
+    them with `handlers`, so that logging doesn’t wait for stdout. If more than
+    `maxsize` records are waiting, new ones are dropped and counted rather than
+    waiting for room.
+
+    If eventlet has patched threading, the thread and its queue are a real
+    thread and queue rather than green ones, so that writing doesn’t block the
+    hub.
+
+    The context filters need to run on this handler, in the thread which
+    logged the record, rather than on `handlers`.
+    """
+
+    def __init__(self, handlers, maxsize):
+        super().__init__(queue.Queue(maxsize))
+        self.queue_module = queue
+        self.handlers = handlers
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.reported_drops = 0
+        self.listener = None
+        self._pid = None
+        atexit.register(self.stop)
+
+    def prepare(self, record):
+        # Merge the message with its arguments now, in case they change
+        # before the background thread gets to it
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        # Runs with the handler’s lock held. A forked process doesn’t get the
+        # background thread, so needs to start its own
+        if self._pid != os.getpid():
+            self.start()
+        try:
+            self.queue.put_nowait(record)
+        except self.queue_module.Full:
+            self.dropped += 1
+            return
+        if self.dropped > self.reported_drops:
+            self._report_drops()
+
+    def _report_drops(self):
+        dropped, self.reported_drops = self.dropped - self.reported_drops, self.dropped
+        report = logging.makeLogRecord(
+            {
+                "name": __name__,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {dropped} log records because the queue was full",
+                "pathname": __file__,
+            }
+        )
+        try:
+            self.queue.put_nowait(report)
+        except self.queue_module.Full:
+            self.reported_drops -= dropped
+
+    def start(self):
+        self.queue_module = _unpatched("queue")
+        self.queue = self.queue_module.Queue(self.maxsize)
+        self.listener = _QueueListener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self._pid = os.getpid()
+
+    def stop(self):
+        """
+        Writes any records still waiting.
+        """
+        if self.listener and self._pid == os.getpid():
+            try:
+                self.listener.stop()
+            except self.queue_module.Full:
+                pass
+            self.listener = None
+            self._pid = None
+
+    @property
+    def stats(self):
+        return {
+            "waiting": self.queue.qsize(),
+            "maxsize": self.maxsize,
+            "dropped": self.dropped,
+        }
+
+
+# These only fill in what a record doesn’t already have, so that when a
+# `QueueingHandler` has filled them in for the thread which logged it, the
+# handlers writing it in the background don’t overwrite them
+
+
 class AppNameFilter(logging.Filter):
     def __init__(self, app_name):
         self.app_name = app_name
 
     def filter(self, record):
-        record.app_name = self.app_name
+        if getattr(record, "app_name", None) is None:
+            record.app_name = self.app_name
 
         return record
 
@@ -132,7 +276,8 @@ class RequestIdFilter(logging.Filter):
             return default
 
     def filter(self, record):
-        record.request_id = self.request_id
+        if not hasattr(record, "request_id"):
+            record.request_id = self.request_id
 
         return record
 
@@ -147,7 +292,8 @@ class ServiceIdFilter(logging.Filter):
             return default
 
     def filter(self, record):
-        record.service_id = self.service_id
+        if not hasattr(record, "service_id"):
+            record.service_id = self.service_id
 
         return record
 
@@ -164,8 +310,11 @@ class JSONFormatter(BaseJSONFormatter):
             log_record[newkey] = log_record.pop(key)
         log_record["logType"] = "application"
         try:
-            log_record["message"] = log_record["message"].format(**log_record)
-            log_record["message"] = _scrub(log_record["message"])  # PII Scrubbing
+            message = log_record["message"]
+            log_record["message"] = message.format(**log_record)
+            # PIIFilter has scrubbed the message, but not what’s been added to it
+            if log_record["message"] != message:
+                log_record["message"] = _scrub(log_record["message"])
         except (KeyError, IndexError) as e:
             logger.exception(f"failed to format log message: {e} not found")
         return log_record
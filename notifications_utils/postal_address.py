@@ -21,7 +21,6 @@ address_lines_1_to_6_keys = [
 address_lines_1_to_6_and_postcode_keys = address_lines_1_to_6_keys + ["postcode"]
 address_line_7_key = "address_line_7"
 address_lines_1_to_7_keys = address_lines_1_to_6_keys + [address_line_7_key]
-country_UK = Country(UK)
 
 
 class PostalAddress:
@@ -44,7 +43,7 @@ class PostalAddress:
             self._lines_without_country = self._lines[:-1]
         except CountryNotFoundError:
             self._lines_without_country = self._lines
-            self.country = country_UK
+            self.country = Country(UK)
 
     def __bool__(self):
         return bool(self.normalised)
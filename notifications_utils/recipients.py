@@ -17,7 +17,9 @@ from notifications_utils.formatters import (
     strip_and_remove_obscure_whitespace,
 )
 from notifications_utils.insensitive_dict import InsensitiveDict
-from notifications_utils.international_billing_rates import INTERNATIONAL_BILLING_RATES
+from notifications_utils.international_billing_rates import (
+    get_international_billing_rates,
+)
 from notifications_utils.postal_address import (
     address_line_7_key,
     address_lines_1_to_6_and_postcode_keys,
@@ -579,7 +581,7 @@ def get_billable_units_for_prefix(prefix):
 def use_numeric_sender(number):
     prefix = _get_country_code(number)
     return (
-        INTERNATIONAL_BILLING_RATES[(prefix or us_prefix)]["attributes"]["alpha"]
+        get_international_billing_rates()[(prefix or us_prefix)]["attributes"]["alpha"]
         == "NO"
     )
 
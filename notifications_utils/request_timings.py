@@ -0,0 +1,302 @@
+"""
+Records where each request spends its time – in before-request hooks, calling
+the API, Redis and S3, and rendering templates – and reports it in a
+`Server-Timing` header and a log line.
+
+Timing every call has a cost, so only `REQUEST_TIMINGS_SAMPLE_RATE` of requests
+are broken down like this. Every request counts towards the latency histogram
+for its endpoint.
+"""
+
+import random
+import re
+from bisect import bisect_left
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from threading import Lock
+from time import monotonic
+from urllib.parse import urlsplit
+
+from flask import (
+    before_render_template,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    request_started,
+    template_rendered,
+)
+
+ENVIRON_KEY = "notify.request_timings"
+SERVER_TIMING_HEADER = "Server-Timing"
+
+# In the order they’re reported in
+CATEGORIES = ("hooks", "api", "redis", "s3", "render")
+
+# Upper bounds of the histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Path segments with IDs, signed tokens or email addresses in them
+_VARIABLE_SEGMENT = re.compile(r"[\d@.]")
+
+
+def get_endpoint_template(url):
+    """
+    Turns a URL like `https://api/service/1234-…/job?page=2` into
+    `/service/<id>/job`, so calls to the same endpoint are counted together and
+    nothing identifying gets logged.
+    """
+    return "/".join(
+        "<id>" if _VARIABLE_SEGMENT.search(segment) else segment
+        for segment in urlsplit(url).path.split("/")
+    )
+
+
+class RequestTimings:
+    """
+    How long one request has spent on each category of work.
+
+    Calls made from other threads on behalf of the request (like in
+    `get_many_cached`, which puts these timings on each thread’s `g`) are
+    counted too, so a category can add up to more than the request took. API
+    calls made by hooks count towards both.
+    """
+
+    def __init__(self, sampled):
+        self.start = monotonic()
+        self.sampled = sampled
+        self.durations = Counter()
+        self.calls = Counter()
+        self._call_durations = Counter()
+        self._rendering = []
+        self._lock = Lock()
+
+    def add(self, category, name, duration, status=None):
+        call = (category, name, status)
+        with self._lock:
+            self.durations[category] += duration
+            self.calls[call] += 1
+            self._call_durations[call] += duration
+
+    def count(self, category):
+        return sum(
+            count
+            for (call_category, _, _), count in self.calls.items()
+            if call_category == category
+        )
+
+    def server_timing(self, duration):
+        return ", ".join(
+            [
+                f'{category};dur={self.durations[category] * 1000:.1f};desc="{self.count(category)} calls"'
+                for category in CATEGORIES
+                if category in self.durations
+            ]
+            + [f"total;dur={duration * 1000:.1f}"]
+        )
+
+    def summary(self):
+        return ", ".join(
+            f"{category} {self.durations[category] * 1000:.1f}ms/{self.count(category)}"
+            for category in CATEGORIES
+            if category in self.durations
+        )
+
+    def as_dict(self, duration):
+        return {
+            "duration_ms": round(duration * 1000, 1),
+            **{
+                f"{category}_ms": round(self.durations[category] * 1000, 1)
+                for category in CATEGORIES
+                if category in self.durations
+            },
+            "calls": [
+                {
+                    "category": category,
+                    "name": name,
+                    "status": status,
+                    "count": count,
+                    "duration_ms": round(
+                        self._call_durations[category, name, status] * 1000, 1
+                    ),
+                }
+                for (category, name, status), count in self.calls.items()
+            ],
+        }
+
+
+class LatencyHistograms:
+    """
+    How long requests to each endpoint have taken in this process, counted in
+    `HISTOGRAM_BUCKETS`.
+    """
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self._counts = {}
+        self._sums = Counter()
+        self._lock = Lock()
+
+    def observe(self, endpoint, duration):
+        bucket = bisect_left(self.buckets, duration)
+        with self._lock:
+            counts = self._counts.setdefault(endpoint, [0] * (len(self.buckets) + 1))
+            counts[bucket] += 1
+            self._sums[endpoint] += duration
+
+    def clear(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def _percentile(self, counts, fraction):
+        """
+        The upper bound of the bucket the request at `fraction` falls in, or
+        None if it’s slower than the last bucket.
+        """
+        target = fraction * sum(counts)
+        seen = 0
+        for upper_bound, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= target:
+                return upper_bound * 1000
+        return None
+
+    @property
+    def stats(self):
+        with self._lock:
+            counts = {
+                endpoint: list(counts) for endpoint, counts in self._counts.items()
+            }
+            sums = dict(self._sums)
+        return {
+            endpoint: {
+                "count": sum(endpoint_counts),
+                "mean_ms": round(sums[endpoint] * 1000 / sum(endpoint_counts), 1),
+                "p50_ms": self._percentile(endpoint_counts, 0.5),
+                "p95_ms": self._percentile(endpoint_counts, 0.95),
+                "p99_ms": self._percentile(endpoint_counts, 0.99),
+                "buckets": [
+                    [upper_bound, count]
+                    for upper_bound, count in zip(
+                        (*(bucket * 1000 for bucket in self.buckets), "+Inf"),
+                        endpoint_counts,
+                    )
+                ],
+            }
+            for endpoint, endpoint_counts in sorted(counts.items())
+        }
+
+
+latency_histograms = LatencyHistograms()
+
+
+def get_request_timings():
+    """
+    The timings for the current request, if it’s being broken down.
+    """
+    if has_request_context():
+        timings = request.environ.get(ENVIRON_KEY)
+    else:
+        # Threads making calls for a request put its timings on `g`
+        timings = g.get("request_timings") if has_app_context() else None
+    if timings is None or not timings.sampled:
+        return None
+    return timings
+
+
+@contextmanager
+def timer(category, name):
+    """
+    Times the block if the current request is being broken down. The block can
+    put the outcome of what it did, like a response code, in the `status` of
+    the dict it gets.
+    """
+    timings = get_request_timings()
+    outcome = {}
+    if timings is None:
+        yield outcome
+        return
+    start = monotonic()
+    try:
+        yield outcome
+    finally:
+        timings.add(category, name, monotonic() - start, outcome.get("status"))
+
+
+def timed(category):
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with timer(category, function.__name__):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _start_timing_request(app, **extra):
+    if not app.config["REQUEST_TIMINGS_ENABLED"]:
+        return
+    sample_rate = app.config["REQUEST_TIMINGS_SAMPLE_RATE"]
+    request.environ[ENVIRON_KEY] = RequestTimings(
+        sampled=random.random() < sample_rate  # nosec B311 - not for security
+    )
+
+
+def _start_rendering(app, template, context, **extra):
+    if timings := get_request_timings():
+        timings._rendering.append(monotonic())
+
+
+def _finish_rendering(app, template, context, **extra):
+    if (timings := get_request_timings()) and timings._rendering:
+        timings.add("render", template.name, monotonic() - timings._rendering.pop())
+
+
+def _report_timings(response):
+    timings = request.environ.get(ENVIRON_KEY)
+    if timings is None:
+        return response
+
+    duration = monotonic() - timings.start
+    endpoint = request.endpoint or "unknown"
+    latency_histograms.observe(endpoint, duration)
+
+    if timings.sampled:
+        response.headers.add(SERVER_TIMING_HEADER, timings.server_timing(duration))
+        current_app.logger.info(
+            "%s %s %s took %.1fms (%s)",
+            request.method,
+            endpoint,
+            response.status_code,
+            duration * 1000,
+            timings.summary(),
+            extra={
+                "endpoint": endpoint,
+                "status_code": response.status_code,
+                "request_timings": timings.as_dict(duration),
+            },
+        )
+    return response
+
+
+def init_app(app):
+    """
+    Call once every before-request hook has been registered, including ones
+    on blueprints, so they can be timed.
+    """
+    app.config.setdefault("REQUEST_TIMINGS_ENABLED", False)
+    app.config.setdefault("REQUEST_TIMINGS_SAMPLE_RATE", 1)
+
+    request_started.connect(_start_timing_request, app)
+    before_render_template.connect(_start_rendering, app)
+    template_rendered.connect(_finish_rendering, app)
+
+    for hooks in app.before_request_funcs.values():
+        hooks[:] = [timed("hooks")(hook) for hook in hooks]
+
+    app.after_request(_report_timings)
@@ -6,6 +6,8 @@ from boto3 import Session
 from botocore.config import Config
 from flask import current_app
 
+from notifications_utils.request_timings import timed
+
 AWS_CLIENT_CONFIG = Config(
     # This config is required to enable S3 to connect to FIPS-enabled
     # endpoints.  See https://aws.amazon.com/compliance/fips/ for more
@@ -21,6 +23,7 @@ default_secret_access_key = os.environ.get("AWS_SECRET_ACCESS_KEY")
 default_region = os.environ.get("AWS_REGION")
 
 
+@timed("s3")
 def s3upload(
     filedata,
     region,
@@ -81,6 +84,7 @@ class S3ObjectNotFound(botocore.exceptions.ClientError):
     pass
 
 
+@timed("s3")
 def s3download(
     bucket_name,
     filename,
@@ -107,6 +107,35 @@ class TestAssetFingerprint(object):
         ) == ("/static/application.css")
         assert fingerprinter._cache == {}
 
+    def test_uses_manifest_if_there_is_one(self, mocker, tmp_path):
+        get_file_content_mock = mocker.patch.object(
+            AssetFingerprinter, "get_asset_file_contents"
+        )
+        (tmp_path / "manifest.json").write_text(
+            '{"application.css": "1234", "fonts/a.woff2": "5678"}'
+        )
+        fingerprinter = AssetFingerprinter(filesystem_path=f"{tmp_path}/")
+        fingerprinter.load_manifest()
+
+        assert (
+            fingerprinter.get_url("application.css") == "/static/application.css?1234"
+        )
+        assert fingerprinter.list_assets("fonts/*.woff2") == ["fonts/a.woff2"]
+        assert get_file_content_mock.called is False
+
+    def test_lists_assets_from_filesystem_without_manifest(self, tmp_path):
+        (tmp_path / "fonts").mkdir()
+        (tmp_path / "fonts" / "b.woff2").write_bytes(b"")
+        (tmp_path / "fonts" / "a.woff2").write_bytes(b"")
+        (tmp_path / "fonts" / "a.woff").write_bytes(b"")
+        fingerprinter = AssetFingerprinter(filesystem_path=f"{tmp_path}/")
+        fingerprinter.load_manifest()
+
+        assert fingerprinter.list_assets("fonts/*.woff2") == [
+            "fonts/a.woff2",
+            "fonts/b.woff2",
+        ]
+
 
 class TestAssetFingerprintWithUnicode(object):
     def test_can_read_self(self):
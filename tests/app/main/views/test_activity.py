@@ -125,7 +125,7 @@ def test_can_show_notifications(
             page=page_argument,
             _data={"to": to_argument},
             _expected_status=200,
-            **extra_args
+            **extra_args,
         )
     else:
         page = client_request.get(
@@ -133,7 +133,7 @@ def test_can_show_notifications(
             service_id=SERVICE_ONE_ID,
             status=status_argument,
             page=page_argument,
-            **extra_args
+            **extra_args,
         )
     first_row = page.select_one("tbody tr")
     assert normalize_spaces(
@@ -193,7 +193,7 @@ def test_can_show_notifications(
         "main.get_notifications_as_json",
         service_id=service_one["id"],
         status=status_argument,
-        **extra_args
+        **extra_args,
     )
     json_content = json.loads(json_response.get_data(as_text=True))
     assert json_content.keys() == {
@@ -203,6 +203,34 @@ def test_can_show_notifications(
     }
 
 
+def test_notifications_json_is_not_modified_if_statistics_have_not_changed(
+    client_request,
+    service_one,
+    mock_get_notifications,
+    mock_get_service_statistics,
+    mock_get_service_data_retention,
+    mock_has_no_jobs,
+    mock_get_no_api_keys,
+):
+    first_response = client_request.get_response(
+        "main.get_notifications_as_json",
+        service_id=service_one["id"],
+        message_type="sms",
+    )
+    etag, _ = first_response.get_etag()
+    assert mock_get_notifications.call_count == 1
+
+    client_request.get_response(
+        "main.get_notifications_as_json",
+        service_id=service_one["id"],
+        message_type="sms",
+        _headers={"If-None-Match": f'"{etag}"'},
+        _expected_status=304,
+    )
+
+    assert mock_get_notifications.call_count == 1
+
+
 def test_can_show_notifications_if_data_retention_not_available(
     client_request,
     mock_get_notifications,
@@ -376,7 +404,7 @@ def test_search_recipient_form(
         service_id=SERVICE_ONE_ID,
         _data=form_post_data,
         _expected_status=200,
-        **initial_query_arguments
+        **initial_query_arguments,
     )
 
     assert page.find("form")["method"] == "post"
@@ -14,6 +14,7 @@ from app.main.views.dashboard import (
     get_dashboard_totals,
     get_tuples_of_financial_years,
 )
+from app.utils.render_cache import fragment_cache
 from tests import (
     organization_json,
     service_json,
@@ -552,7 +553,9 @@ def test_view_inbox_updates(
 
     assert json.loads(response.get_data(as_text=True)) == {"messages": "foo"}
 
-    mock_get_partials.assert_called_once_with(SERVICE_ONE_ID)
+    mock_get_partials.assert_called_once_with(
+        SERVICE_ONE_ID, {"has_next": False, "data": []}
+    )
 
 
 @freeze_time("2016-07-01 16:00")
@@ -1947,3 +1950,35 @@ def test_service_dashboard_shows_batched_jobs(
     assert len(rows) == 0
 
     assert job_table_body is not None
+
+
+def test_dashboard_partials_are_cached_until_statistics_change(
+    client_request,
+    mocker,
+    mock_get_service_templates,
+    mock_get_template_statistics,
+    mock_get_service_statistics,
+    mock_get_jobs,
+    mock_get_scheduled_job_stats,
+    mock_get_annual_usage_for_service,
+    mock_get_free_sms_fragment_limit,
+    mock_get_inbound_sms_summary,
+):
+    for _ in range(2):
+        client_request.get_response(
+            "main.service_dashboard_updates", service_id=SERVICE_ONE_ID
+        )
+    assert fragment_cache.stats["misses"] == 5
+    assert fragment_cache.stats["hits"] == 5
+
+    mock_get_template_statistics.side_effect = lambda service_id, limit_days: []
+    client_request.get_response(
+        "main.service_dashboard_updates", service_id=SERVICE_ONE_ID
+    )
+    assert fragment_cache.stats["fragments"]["views/dashboard/_totals.html"] == {
+        "hits": 1,
+        "redis_hits": 0,
+        "misses": 2,
+        "hit_rate": 0.3333,
+    }
+    assert fragment_cache.stats["fragments"]["views/dashboard/_usage.html"]["hits"] == 2
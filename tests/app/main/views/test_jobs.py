@@ -423,6 +423,38 @@ def test_should_show_updates_for_one_job_as_json(
     assert "01-01-2016 at 12:00 AM" in content["notifications"]
 
 
+@freeze_time("2016-01-01 11:09:00.061258")
+def test_job_updates_are_not_rendered_again_if_job_has_not_changed(
+    client_request,
+    service_one,
+    active_user_with_permissions,
+    mock_get_notifications,
+    mock_get_service_template,
+    mock_get_job,
+    mock_get_service_data_retention,
+    fake_uuid,
+):
+    first_response = client_request.get_response(
+        "main.view_job_updates",
+        service_id=service_one["id"],
+        job_id=fake_uuid,
+    )
+    etag, _ = first_response.get_etag()
+
+    response = client_request.get_response(
+        "main.view_job_updates",
+        service_id=service_one["id"],
+        job_id=fake_uuid,
+        _headers={"If-None-Match": f'"{etag}"'},
+        _expected_status=304,
+    )
+
+    assert response.get_etag() == (etag, False)
+    assert response.get_data() == b""
+    assert mock_get_job.call_count == 2
+    assert mock_get_notifications.call_count == 1
+
+
 @freeze_time("2016-01-01 05:00:00.000001")
 def test_should_show_updates_for_scheduled_job_as_json(
     client_request,
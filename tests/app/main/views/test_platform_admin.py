@@ -837,6 +837,125 @@ def test_clear_cache_requires_option(
     assert not redis.delete_by_pattern.called
 
 
+def test_load_test_shows_form(client_request, platform_admin_user, mocker):
+    mock_start = mocker.patch("app.main.views.platform_admin.start_load_test")
+    client_request.login(platform_admin_user)
+
+    page = client_request.get("main.load_test")
+
+    assert [field["name"] for field in page.select("input[type=text]")] == [
+        "message_count",
+        "concurrency",
+        "rate",
+    ]
+    assert page.select_one("input[name=message_count]")["value"] == "500"
+    assert mock_start.called is False
+
+
+def test_load_test_starts_in_the_background_and_redirects_to_results(
+    client_request,
+    platform_admin_user,
+    mocker,
+    fake_uuid,
+):
+    service = {"id": SERVICE_ONE_ID, "name": "Test service"}
+    mocker.patch(
+        "app.main.views.platform_admin._find_load_test_service", return_value=service
+    )
+    mock_prepare = mocker.patch(
+        "app.main.views.platform_admin._prepare_load_test_service"
+    )
+    mocker.patch(
+        "app.main.views.platform_admin._find_example_template",
+        return_value={"id": fake_uuid},
+    )
+    mock_start = mocker.patch(
+        "app.main.views.platform_admin.start_load_test", return_value=fake_uuid
+    )
+    client_request.login(platform_admin_user)
+
+    client_request.post(
+        "main.load_test",
+        _data={"message_count": "100", "concurrency": "5", "rate": "20"},
+        _expected_redirect=url_for("main.load_test_results", load_test_id=fake_uuid),
+    )
+
+    mock_prepare.assert_called_once_with(service)
+    assert mock_start.call_args.args[1:] == (service, fake_uuid, 100, 5, 20)
+
+
+def test_load_test_needs_a_sensible_number_of_messages(
+    client_request, platform_admin_user, mocker
+):
+    mock_start = mocker.patch("app.main.views.platform_admin.start_load_test")
+    client_request.login(platform_admin_user)
+
+    page = client_request.post(
+        "main.load_test",
+        _data={"message_count": "0", "concurrency": "5", "rate": "0"},
+        _expected_status=200,
+    )
+
+    assert "Error:" in normalize_spaces(page.select_one(".usa-error-message").text)
+    assert mock_start.called is False
+
+
+def test_load_test_results(client_request, platform_admin_user, mocker, fake_uuid):
+    mocker.patch(
+        "app.main.views.platform_admin.load_tests.get",
+        return_value={
+            "id": fake_uuid,
+            "status": "finished",
+            "message_count": 3,
+            "concurrency": 2,
+            "rate": 0,
+            "sent": 2,
+            "failed": 1,
+            "elapsed_s": 0.5,
+            "messages_per_second": 4.0,
+            "stages": {
+                "check": {
+                    "count": 3,
+                    "mean_ms": 1.0,
+                    "p50_ms": 1.0,
+                    "p95_ms": 2.0,
+                    "p99_ms": 2.0,
+                    "max_ms": 2.0,
+                },
+                "total": {"count": 0},
+            },
+            "errors": {"upload: HTTPError: 500": 1},
+        },
+    )
+    client_request.login(platform_admin_user)
+
+    page = client_request.get("main.load_test_results", load_test_id=fake_uuid)
+
+    assert normalize_spaces(page.select_one("main p").text) == (
+        "2 of 3 messages sent and 1 failed in 0.5 seconds (4.0 a second), 2 at a time."
+    )
+    assert [
+        normalize_spaces(row.text) for row in page.select("table")[0].select("tbody tr")
+    ] == [
+        "check 3 1.0 1.0 2.0 2.0 2.0",
+        "total 0 – – – – –",
+    ]
+    assert normalize_spaces(page.select("table")[1].select_one("tbody tr").text) == (
+        "upload: HTTPError: 500 1"
+    )
+
+
+def test_load_test_results_404s_for_unknown_load_tests(
+    client_request, platform_admin_user, mocker, fake_uuid
+):
+    mocker.patch("app.main.views.platform_admin.load_tests.get", return_value=None)
+    client_request.login(platform_admin_user)
+
+    client_request.get(
+        "main.load_test_results", load_test_id=fake_uuid, _expected_status=404
+    )
+
+
 def test_reports_page(
     client_request,
     platform_admin_user,
@@ -1192,6 +1311,10 @@ def test_get_users_report(client_request, platform_admin_user, mocker):
             }
         ],
     )
+    mock_get_service_names = mocker.patch(
+        "app.main.views.platform_admin.service_api_client.get_service_names",
+        return_value={"test service": "Test Service Name"},
+    )
 
     client_request.login(platform_admin_user)
     response = client_request.post_response(
@@ -1209,8 +1332,9 @@ def test_get_users_report(client_request, platform_admin_user, mocker):
 
     assert "Johnny Sokko" in my_response
     assert "manage_users" in my_response
-    assert "test service" in my_response
+    assert "Test Service Name" in my_response
     assert "active" in my_response
+    assert list(mock_get_service_names.call_args.args[0]) == ["test service"]
 
 
 def test_get_daily_sms_provider_volumes_report_calls_api_and_download_data(
@@ -2165,7 +2165,7 @@ def test_route_permissions_send_check_notifications(
         session["recipient"] = "2028675301"
         session["placeholders"] = {"name": "a"}
 
-    mocker.patch("app.main.views.send.check_messages")
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
     mocker.patch(
         "app.notification_api_client.get_notifications_for_service",
         return_value=FAKE_ONE_OFF_NOTIFICATION,
@@ -2768,7 +2768,7 @@ def test_send_notification_submits_data(
         return_value=FAKE_ONE_OFF_NOTIFICATION,
     )
 
-    mocker.patch("app.main.views.send.check_messages", return_value="")
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
 
     client_request.post(
         "main.send_notification", service_id=SERVICE_ONE_ID, template_id=fake_uuid
@@ -2791,7 +2791,7 @@ def test_send_notification_clears_session(
         session["recipient"] = "2028675301"
         session["placeholders"] = {"a": "b"}
 
-    mocker.patch("app.main.views.send.check_messages")
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
     mocker.patch(
         "app.notification_api_client.get_notifications_for_service",
         return_value=FAKE_ONE_OFF_NOTIFICATION,
@@ -2851,7 +2851,7 @@ def test_send_notification_redirects_to_view_page(
         session["recipient"] = "2028675301"
         session["placeholders"] = {"a": "b"}
 
-    mocker.patch("app.main.views.send.check_messages")
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
 
     mocker.patch(
         "app.notification_api_client.get_notifications_for_service",
@@ -2911,9 +2911,7 @@ def test_send_notification_shows_error_if_400(
     class MockHTTPError(HTTPError):
         message = exception_msg
 
-    mocker.patch(
-        "app.main.views.send.check_messages",
-    )
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
 
     mocker.patch(
         "app.notification_api_client.get_notifications_for_service",
@@ -2939,6 +2937,94 @@ def test_send_notification_shows_error_if_400(
     assert not page.find("input[type=submit]")
 
 
+def test_send_notification_uploads_once_without_checking_the_upload(
+    client_request,
+    fake_uuid,
+    mocker,
+    mock_get_service_template,
+    mock_get_users_by_service,
+    mock_create_job,
+):
+    mock_s3upload = mocker.patch(
+        "app.main.views.send.s3upload", return_value=sample_uuid()
+    )
+    mock_s3download = mocker.patch("app.main.views.send.s3download")
+    mock_set_metadata = mocker.patch("app.main.views.send.set_metadata_on_csv_upload")
+    mocker.patch(
+        "app.notification_api_client.get_notifications_for_service",
+        return_value=FAKE_ONE_OFF_NOTIFICATION,
+    )
+    sender_id = str(uuid4())
+    with client_request.session_transaction() as session:
+        session["recipient"] = "+12028675109"
+        session["placeholders"] = {"phone number": "+12028675109"}
+        session["sender_id"] = sender_id
+
+    client_request.post(
+        "main.send_notification",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _expected_status=302,
+    )
+
+    filename = mock_s3upload.call_args.args[1]["filename"]
+    assert filename.startswith("one-off-")
+    assert mock_s3upload.call_args.args[1]["data"] == "phone number\r\n+12028675109"
+    assert mock_s3upload.call_args.kwargs["metadata"] == {
+        "notification_count": 1,
+        "template_id": fake_uuid,
+        "valid": True,
+        "original_file_name": filename,
+        "sender_id": sender_id,
+    }
+    assert mock_s3download.called is False
+    assert mock_set_metadata.called is False
+    mock_create_job.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    ("recipient", "placeholders", "expected_h1"),
+    [
+        (
+            "+12028675301",
+            {"name": "a"},
+            "You cannot send to this phone number",
+        ),
+        (
+            "+12028675109",
+            {"name": "a" * 1000},
+            "Message too long",
+        ),
+    ],
+)
+def test_send_notification_shows_errors_without_uploading(
+    client_request,
+    fake_uuid,
+    mocker,
+    mock_get_service_template_with_placeholders,
+    mock_get_users_by_service,
+    mock_create_job,
+    recipient,
+    placeholders,
+    expected_h1,
+):
+    mock_s3upload = mocker.patch("app.main.views.send.s3upload")
+    with client_request.session_transaction() as session:
+        session["recipient"] = recipient
+        session["placeholders"] = placeholders | {"phone number": recipient}
+
+    page = client_request.post(
+        "main.send_notification",
+        service_id=SERVICE_ONE_ID,
+        template_id=fake_uuid,
+        _expected_status=200,
+    )
+
+    assert normalize_spaces(page.select_one("h1").text) == expected_h1
+    assert mock_s3upload.called is False
+    assert mock_create_job.called is False
+
+
 def test_send_notification_shows_email_error_in_trial_mode(
     client_request,
     fake_uuid,
@@ -2952,7 +3038,7 @@ def test_send_notification_shows_email_error_in_trial_mode(
         message = TRIAL_MODE_MSG
         status_code = 400
 
-    mocker.patch("app.main.views.send.check_messages")
+    mocker.patch("app.main.views.send._check_one_off_notification", return_value=None)
     mocker.patch(
         "app.notification_api_client.get_notifications_for_service",
         return_value=FAKE_ONE_OFF_NOTIFICATION,
@@ -3,7 +3,7 @@ import uuid
 import pytest
 
 from app.models.service import Service
-from app.models.template_list import TemplateList
+from app.models.template_list import TemplateList, TemplateLists
 from app.models.user import User
 
 INV_PARENT_FOLDER_ID = "7e979e79-d970-43a5-ac69-b625a8d147b0"
@@ -120,3 +120,103 @@ def test_template_list_yields_all_folders_without_user(
         "2's Visible grandchild",
         "2's Visible child",
     )
+
+
+def test_template_list_only_shows_folders_containing_templates_of_type(
+    mocker,
+    mock_get_template_folders,
+    service_one,
+):
+    folder_ids = [str(uuid.uuid4()) for _ in range(50)]
+    mock_get_template_folders.return_value = [
+        {
+            "name": f"Folder {index:02}",
+            "id": folder_id,
+            "parent_id": folder_ids[index - 1] if index else None,
+            "users_with_permission": [],
+        }
+        for index, folder_id in enumerate(folder_ids)
+    ]
+    mocker.patch(
+        "app.service_api_client.get_service_templates",
+        return_value={
+            "data": [
+                {
+                    "id": str(uuid.uuid4()),
+                    "name": "Deeply nested",
+                    "template_type": "sms",
+                    "folder": folder_ids[-1],
+                },
+                {
+                    "id": str(uuid.uuid4()),
+                    "name": "Top level",
+                    "template_type": "email",
+                    "folder": None,
+                },
+            ]
+        },
+    )
+    service = Service(service_one)
+
+    sms_items = list(TemplateList(service=service, template_type="sms"))
+    email_items = list(TemplateList(service=service, template_type="email"))
+
+    assert [item.name for item in sms_items] == [
+        f"Folder {index:02}" for index in range(50)
+    ] + ["Deeply nested"]
+    assert [item.hint for item in sms_items[:2]] == ["1 folder", "1 folder"]
+    assert sms_items[49].hint == "1 template"
+    assert [item.name for item in email_items] == ["Top level"]
+
+
+@pytest.mark.usefixtures("_mock_get_hierarchy_of_folders")
+def test_template_list_checks_each_folder_permission_once(
+    mocker,
+    mock_get_service_templates,
+    service_one,
+    active_user_with_permissions,
+):
+    service = Service(service_one)
+    user = User(active_user_with_permissions)
+    mock_has_permission = mocker.spy(user, "has_template_folder_permission")
+
+    list(TemplateList(service=service, user=user))
+
+    checked_folder_ids = [
+        (call.args[0] or {}).get("id") for call in mock_has_permission.call_args_list
+    ]
+    assert len(checked_folder_ids) == len(set(checked_folder_ids))
+
+
+def test_template_lists_loads_templates_and_folders_for_all_services_in_bulk(
+    mocker,
+    mock_get_service_templates,
+    mock_get_template_folders,
+    service_one,
+    active_user_with_permissions,
+):
+    user = User(active_user_with_permissions)
+    services = [
+        dict(service_one, id=str(uuid.uuid4()), name=f"Service {index}")
+        for index in range(3)
+    ]
+    mocker.patch(
+        "app.user_api_client.get_organizations_and_services_for_user",
+        return_value={"organizations": [], "services": services},
+    )
+    mock_load = mocker.spy(Service, "load_templates_and_folders")
+
+    items = list(TemplateLists(user))
+
+    assert [item.name for item in items if item.is_service] == [
+        "Service 0",
+        "Service 1",
+        "Service 2",
+    ]
+    assert mock_load.call_count == 1
+    assert sorted(
+        call.args[0] for call in mock_get_service_templates.call_args_list
+    ) == sorted(service["id"] for service in services)
+    assert sorted(
+        call.args[0] for call in mock_get_template_folders.call_args_list
+    ) == sorted(service["id"] for service in services)
@@ -1,8 +1,15 @@
 import uuid
+from datetime import date
 
 import pytest
+from freezegun import freeze_time
 
-from app.notify_client.billing_api_client import BillingAPIClient
+from app.notify_client.billing_api_client import (
+    CLOSED_PERIOD_TTL,
+    OPEN_PERIOD_TTL,
+    BillingAPIClient,
+    split_into_months,
+)
 
 
 def test_get_free_sms_fragment_limit_for_year_correct_endpoint(mocker, api_user_active):
@@ -73,7 +80,9 @@ def test_post_free_sms_fragment_limit_for_year_endpoint(mocker, api_user_active)
     ],
 )
 def test_get_data_for_volume_reports(mocker, api_user_active, func, expected_url):
-    mock_get = mocker.patch("app.notify_client.billing_api_client.BillingAPIClient.get")
+    mock_get = mocker.patch(
+        "app.notify_client.billing_api_client.BillingAPIClient.get", return_value=[]
+    )
     client = BillingAPIClient()
 
     func(client, "2022-03-01", "2022-03-31")
@@ -81,3 +90,95 @@ def test_get_data_for_volume_reports(mocker, api_user_active, func, expected_url
     mock_get.assert_called_once_with(
         url=expected_url, params={"start_date": "2022-03-01", "end_date": "2022-03-31"}
     )
+
+
+@pytest.mark.parametrize(
+    ("year", "expected_ttl"),
+    [
+        (2021, CLOSED_PERIOD_TTL),
+        (2022, OPEN_PERIOD_TTL),
+    ],
+)
+@freeze_time("2023-01-03 12:00")
+def test_usage_for_closed_years_is_cached_for_longer(
+    mocker, api_user_active, year, expected_ttl
+):
+    mocker.patch("app.extensions.RedisClient.get", return_value=None)
+    mock_redis_set = mocker.patch("app.extensions.RedisClient.set")
+    mock_get = mocker.patch(
+        "app.notify_client.billing_api_client.BillingAPIClient.get",
+        return_value=[{"month": "January"}],
+    )
+
+    BillingAPIClient().get_monthly_usage_for_service("1234", year)
+
+    mock_get.assert_called_once_with(
+        url="/service/1234/billing/monthly-usage", params={"year": year}
+    )
+    mock_redis_set.assert_called_once_with(
+        f"service-1234-monthly-usage-{year}",
+        '[{"month": "January"}]',
+        ex=expected_ttl,
+    )
+
+
+def test_cached_usage_is_not_fetched_again(mocker, api_user_active):
+    mocker.patch("app.extensions.RedisClient.get", return_value=b'{"cost": 1}')
+    mock_get = mocker.patch("app.notify_client.billing_api_client.BillingAPIClient.get")
+
+    assert BillingAPIClient().get_annual_usage_for_service("1234", 2020) == {"cost": 1}
+    assert mock_get.called is False
+
+
+@freeze_time("2023-01-03 12:00")
+def test_updating_free_sms_fragment_limit_clears_cached_usage(mocker, api_user_active):
+    mocker.patch("app.notify_client.billing_api_client.BillingAPIClient.post")
+    mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
+
+    BillingAPIClient().create_or_update_free_sms_fragment_limit(
+        "1234", free_sms_fragment_limit=1111
+    )
+
+    mock_redis_delete.assert_called_once_with(
+        "service-1234-monthly-usage-2023", "service-1234-yearly-usage-2023"
+    )
+
+
+def test_split_into_months():
+    assert list(split_into_months(date(2022, 11, 15), date(2023, 2, 3))) == [
+        (date(2022, 11, 1), date(2022, 11, 30)),
+        (date(2022, 12, 1), date(2022, 12, 31)),
+        (date(2023, 1, 1), date(2023, 1, 31)),
+        (date(2023, 2, 1), date(2023, 2, 28)),
+    ]
+
+
+@freeze_time("2023-02-12 12:00")
+def test_daily_reports_are_put_together_from_cached_months(mocker, api_user_active):
+    mocker.patch(
+        "app.extensions.RedisClient.get",
+        side_effect=lambda key: (
+            b'[{"day": "2023-01-14"}, {"day": "2023-01-31"}]'
+            if key == "billing-report-daily-volumes-2023-01"
+            else None
+        ),
+    )
+    mock_redis_set = mocker.patch("app.extensions.RedisClient.set")
+    mock_get = mocker.patch(
+        "app.notify_client.billing_api_client.BillingAPIClient.get",
+        return_value=[{"day": "2023-02-01"}, {"day": "2023-02-11"}],
+    )
+
+    assert BillingAPIClient().get_data_for_daily_volumes_report(
+        date(2023, 1, 15), date(2023, 2, 10)
+    ) == [{"day": "2023-01-31"}, {"day": "2023-02-01"}]
+
+    mock_get.assert_called_once_with(
+        url="/platform-stats/daily-volumes-report",
+        params={"start_date": "2023-02-01", "end_date": "2023-02-28"},
+    )
+    mock_redis_set.assert_called_once_with(
+        "billing-report-daily-volumes-2023-02",
+        '[{"day": "2023-02-01"}, {"day": "2023-02-11"}]',
+        ex=OPEN_PERIOD_TTL,
+    )
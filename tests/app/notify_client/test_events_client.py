@@ -14,3 +14,25 @@ def test_events_client_calls_correct_api_endpoint(mocker):
     client.create_event(event_type, event_data)
 
     mock_post.assert_called_once_with(url=expected_url, data=expected_data)
+
+
+def test_queued_events_skip_the_checks_which_need_a_request(notify_admin, mocker):
+    client = EventsApiClient()
+    mock_check = mocker.patch(
+        "app.notify_client.events_api_client.EventsApiClient.check_inactive_service"
+    )
+    mock_post = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient.post",
+        return_value={"data": {"id": "1234"}},
+    )
+
+    assert client.create_queued_event("anything", {"does_not": "matter"}) == {
+        "id": "1234"
+    }
+
+    mock_post.assert_called_once_with(
+        client,
+        url="/events",
+        data={"event_type": "anything", "data": {"does_not": "matter"}},
+    )
+    assert not mock_check.called
@@ -1,12 +1,25 @@
 from datetime import date
-from unittest.mock import patch
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from threading import Barrier, Thread
+from unittest.mock import Mock, patch
 
 import pytest
+import requests
 import werkzeug
+from flask import g, has_request_context, request
+from notifications_python_client.errors import HTTPError
 
 from app.models.service import Service
-from app.notify_client import NotifyAdminAPIClient
+from app.notify_client import (
+    APISession,
+    NotifyAdminAPIClient,
+    TokenCache,
+    api_session,
+    get_many_cached,
+)
 from app.notify_client.notification_api_client import notification_api_client
+from app.notify_client.resilience import DEADLINE_KEY
+from notifications_utils.request_timings import ENVIRON_KEY, RequestTimings, timer
 from tests import service_json
 from tests.conftest import (
     create_api_user_active,
@@ -134,6 +147,158 @@ def test_generate_headers_sets_request_id_if_in_request_context(notify_admin):
     assert headers["X-B3-SpanId"] == request_context.request.span_id
 
 
+def test_api_calls_are_timed_by_endpoint_and_status(notify_admin, mocker):
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+    not_found = requests.HTTPError(response=Mock(status_code=404, json=dict))
+    mocker.patch.object(
+        api_client.request_session,
+        "request",
+        side_effect=[Mock(status_code=200), Mock(status_code=200), not_found],
+    )
+
+    with notify_admin.test_request_context() as request_context:
+        timings = RequestTimings(sampled=True)
+        request_context.request.environ[ENVIRON_KEY] = timings
+        api_client._perform_request(
+            "GET", "http://api/service/6ce466d0-fd6a-11e5-82f5-e0accb9d11a6", {}
+        )
+        api_client._perform_request(
+            "GET", "http://api/service/7ce466d0-fd6a-11e5-82f5-e0accb9d11a6", {}
+        )
+        with pytest.raises(HTTPError):
+            api_client._perform_request("GET", "http://api/user/1234", {})
+
+    assert timings.calls == {
+        ("api", "GET /service/<id>", 200): 2,
+        ("api", "GET /user/<id>", 404): 1,
+    }
+
+
+def test_get_many_cached_calls_overlap_without_sharing_the_request(
+    notify_admin, mocker
+):
+    mocker.patch("app.extensions.RedisClient.get_many", return_value=[None] * 3)
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+    # Every call waits until all three are in flight at once
+    barrier = Barrier(3, timeout=5)
+
+    def get_service(service_id):
+        with timer("api", "GET /service/<id>"):
+            barrier.wait()
+        assert not has_request_context()
+        return {
+            "headers": api_client.generate_headers("api_token"),
+            "deadline": g.api_deadline,
+        }
+
+    with notify_admin.test_request_context() as request_context:
+        request.environ[DEADLINE_KEY] = 1234
+        request.environ[ENVIRON_KEY] = RequestTimings(sampled=True)
+        responses = get_many_cached("service-{service_id}", get_service, "abc")
+        # The request is still usable once the calls have finished
+        assert request.environ["werkzeug.request"] is request_context.request
+
+    assert set(responses) == {"a", "b", "c"}
+    for response in responses.values():
+        assert response["headers"]["X-B3-TraceId"] == request_context.request.request_id
+        assert response["headers"]["X-B3-SpanId"] == request_context.request.span_id
+        assert response["deadline"] == 1234
+    assert request_context.request.environ[ENVIRON_KEY].calls == {
+        ("api", "GET /service/<id>", None): 3
+    }
+
+
+def test_api_clients_share_one_session(notify_admin):
+    api_client = NotifyAdminAPIClient()
+    with set_config(notify_admin, "API_CONNECT_TIMEOUT", 2), set_config(
+        notify_admin, "API_READ_TIMEOUT", 20
+    ):
+        api_client.init_app(notify_admin)
+
+    assert api_client.request_session is api_session
+    assert notification_api_client.request_session is api_session
+    assert api_client.timeout == (2, 20)
+
+
+def test_token_cache_reuses_tokens_until_they_are_too_old(mocker):
+    mock_create_token = mocker.patch(
+        "app.notify_client.create_jwt_token", side_effect=["token 1", "token 2"]
+    )
+    mocker.patch("app.notify_client.time.monotonic", side_effect=[100, 109, 110, 110])
+    tokens = TokenCache()
+
+    assert [tokens.get("secret", "admin", 10) for _ in range(3)] == [
+        "token 1",
+        "token 1",
+        "token 2",
+    ]
+    assert mock_create_token.call_count == 2
+
+
+def test_api_client_reuses_tokens(notify_admin, mocker):
+    mock_create_token = mocker.patch(
+        "app.notify_client.create_jwt_token", return_value="token"
+    )
+    mocker.patch("app.notify_client.api_tokens", TokenCache())
+    api_client = NotifyAdminAPIClient()
+    api_client.init_app(notify_admin)
+
+    for _ in range(3):
+        url, kwargs = api_client._create_request_objects(
+            "/service", {"name": "a"}, {"page": 2}
+        )
+
+    assert mock_create_token.call_count == 1
+    assert url == "http://you-forgot-to-mock-an-api-call-to/service"
+    assert kwargs["headers"]["Authorization"] == "Bearer token"
+    assert kwargs["data"] == '{"name": "a"}'
+    assert kwargs["params"] == {"page": 2}
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def keep_alive_server():
+    server = HTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_api_session_reuses_connections(keep_alive_server):
+    session = APISession()
+
+    for _ in range(3):
+        session.get(keep_alive_server)
+
+    assert session.stats == {
+        "pool_size": 10,
+        "requests": 3,
+        "new_connections": 1,
+        "reused_connections": 2,
+        "reuse_rate": 0.667,
+    }
+
+    session.reset()
+
+    assert session.stats["requests"] == 0
+    assert session.stats["reuse_rate"] is None
+
+
 def test_get_notification_status_by_service(mocker):
     mock_get = mocker.patch.object(notification_api_client, "get")
     start_date = date(2019, 4, 1)
@@ -0,0 +1,270 @@
+import time
+from unittest.mock import Mock
+
+import pytest
+from flask import request_started
+from notifications_python_client.errors import HTTPError
+
+from app.notify_client.resilience import (
+    DEADLINE_KEY,
+    APICircuitOpen,
+    APIDeadlineExceeded,
+    APIResilience,
+    CircuitBreaker,
+)
+from tests.conftest import SERVICE_ONE_ID, set_config_values
+
+
+def http_error(status_code):
+    return HTTPError(Mock(status_code=status_code, json=dict))
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = Mock(return_value=1000)
+    mocker.patch("app.notify_client.resilience.monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def resilience(notify_admin):
+    resilience = APIResilience()
+    with set_config_values(
+        notify_admin,
+        {
+            "API_REQUEST_DEADLINE": 10,
+            "API_CIRCUIT_FAILURE_RATE": 0.5,
+            "API_CIRCUIT_MIN_CALLS": 4,
+            "API_CIRCUIT_WINDOW": 30,
+            "API_CIRCUIT_COOLDOWN": 15,
+            "API_STALE_MAX_AGE": 60,
+            "API_STALE_CACHE_SIZE": 2,
+            "API_HEDGE_AFTER": 0,
+        },
+    ):
+        resilience.init_app(notify_admin)
+    return resilience
+
+
+def test_circuit_breaker_opens_when_too_many_calls_fail(clock):
+    breaker = CircuitBreaker(
+        "GET /service/<id>",
+        Mock(),
+        failure_rate=0.5,
+        min_calls=4,
+        window=30,
+        cooldown=15,
+    )
+
+    for failed in (True, False, True):
+        assert breaker.allow()
+        breaker.record(failed)
+    assert breaker.state == "closed"
+
+    breaker.record(True)
+    assert breaker.state == "open"
+    assert not breaker.allow()
+    breaker.logger.warning.assert_called_once_with(
+        "API circuit for %s is %s", "GET /service/<id>", "open"
+    )
+
+    clock.return_value += 15
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    assert not breaker.allow()
+
+    breaker.record(True)
+    assert breaker.state == "open"
+
+    clock.return_value += 15
+    assert breaker.allow()
+    breaker.record(False)
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_circuit_breaker_forgets_calls_outside_its_window(clock):
+    breaker = CircuitBreaker(
+        "GET /user", Mock(), failure_rate=0.5, min_calls=4, window=30, cooldown=15
+    )
+
+    for _ in range(3):
+        breaker.record(True)
+    clock.return_value += 31
+    breaker.record(True)
+
+    assert breaker.state == "closed"
+    assert len(breaker.calls) == 1
+
+
+def test_deadline_starts_with_the_request(notify_admin, clock):
+    with notify_admin.test_request_context() as request_context:
+        request_started.send(notify_admin)
+
+    assert request_context.request.environ[DEADLINE_KEY] == (
+        1000 + notify_admin.config["API_REQUEST_DEADLINE"]
+    )
+
+
+@pytest.mark.parametrize(
+    ("timeout", "expected_timeout"),
+    [
+        ((5, 30), (4, 4)),
+        ((2, 3), (2, 3)),
+        (30, 4),
+        (None, 4),
+    ],
+)
+def test_calls_get_whatever_is_left_of_the_deadline(
+    notify_admin, resilience, clock, timeout, expected_timeout
+):
+    send = Mock()
+
+    with notify_admin.test_request_context() as request_context:
+        request_context.request.environ[DEADLINE_KEY] = 1004
+        resilience.call(
+            "GET /user", "GET", "http://api/user", send, {"timeout": timeout}
+        )
+
+    send.assert_called_once_with({"timeout": expected_timeout})
+
+
+def test_calls_fail_once_the_deadline_has_passed(notify_admin, resilience, clock):
+    send = Mock()
+
+    with notify_admin.test_request_context() as request_context:
+        request_context.request.environ[DEADLINE_KEY] = 1000
+        with pytest.raises(APIDeadlineExceeded) as error:
+            resilience.call("GET /user", "GET", "http://api/user", send, {})
+
+    assert error.value.status_code == 503
+    assert not send.called
+    assert resilience.stats["deadline_exceeded"] == {"GET /user": 1}
+
+
+def test_streamed_responses_are_not_held_to_the_deadline(
+    notify_admin, client_request, mock_get_service_data_retention, mocker, clock
+):
+    def get_page(method, url, kwargs):
+        page = int(kwargs["params"]["page"])
+        clock.return_value += notify_admin.config["API_REQUEST_DEADLINE"] / 3
+        return Mock(
+            status_code=200,
+            json=lambda: {
+                "notifications": [
+                    {
+                        "recipient": f"202555010{page}",
+                        "template_name": "Two week reminder",
+                        "created_by_name": None,
+                        "job_name": None,
+                        "provider_response": None,
+                        "status": "delivered",
+                        "created_at": "2016-01-01 11:09:00.061258",
+                        "carrier": "",
+                    }
+                ],
+                "links": {"next": "more"} if page < 5 else {},
+            },
+        )
+
+    mock_send = mocker.patch(
+        "notifications_python_client.base.BaseAPIClient._perform_request",
+        side_effect=get_page,
+    )
+
+    response = client_request.get_response(
+        "main.download_notifications_csv",
+        service_id=SERVICE_ONE_ID,
+        number_of_days="seven_day",
+        message_type="sms",
+    )
+
+    assert [line.split(",")[0] for line in response.text.splitlines()] == [
+        "Phone Number",
+        "2025550101",
+        "2025550102",
+        "2025550103",
+        "2025550104",
+        "2025550105",
+    ]
+    assert mock_send.call_count == 5
+
+
+def test_calls_outside_a_request_have_no_deadline(resilience):
+    send = Mock()
+
+    resilience.call("GET /user", "GET", "http://api/user", send, {"timeout": 30})
+
+    send.assert_called_once_with({"timeout": 30})
+
+
+def test_open_circuit_fails_fast_or_gives_the_last_response(resilience):
+    ok = Mock(status_code=200)
+    send = Mock(side_effect=[ok] + [http_error(500)] * 3)
+    url = "http://api/service/1234"
+
+    resilience.call("GET /service/<id>", "GET", url, send, {"params": {"a": 1}})
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            resilience.call("GET /service/<id>", "GET", url, send, {"params": {"a": 1}})
+
+    assert resilience.stats["circuits"] == {"GET /service/<id>": "open"}
+    assert (
+        resilience.call("GET /service/<id>", "GET", url, send, {"params": {"a": 1}})
+        is ok
+    )
+    with pytest.raises(APICircuitOpen):
+        resilience.call("GET /service/<id>", "GET", url, send, {"params": {"a": 2}})
+
+    assert send.call_count == 4
+    assert resilience.stats["stale_response"] == {"GET /service/<id>": 1}
+    assert resilience.stats["circuit_open"] == {"GET /service/<id>": 1}
+
+
+def test_client_errors_do_not_open_the_circuit(resilience):
+    send = Mock(side_effect=http_error(404))
+
+    for _ in range(10):
+        with pytest.raises(HTTPError):
+            resilience.call("GET /user/<id>", "GET", "http://api/user/1", send, {})
+
+    assert resilience.stats["circuits"] == {"GET /user/<id>": "closed"}
+
+
+def test_slow_gets_are_hedged(notify_admin, resilience):
+    resilience.hedge_after = 0.05
+    responses = iter(["slow", "fast"])
+
+    def send(kwargs):
+        response = next(responses)
+        if response == "slow":
+            time.sleep(0.5)
+        return response
+
+    assert resilience.call("GET /user", "GET", "http://api/user", send, {}) == "fast"
+    assert resilience.stats["hedged"] == {"GET /user": 1}
+
+
+def test_hedged_gets_wait_for_the_other_answer_after_a_server_error(resilience):
+    resilience.hedge_after = 0.05
+    responses = iter(["slow", "error"])
+
+    def send(kwargs):
+        response = next(responses)
+        if response == "error":
+            raise http_error(502)
+        time.sleep(0.2)
+        return response
+
+    assert resilience.call("GET /user", "GET", "http://api/user", send, {}) == "slow"
+
+
+def test_fast_gets_and_other_methods_are_not_hedged(resilience):
+    resilience.hedge_after = 0.5
+    send = Mock(return_value="ok")
+
+    assert resilience.call("GET /user", "GET", "http://api/user", send, {}) == "ok"
+    assert resilience.call("POST /user", "POST", "http://api/user", send, {}) == "ok"
+
+    assert send.call_count == 2
+    assert resilience.stats["hedged"] == {}
@@ -43,6 +43,44 @@ def test_client_gets_service(mocker):
     mock_get.assert_called_once_with("/service/foo")
 
 
+def test_client_gets_service_names_from_cache_and_falls_back_to_api(mocker):
+    mock_redis_get_many = mocker.patch(
+        "app.extensions.RedisClient.get_many",
+        return_value=[b'{"data": {"name": "Cached"}}', None, None],
+    )
+    mock_get_services = mocker.patch.object(
+        service_api_client,
+        "get_services",
+        return_value={
+            "data": [
+                {"id": "1", "name": "Not used, already cached"},
+                {"id": "2", "name": "Two"},
+                {"id": "3", "name": "Three"},
+                {"id": "4", "name": "Not asked for"},
+            ]
+        },
+    )
+
+    assert service_api_client.get_service_names(["1", "2", "3", "2"]) == {
+        "1": "Cached",
+        "2": "Two",
+        "3": "Three",
+    }
+    mock_redis_get_many.assert_called_once_with(["service-1", "service-2", "service-3"])
+    mock_get_services.assert_called_once_with()
+
+
+def test_client_gets_service_names_without_api_call_if_all_cached(mocker):
+    mocker.patch(
+        "app.extensions.RedisClient.get_many",
+        return_value=[b'{"data": {"name": "One"}}'],
+    )
+    mock_get_services = mocker.patch.object(service_api_client, "get_services")
+
+    assert service_api_client.get_service_names(["1"]) == {"1": "One"}
+    assert mock_get_services.called is False
+
+
 @pytest.mark.parametrize("limit_days", [None, 30])
 def test_client_gets_service_statistics(mocker, limit_days):
     client = ServiceAPIClient()
@@ -52,6 +52,41 @@ def test_get_template_folders_calls_correct_api_endpoint(mocker):
     mock_redis_set.assert_called_once_with(redis_key, '{"a": "b"}', ex=604800)
 
 
+def test_get_template_folders_for_services_only_calls_api_for_uncached(
+    notify_admin, mocker
+):
+    service_ids = [str(uuid.uuid4()) for _ in range(3)]
+    mock_redis_get_many = mocker.patch(
+        "app.extensions.RedisClient.get_many",
+        return_value=[None, b'[{"id": "cached"}]', None],
+    )
+    mocker.patch("app.extensions.RedisClient.get", return_value=None)
+    mock_redis_set = mocker.patch("app.extensions.RedisClient.set")
+    mock_api_get = mocker.patch(
+        "app.notify_client.NotifyAdminAPIClient.get",
+        side_effect=lambda url: {"template_folders": [{"id": url}]},
+    )
+
+    with notify_admin.test_request_context():
+        ret = TemplateFolderAPIClient().get_template_folders_for_services(service_ids)
+
+    assert ret == {
+        service_ids[0]: [{"id": f"/service/{service_ids[0]}/template-folder"}],
+        service_ids[1]: [{"id": "cached"}],
+        service_ids[2]: [{"id": f"/service/{service_ids[2]}/template-folder"}],
+    }
+    mock_redis_get_many.assert_called_once_with(
+        [f"service-{service_id}-template-folders" for service_id in service_ids]
+    )
+    assert sorted(call.args[0] for call in mock_api_get.call_args_list) == sorted(
+        [
+            f"/service/{service_ids[0]}/template-folder",
+            f"/service/{service_ids[2]}/template-folder",
+        ]
+    )
+    assert mock_redis_set.call_count == 2
+
+
 def test_move_templates_and_folders(mocker):
     mock_redis_delete = mocker.patch("app.extensions.RedisClient.delete")
     mock_api_post = mocker.patch("app.notify_client.NotifyAdminAPIClient.post")
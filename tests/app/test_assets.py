@@ -1,5 +1,68 @@
+import pytest
+
+from app.utils.static_files import get_precompressed_encodings
+
+
 def test_static_404s_return(client_request):
     client_request.get_response_from_url(
         "/static/images/some-image-that-doesnt-exist.png",
         _expected_status=404,
     )
+
+
+@pytest.fixture
+def static_folder(notify_admin, tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "main.css").write_text("body { color: red }")
+    (tmp_path / "css" / "main.css.gz").write_bytes(b"gzipped")
+    (tmp_path / "css" / "main.css.br").write_bytes(b"brotlied")
+    (tmp_path / "favicon.ico").write_bytes(b"icon")
+    original_static_folder = notify_admin.static_folder
+    notify_admin.static_folder = str(tmp_path)
+    get_precompressed_encodings.cache_clear()
+    yield tmp_path
+    notify_admin.static_folder = original_static_folder
+    get_precompressed_encodings.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("accept_encoding", "expected_encoding", "expected_content"),
+    [
+        ("gzip, deflate, br", "br", b"brotlied"),
+        ("gzip, deflate", "gzip", b"gzipped"),
+        ("br;q=0, gzip", "gzip", b"gzipped"),
+        ("", None, b"body { color: red }"),
+    ],
+)
+def test_static_files_are_sent_precompressed_if_accepted(
+    client_request,
+    static_folder,
+    accept_encoding,
+    expected_encoding,
+    expected_content,
+):
+    response = client_request.get_response_from_url(
+        "/static/css/main.css",
+        _headers={"Accept-Encoding": accept_encoding},
+    )
+
+    assert response.headers.get("Content-Encoding") == expected_encoding
+    assert response.mimetype == "text/css"
+    assert "Accept-Encoding" in response.vary
+    assert response.get_data() == expected_content
+
+
+def test_fingerprinted_static_files_are_immutable(client_request, static_folder):
+    response = client_request.get_response_from_url(
+        "/static/favicon.ico?abc123",
+        _headers={"Accept-Encoding": "br"},
+    )
+
+    assert "Content-Encoding" not in response.headers
+    assert response.get_data() == b"icon"
+    assert response.cache_control.immutable
+    assert response.cache_control.public
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+    response = client_request.get_response_from_url("/static/favicon.ico")
+    assert not response.cache_control.immutable
@@ -0,0 +1,6 @@
+from tests.benchmarks.bench_import_time import check_lazy_loading
+
+
+def test_importing_the_app_does_not_load_reference_data():
+    # Runs in a new interpreter, because the tests have used everything already
+    check_lazy_loading()
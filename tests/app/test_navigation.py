@@ -130,6 +130,7 @@ EXCLUDED_ENDPOINTS = tuple(
             "live_services",
             "live_services_csv",
             "load_test",
+            "load_test_results",
             "manage_org_users",
             "manage_template_folder",
             "manage_users",
@@ -251,6 +252,7 @@ EXCLUDED_ENDPOINTS = tuple(
             "verify_email",
             "view_job",
             "view_job_csv",
+            "view_job_progress",
             "view_job_updates",
             "view_jobs",
             "view_notification",
@@ -327,7 +329,15 @@ def test_all_endpoints_are_covered(navigation_instance):
     covered_endpoints = (
         navigation_instance.endpoints_with_navigation
         + EXCLUDED_ENDPOINTS
-        + ("static", "status.show_status", "status.show_redis_status", "metrics")
+        + (
+            "static",
+            "status.show_status",
+            "status.show_redis_status",
+            "status.show_cache_status",
+            "status.show_api_connection_status",
+            "status.show_request_timings",
+            "metrics",
+        )
     )
 
     for endpoint in all_endpoints:
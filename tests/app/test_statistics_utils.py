@@ -1,7 +1,12 @@
 import pytest
 
 from app.models.job import Job
-from app.statistics_utils import add_rates_to, statistics_by_state, sum_of_statistics
+from app.statistics_utils import (
+    ServicesStatistics,
+    add_rates_to,
+    statistics_by_state,
+    sum_of_statistics,
+)
 
 
 @pytest.mark.parametrize(
@@ -156,3 +161,66 @@ def test_add_rate_to_job_preserves_initial_fields():
         == 0
     )
     assert resp.id == "foo"
+
+
+def _service(name, requested=0, failed=0, active=True, restricted=False, **kwargs):
+    return {
+        "name": name,
+        "active": active,
+        "restricted": restricted,
+        "created_at": kwargs.get("created_at", "2020-01-01 00:00:00"),
+        "statistics": {
+            "sms": {"requested": requested, "delivered": 0, "failed": failed},
+            "email": {"requested": 0, "delivered": 0, **kwargs.get("email", {})},
+        },
+    }
+
+
+def test_services_statistics_sorts_active_then_most_used_then_newest():
+    services = [
+        _service("inactive", requested=1000, active=False, email={"failed": 0}),
+        _service("quiet", requested=1, email={"failed": 0}),
+        _service("older busy", requested=10, email={"failed": 0}),
+        _service(
+            "newer busy",
+            requested=10,
+            created_at="2021-01-01 00:00:00",
+            email={"failed": 0},
+        ),
+        _service("trial", requested=5000, restricted=True, email={"failed": 0}),
+        _service("another quiet", requested=1, email={"failed": 0}),
+    ]
+
+    live = ServicesStatistics(services).filter_and_sort()
+    trial = ServicesStatistics(services).filter_and_sort(trial_mode_services=True)
+
+    assert [service["name"] for service in live.services] == [
+        "newer busy",
+        "older busy",
+        "quiet",
+        "another quiet",
+        "inactive",
+    ]
+    assert [service["name"] for service in trial.services] == ["trial"]
+
+
+def test_services_statistics_global_stats_reads_failure_or_failed():
+    services = [
+        _service("a", requested=4, failed=1, email={"failed": 2}),
+        _service("b", requested=6, failed=2, email={"failure": 3, "failed": None}),
+    ]
+
+    assert ServicesStatistics(services).global_stats == {
+        "sms": {"delivered": 0, "failed": 3, "requested": 10, "failure_rate": "30.0"},
+        "email": {"delivered": 0, "failed": 5, "requested": 0, "failure_rate": "0"},
+    }
+
+
+def test_services_statistics_with_no_services():
+    statistics = ServicesStatistics([]).filter_and_sort()
+
+    assert statistics.services == []
+    assert statistics.global_stats == {
+        "sms": {"delivered": 0, "failed": 0, "requested": 0, "failure_rate": "0"},
+        "email": {"delivered": 0, "failed": 0, "requested": 0, "failure_rate": "0"},
+    }
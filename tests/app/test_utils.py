@@ -2,7 +2,8 @@ import pytest
 from flask import Flask
 
 from app import create_app
-from app.utils import merge_jsonlike
+from app.utils import conditional_json_response, merge_jsonlike
+from app.utils.render_cache import digest
 
 
 @pytest.mark.parametrize(
@@ -61,3 +62,51 @@ def test_commit_hash():
 
     with app.app_context() as current_app:
         assert current_app.app.config["COMMIT_HASH"] == "-------"
+
+
+def test_conditional_json_response_renders_and_sets_etag(notify_admin, mocker):
+    get_json = mocker.Mock(return_value={"a": "b"})
+
+    with notify_admin.test_request_context():
+        response = conditional_json_response({"count": 1}, get_json)
+
+    assert response.status_code == 200
+    assert response.json == {"a": "b"}
+    assert response.get_etag() == (digest({"count": 1}), False)
+    assert response.cache_control.no_cache
+    assert response.cache_control.private
+    get_json.assert_called_once_with()
+
+
+def test_conditional_json_response_returns_not_modified(notify_admin, mocker):
+    get_json = mocker.Mock()
+
+    with notify_admin.test_request_context(
+        headers={"If-None-Match": f'"{digest({"count": 1})}"'}
+    ):
+        response = conditional_json_response({"count": 1}, get_json)
+
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert get_json.called is False
+
+
+@pytest.mark.parametrize(
+    ("method", "if_none_match"),
+    [
+        ("GET", '"some-other-version"'),
+        ("POST", f'"{digest({"count": 1})}"'),
+    ],
+)
+def test_conditional_json_response_renders_if_not_a_matching_get(
+    notify_admin, mocker, method, if_none_match
+):
+    get_json = mocker.Mock(return_value={"a": "b"})
+
+    with notify_admin.test_request_context(
+        method=method, headers={"If-None-Match": if_none_match}
+    ):
+        response = conditional_json_response({"count": 1}, get_json)
+
+    assert response.status_code == 200
+    assert response.json == {"a": "b"}
@@ -4,10 +4,13 @@ from io import StringIO
 
 import pytest
 
+from app.models.spreadsheet import Spreadsheet
 from app.utils.csv import (
+    CSVReport,
     convert_report_date_to_preferred_timezone,
     generate_notifications_csv,
     get_errors_for_csv,
+    stream_csv,
 )
 from tests.conftest import fake_uuid
 
@@ -386,3 +389,41 @@ def test_convert_report_date_to_preferred_timezone():
     original = "2023-11-16 05:00:00"
     altered = convert_report_date_to_preferred_timezone(original)
     assert altered == "2023-11-16 12:00:00 AM US/Eastern"
+
+
+def test_stream_csv_yields_one_line_per_row():
+    rows = [["a", "b, c"], [1, 'say "hi"'], []]
+
+    lines = list(stream_csv(iter(rows)))
+
+    assert lines == ['a,"b, c"\r\n', '1,"say ""hi"""\r\n', "\r\n"]
+    assert "".join(lines) == Spreadsheet.from_rows(rows).as_csv_data
+
+
+def test_csv_report_looks_up_keys_and_calls_functions(notify_admin):
+    report = CSVReport(
+        ("Name", "name"),
+        ("Shouting", lambda row: row["name"].upper()),
+        ("First", 0),
+    )
+    results = [{"name": "alice", 0: "a"}, {"name": "bob", 0: "b"}]
+
+    with notify_admin.test_request_context():
+        response = report.response(
+            iter(results), filename="People.csv", disposition="inline"
+        )
+        assert response.is_streamed
+        assert response.content_type == "text/csv; charset=utf-8"
+        assert response.headers["Content-Disposition"] == (
+            'inline; filename="People.csv"'
+        )
+        assert response.get_data(as_text=True) == (
+            "Name,Shouting,First\r\n" "alice,ALICE,a\r\n" "bob,BOB,b\r\n"
+        )
+
+
+def test_csv_report_fails_before_responding_if_a_row_cant_be_made(notify_admin):
+    report = CSVReport(("Name", "name"))
+
+    with notify_admin.test_request_context(), pytest.raises(KeyError):
+        report.response(iter([{"name": "alice"}, {}]), filename="People.csv")
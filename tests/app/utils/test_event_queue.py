@@ -0,0 +1,134 @@
+from threading import Event
+from unittest.mock import Mock, call
+
+import pytest
+from notifications_python_client.errors import HTTPError
+
+from app.utils.event_queue import EventQueue
+from tests.conftest import set_config_values
+
+
+def http_error(status_code):
+    return HTTPError(Mock(status_code=status_code, json=dict))
+
+
+@pytest.fixture
+def event_queue(notify_admin, mocker):
+    mocker.patch("app.events_api_client.check_inactive_service")
+    event_queue = EventQueue()
+    with set_config_values(
+        notify_admin,
+        {
+            "EVENT_QUEUE_SIZE": 2,
+            "EVENT_BATCH_SIZE": 20,
+            "EVENT_MAX_ATTEMPTS": 3,
+            "EVENT_RETRY_BACKOFF": 0.5,
+            "EVENT_FLUSH_TIMEOUT": 5,
+        },
+    ):
+        event_queue.init_app(notify_admin)
+    yield event_queue
+    event_queue.stop()
+
+
+def test_events_are_sent_straight_away_without_a_queue(notify_admin, mock_events):
+    event_queue = EventQueue()
+    event_queue.init_app(notify_admin)
+
+    event_queue.put("archive_user", {"user_id": "1234"})
+
+    mock_events.assert_called_once_with("archive_user", {"user_id": "1234"})
+    assert event_queue._thread is None
+
+
+def test_events_are_sent_in_the_background(event_queue, mocker):
+    mock_create_event = mocker.patch("app.events_api_client.create_queued_event")
+
+    event_queue.put("archive_user", {"user_id": "1234"})
+    event_queue.put("archive_service", {"service_id": "5678"})
+    event_queue.stop()
+
+    assert mock_create_event.call_args_list == [
+        call("archive_user", {"user_id": "1234"}),
+        call("archive_service", {"service_id": "5678"}),
+    ]
+    assert event_queue.stats == {
+        "waiting": 0,
+        "maxsize": 2,
+        "sent": 2,
+        "retried": 0,
+        "failed": 0,
+        "dropped": 0,
+    }
+
+
+def test_queueing_an_event_checks_the_service_is_active(event_queue, mocker):
+    mocker.patch(
+        "app.events_api_client.check_inactive_service", side_effect=PermissionError
+    )
+    mock_create_event = mocker.patch("app.events_api_client.create_queued_event")
+
+    with pytest.raises(PermissionError):
+        event_queue.put("archive_user", {"user_id": "1234"})
+    event_queue.stop()
+
+    assert not mock_create_event.called
+
+
+def test_server_errors_are_tried_again_with_backoff(event_queue, mocker):
+    mock_sleep = mocker.patch("app.utils.event_queue.time.sleep")
+    mock_create_event = mocker.patch(
+        "app.events_api_client.create_queued_event",
+        side_effect=[http_error(503), http_error(500), None, http_error(500)] * 2,
+    )
+
+    event_queue.put("archive_user", {"user_id": "1234"})
+    event_queue.put("archive_service", {"service_id": "5678"})
+    event_queue.stop()
+
+    assert mock_create_event.call_count == 6
+    assert mock_sleep.call_args_list == [call(0.5), call(1.0), call(0.5), call(1.0)]
+    assert event_queue.stats["sent"] == 1
+    assert event_queue.stats["retried"] == 4
+    assert event_queue.stats["failed"] == 1
+
+
+def test_client_errors_are_not_tried_again(event_queue, mocker):
+    mock_create_event = mocker.patch(
+        "app.events_api_client.create_queued_event", side_effect=http_error(400)
+    )
+
+    event_queue.put("archive_user", {"user_id": "1234"})
+    event_queue.stop()
+
+    assert mock_create_event.call_count == 1
+    assert event_queue.stats["failed"] == 1
+
+
+def test_events_are_dropped_when_too_many_are_waiting(event_queue, mocker):
+    sending, finish_sending = Event(), Event()
+
+    def create_event(event_type, event_data):
+        sending.set()
+        finish_sending.wait(5)
+
+    mock_create_event = mocker.patch(
+        "app.events_api_client.create_queued_event", side_effect=create_event
+    )
+
+    event_queue.put("archive_user", {"user_id": "1"})
+    sending.wait(5)
+    for user_id in "234":
+        event_queue.put("archive_user", {"user_id": user_id})
+
+    assert event_queue.stats["waiting"] == 2
+    assert event_queue.stats["dropped"] == 1
+
+    finish_sending.set()
+    event_queue.stop()
+
+    assert [args[1]["user_id"] for args, _ in mock_create_event.call_args_list] == [
+        "1",
+        "2",
+        "3",
+    ]
@@ -0,0 +1,105 @@
+from unittest.mock import Mock
+
+import jinja2
+import pytest
+
+from app.utils.jinja_cache import compile_templates, get_bytecode_cache
+
+
+@pytest.fixture
+def template_folder(tmp_path):
+    folder = tmp_path / "templates"
+    folder.mkdir()
+    (folder / "page.html").write_text("{% extends 'base.html' %}")
+    (folder / "base.html").write_text("<p>{{ 1 + 1 }}</p>")
+    (folder / "components.njk").write_text("{% macro thing() %}{% endmacro %}")
+    (folder / "notes.md").write_text("not a template")
+    return folder
+
+
+def _environment(template_folder, bytecode_cache):
+    return jinja2.Environment(
+        loader=jinja2.FileSystemLoader(template_folder),
+        bytecode_cache=bytecode_cache,
+    )
+
+
+def test_get_bytecode_cache_is_off_without_a_directory():
+    assert get_bytecode_cache(None) is None
+    assert get_bytecode_cache("") is None
+
+
+def test_bytecode_cache_is_versioned_by_jinja_and_converter(tmp_path):
+    bytecode_cache = get_bytecode_cache(str(tmp_path / "cache"))
+
+    assert (tmp_path / "cache").is_dir()
+    assert bytecode_cache.pattern.startswith(f"__jinja2_{jinja2.__version__}-")
+
+
+def test_bytecode_cache_is_only_for_this_user(tmp_path):
+    get_bytecode_cache(str(tmp_path / "cache"))
+
+    assert (tmp_path / "cache").stat().st_mode & 0o777 == 0o700
+
+
+@pytest.mark.parametrize("mode", [0o777, 0o750, 0o705])
+def test_bytecode_cache_refuses_a_directory_others_can_use(tmp_path, mode):
+    (tmp_path / "cache").mkdir()
+    (tmp_path / "cache").chmod(mode)
+
+    with pytest.raises(RuntimeError):
+        get_bytecode_cache(str(tmp_path / "cache"))
+
+
+def test_bytecode_cache_refuses_a_directory_owned_by_someone_else(tmp_path, mocker):
+    (tmp_path / "cache").mkdir(mode=0o700)
+    mocker.patch(
+        "app.utils.jinja_cache.os.getuid",
+        return_value=(tmp_path / "cache").stat().st_uid + 1,
+    )
+
+    with pytest.raises(RuntimeError):
+        get_bytecode_cache(str(tmp_path / "cache"))
+
+
+def test_bytecode_cache_refuses_a_symlink(tmp_path):
+    (tmp_path / "elsewhere").mkdir(mode=0o700)
+    (tmp_path / "cache").symlink_to(tmp_path / "elsewhere")
+
+    with pytest.raises(RuntimeError):
+        get_bytecode_cache(str(tmp_path / "cache"))
+
+
+def test_compile_templates_shares_bytecode_between_environments(
+    tmp_path, template_folder
+):
+    bytecode_cache = get_bytecode_cache(str(tmp_path / "cache"))
+
+    assert compile_templates(_environment(template_folder, bytecode_cache)) == 3
+    assert len(list((tmp_path / "cache").iterdir())) == 3
+
+    environment = _environment(template_folder, bytecode_cache)
+    environment.compile = Mock(side_effect=AssertionError("should not compile"))
+    assert compile_templates(environment) == 3
+    assert environment.get_template("page.html").render() == "<p>2</p>"
+
+
+def test_compile_templates_logs_errors_if_given_a_logger(template_folder):
+    (template_folder / "broken.html").write_text("{% if %}")
+    environment = _environment(template_folder, None)
+    logger = Mock()
+
+    with pytest.raises(jinja2.TemplateSyntaxError):
+        compile_templates(environment)
+
+    assert compile_templates(environment, logger=logger) == 4
+    logger.exception.assert_called_once_with(
+        "Error compiling template %s", "broken.html"
+    )
+
+
+def test_compile_templates_command_needs_a_cache_directory(notify_admin):
+    result = notify_admin.test_cli_runner().invoke(args=["compile-templates"])
+
+    assert result.exit_code == 1
+    assert "JINJA_BYTECODE_CACHE_DIR is not set" in result.output
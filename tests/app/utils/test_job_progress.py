@@ -0,0 +1,153 @@
+import json
+
+import pytest
+
+from app.models.job import Job
+from app.utils.job_progress import JobProgress, get_job_progress, get_progress_delta
+from tests import job_json
+from tests.conftest import SERVICE_ONE_ID
+
+
+def _job(api_user_active, *statistics, **kwargs):
+    job = job_json(SERVICE_ONE_ID, api_user_active, **kwargs)
+    job["statistics"] = [
+        {"status": status, "count": count} for status, count in statistics
+    ]
+    return job
+
+
+@pytest.fixture
+def job_progress(notify_admin):
+    job_progress = JobProgress()
+    job_progress.init_app(notify_admin)
+    job_progress.interval = 0
+    job_progress.keep_alive = 0.01
+    return job_progress
+
+
+@pytest.mark.parametrize(
+    ("job_status", "statistics", "expected_finished"),
+    [
+        ("in progress", [("delivered", 2)], False),
+        ("finished", [("delivered", 2)], False),
+        ("finished", [("delivered", 2), ("permanent-failure", 1)], True),
+        ("cancelled", [], True),
+    ],
+)
+def test_get_job_progress(
+    api_user_active,
+    job_status,
+    statistics,
+    expected_finished,
+):
+    job = Job(
+        _job(
+            api_user_active,
+            *statistics,
+            job_status=job_status,
+            notification_count=3,
+        )
+    )
+
+    progress = get_job_progress(job)
+
+    assert progress["status"] == job_status
+    assert progress["finished"] is expected_finished
+    assert progress["counts"][""] == 3
+
+
+def test_get_progress_delta_only_includes_what_has_changed():
+    previous = {
+        "status": "in progress",
+        "counts": {"": 3, "pending": 3, "delivered": 0, "failed": 0},
+        "finished": False,
+    }
+    progress = {
+        "status": "in progress",
+        "counts": {"": 3, "pending": 1, "delivered": 2, "failed": 0},
+        "finished": False,
+    }
+
+    assert get_progress_delta(None, progress) == progress
+    assert get_progress_delta(previous, progress) == {
+        "counts": {"pending": 1, "delivered": 2},
+    }
+    assert get_progress_delta(progress, progress) == {}
+
+
+def test_stream_sends_progress_until_job_has_finished(
+    notify_admin,
+    mocker,
+    api_user_active,
+    fake_uuid,
+    job_progress,
+):
+    mock_get_job = mocker.patch(
+        "app.job_api_client.get_job",
+        side_effect=[
+            {"data": _job(api_user_active, ("delivered", 1), notification_count=2)},
+            {
+                "data": _job(
+                    api_user_active,
+                    ("delivered", 1),
+                    ("permanent-failure", 1),
+                    notification_count=2,
+                )
+            },
+        ],
+    )
+
+    with notify_admin.app_context():
+        stream = job_progress.stream(SERVICE_ONE_ID, fake_uuid)
+    events = list(stream)
+
+    assert events[0] == "retry: 0\n\n"
+    events = [event for event in events[1:] if not event.startswith(":")]
+    assert [event.split("\n")[0] for event in events] == [
+        "event: progress",
+        "event: progress",
+        "event: end",
+    ]
+    assert json.loads(events[1].split("\n")[1].removeprefix("data: ")) == {
+        "counts": {"pending": 0, "failed": 1},
+        "finished": True,
+    }
+    assert mock_get_job.call_count == 2
+    assert job_progress.stats == {"jobs": 0, "subscribers": 0}
+
+
+def test_stream_falls_back_to_polling_if_job_cant_be_got(
+    notify_admin,
+    mocker,
+    fake_uuid,
+    job_progress,
+):
+    mocker.patch("app.job_api_client.get_job", side_effect=Exception)
+
+    with notify_admin.app_context():
+        events = list(job_progress.stream(SERVICE_ONE_ID, fake_uuid))
+
+    assert events[-1] == "event: fallback\ndata: {}\n\n"
+    assert job_progress.stats == {"jobs": 0, "subscribers": 0}
+
+
+def test_view_job_progress_is_an_event_stream(
+    client_request,
+    mocker,
+    api_user_active,
+    fake_uuid,
+):
+    mocker.patch(
+        "app.job_api_client.get_job",
+        return_value={"data": _job(api_user_active, ("delivered", 1))},
+    )
+
+    response = client_request.get_response(
+        "main.view_job_progress",
+        service_id=SERVICE_ONE_ID,
+        job_id=fake_uuid,
+    )
+
+    assert response.mimetype == "text/event-stream"
+    assert response.headers["Cache-Control"] == "no-cache"
+    assert "event: end" in response.get_data(as_text=True)
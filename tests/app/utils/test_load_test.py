@@ -0,0 +1,171 @@
+import json
+from unittest.mock import call
+
+import pytest
+from flask_login import current_user
+
+from app.models.user import User
+from app.utils import load_test
+from app.utils.load_test import LoadTest, LoadTests, get_percentiles
+from tests.conftest import SERVICE_ONE_ID
+
+
+def test_get_percentiles():
+    assert get_percentiles([]) == {"count": 0}
+    assert get_percentiles([i / 1000 for i in range(100, 0, -1)]) == {
+        "count": 100,
+        "mean_ms": 50.5,
+        "p50_ms": 50.0,
+        "p95_ms": 95.0,
+        "p99_ms": 99.0,
+        "max_ms": 100.0,
+    }
+
+
+@pytest.fixture
+def mock_redis(mocker):
+    return mocker.patch.object(load_test, "redis_client")
+
+
+@pytest.fixture
+def mock_send_stages(mocker):
+    return {
+        name: mocker.patch(f"app.main.views.send.{name}", **kwargs)
+        for name, kwargs in (
+            ("_check_one_off_notification", {"return_value": None}),
+            ("_upload_one_off", {"return_value": ("upload-id", "one-off.csv")}),
+            ("_create_one_off_job", {}),
+        )
+    }
+
+
+@pytest.mark.parametrize("rate", [0, 1000])
+def test_load_test_sends_messages_and_times_each_stage(
+    notify_admin,
+    active_user_with_permissions,
+    service_one,
+    fake_uuid,
+    mock_redis,
+    mock_send_stages,
+    mock_get_user,
+    mock_events,
+    rate,
+):
+    recipients = [{"phone number": "1"}, {"phone number": "2"}]
+    current_user_ids = []
+    mock_send_stages["_check_one_off_notification"].side_effect = (
+        lambda *args: current_user_ids.append(current_user.id)
+    )
+
+    results = LoadTest(
+        notify_admin,
+        User(active_user_with_permissions),
+        service_one,
+        fake_uuid,
+        recipients,
+        message_count=5,
+        concurrency=2,
+        rate=rate,
+    ).run()
+
+    assert results["status"] == "finished"
+    assert (results["sent"], results["failed"], results["errors"]) == (5, 0, {})
+    assert {stage: stats["count"] for stage, stats in results["stages"].items()} == {
+        "check": 5,
+        "upload": 5,
+        "create_job": 5,
+        "total": 5,
+    }
+    assert sorted(
+        call.args[2]["phone number"]
+        for call in mock_send_stages["_check_one_off_notification"].call_args_list
+    ) == ["1", "1", "1", "2", "2"]
+    mock_send_stages["_create_one_off_job"].assert_called_with(
+        SERVICE_ONE_ID, fake_uuid, "upload-id", "one-off.csv", ""
+    )
+    # Signs in once, then sends each message as the user from the session
+    mock_events.assert_called_once()
+    assert mock_events.call_args.args[0] == "sucessful_login"
+    assert mock_events.call_args.args[1]["user_id"] == (
+        active_user_with_permissions["id"]
+    )
+    assert (
+        mock_get_user.call_args_list == [call(active_user_with_permissions["id"])] * 5
+    )
+    assert current_user_ids == [active_user_with_permissions["id"]] * 5
+    # Once when it starts and once when it finishes
+    assert mock_redis.set.call_count == 2
+    assert json.loads(mock_redis.set.call_args.args[1]) == results
+
+
+def test_load_test_counts_errors_by_stage(
+    notify_admin,
+    active_user_with_permissions,
+    service_one,
+    fake_uuid,
+    mock_redis,
+    mock_send_stages,
+    mock_get_user,
+    mock_events,
+):
+    mock_send_stages["_check_one_off_notification"].side_effect = [
+        None,
+        None,
+        "too-many-messages",
+    ]
+    mock_send_stages["_upload_one_off"].side_effect = [
+        ("upload-id", "one-off.csv"),
+        OSError("S3 is down"),
+    ]
+
+    results = LoadTest(
+        notify_admin,
+        User(active_user_with_permissions),
+        service_one,
+        fake_uuid,
+        [{}],
+        message_count=3,
+        concurrency=1,
+    ).run()
+
+    assert (results["sent"], results["failed"]) == (1, 2)
+    assert results["errors"] == {
+        "upload: OSError: S3 is down": 1,
+        "check: ValueError: too-many-messages": 1,
+    }
+    assert results["stages"]["check"]["count"] == 2
+    assert results["stages"]["upload"]["count"] == 1
+    assert results["stages"]["total"]["count"] == 1
+
+
+def test_load_tests_get_results_from_redis_then_this_process(mock_redis):
+    load_tests = LoadTests()
+    load_tests.save({"id": "1234", "status": "running"})
+
+    mock_redis.set.assert_called_once_with(
+        "load-test-1234", '{"id": "1234", "status": "running"}', ex=LoadTests.TTL
+    )
+
+    mock_redis.get.return_value = '{"id": "1234", "status": "finished"}'
+    assert load_tests.get("1234") == {"id": "1234", "status": "finished"}
+
+    mock_redis.get.return_value = None
+    assert load_tests.get("1234") == {"id": "1234", "status": "running"}
+    assert load_tests.get("5678") is None
+
+
+def test_load_tests_only_keep_the_latest_results_in_memory(mock_redis):
+    load_tests = LoadTests()
+    mock_redis.get.return_value = None
+
+    for load_test_id in range(LoadTests.MAX_RESULTS + 2):
+        load_tests.save({"id": str(load_test_id)})
+    load_tests.save({"id": "2", "status": "finished"})
+    load_tests.save({"id": "new"})
+
+    assert len(load_tests.results) == LoadTests.MAX_RESULTS
+    assert load_tests.get("0") is None
+    assert load_tests.get("1") is None
+    assert load_tests.get("2") == {"id": "2", "status": "finished"}
+    assert load_tests.get("3") is None
+    assert load_tests.get("new") == {"id": "new"}
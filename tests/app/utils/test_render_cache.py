@@ -0,0 +1,155 @@
+from unittest.mock import Mock, call
+
+import pytest
+from markupsafe import Markup
+
+from app.main.views.jobs import get_preview_of_content
+from app.utils.render_cache import (
+    FragmentCache,
+    RenderCache,
+    preview_cache,
+    preview_cache_key,
+)
+
+
+@pytest.fixture
+def render_cache(notify_admin):
+    cache = RenderCache(Mock(), "TEST_CACHE")
+    cache.init_app(notify_admin)
+    return cache
+
+
+def test_get_or_render_only_renders_once(render_cache):
+    render = Mock(return_value="rendered")
+
+    assert render_cache.get_or_render("key", render) == "rendered"
+    assert render_cache.get_or_render("key", render) == "rendered"
+
+    render.assert_called_once_with()
+    assert render_cache.stats == {
+        "size": 1,
+        "max_size": 5000,
+        "hits": 1,
+        "redis_hits": 0,
+        "misses": 1,
+        "hit_rate": 0.5,
+    }
+
+
+def test_get_or_render_evicts_least_recently_used(
+    notify_admin, render_cache, monkeypatch
+):
+    monkeypatch.setitem(notify_admin.config, "TEST_CACHE_MAX_SIZE", 2)
+    render_cache.init_app(notify_admin)
+    render = Mock(side_effect=lambda: "rendered")
+
+    render_cache.get_or_render("a", render)
+    render_cache.get_or_render("b", render)
+    render_cache.get_or_render("a", render)
+    render_cache.get_or_render("c", render)
+    render_cache.get_or_render("b", render)
+
+    assert render.call_count == 4
+    assert render_cache.stats["size"] == 2
+
+
+@pytest.mark.parametrize(("enabled", "key"), [(True, None), (False, "key")])
+def test_get_or_render_always_renders_if_disabled_or_no_key(render_cache, enabled, key):
+    render_cache.enabled = enabled
+    render = Mock(return_value="rendered")
+
+    render_cache.get_or_render(key, render)
+    render_cache.get_or_render(key, render)
+
+    assert render.call_count == 2
+    assert render_cache.stats["size"] == 0
+
+
+def test_get_or_render_reads_from_and_writes_to_redis(render_cache):
+    render_cache.use_redis = True
+    render_cache.redis_client.get.side_effect = [None, b"from redis"]
+
+    assert render_cache.get_or_render("a", lambda: "rendered") == "rendered"
+    render_cache.redis_client.set.assert_called_once_with(
+        "test-cache-a", "rendered", ex=86_400
+    )
+
+    assert render_cache.get_or_render("b", lambda: "not used") == "from redis"
+    assert render_cache.stats["redis_hits"] == 1
+
+    # second read of b comes from the local LRU
+    assert render_cache.get_or_render("b", lambda: "not used") == "from redis"
+    assert render_cache.redis_client.get.call_count == 2
+
+
+def test_preview_cache_key_ignores_order_of_personalisation():
+    assert preview_cache_key(
+        "sms", "1234", 1, False, {"a": "1", "b": "2"}
+    ) == preview_cache_key("sms", "1234", 1, False, {"b": "2", "a": "1"})
+    assert preview_cache_key("sms", "1234", 1, False, {"a": "1"}) != preview_cache_key(
+        "sms", "1234", 1, True, {"a": "1"}
+    )
+    assert preview_cache_key("sms", None, 1, False, {}) is None
+
+
+def test_get_preview_of_content_uses_preview_cache(notify_admin, mocker):
+    mock_render = mocker.patch(
+        "app.main.views.jobs.EmailPreviewTemplate",
+        return_value=Mock(subject="Hello Jo"),
+    )
+    notification = {
+        "template": {
+            "id": "1234",
+            "version": 2,
+            "template_type": "email",
+            "subject": "Hello ((name))",
+            "content": "body",
+        },
+        "personalisation": {"name": "Jo"},
+    }
+
+    for _ in range(3):
+        preview = get_preview_of_content(dict(notification))
+        assert preview == "Hello Jo"
+        assert isinstance(preview, Markup)
+
+    assert mock_render.call_count == 1
+    assert preview_cache.stats["hits"] == 2
+
+
+@pytest.fixture
+def mock_render_template(mocker):
+    return mocker.patch(
+        "app.utils.render_cache.render_template",
+        side_effect=lambda template_name, **context: f"{template_name} {context}",
+    )
+
+
+def test_fragment_cache_renders_once_for_the_same_values(
+    notify_admin, mock_render_template
+):
+    cache = FragmentCache(Mock(), "TEST_FRAGMENT_CACHE")
+    cache.init_app(notify_admin)
+
+    for _ in range(2):
+        cache.render_template("a.html", {"count": 1, "id": "1"}, count=1)
+        cache.render_template("a.html", {"id": "1", "count": 1}, count=1)
+        cache.render_template("a.html", {"count": 2, "id": "1"}, count=2)
+        cache.render_template("b.html", {"count": 1, "id": "1"}, count=1)
+        cache.render_template("c.html", None, count=1)
+
+    assert mock_render_template.call_args_list == [
+        call("a.html", count=1),
+        call("a.html", count=2),
+        call("b.html", count=1),
+        call("c.html", count=1),
+        call("c.html", count=1),
+    ]
+    assert cache.stats["fragments"] == {
+        "a.html": {"hits": 4, "redis_hits": 0, "misses": 2, "hit_rate": 0.6667},
+        "b.html": {"hits": 1, "redis_hits": 0, "misses": 1, "hit_rate": 0.5},
+    }
+    assert cache.stats["hits"] == 5
+
+    cache.clear()
+    assert cache.stats["fragments"] == {}
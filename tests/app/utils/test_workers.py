@@ -0,0 +1,106 @@
+from unittest.mock import Mock, call
+
+import pytest
+
+from app.utils import workers
+from app.utils.workers import check_memory, get_memory_usage, warm_up
+
+SMAPS_ROLLUP = """\
+55a4c6a00000-7ffd4b7f3000 ---p 00000000 00:00 0                          [rollup]
+Rss:              102400 kB
+Pss:               51200 kB
+Pss_Anon:          40000 kB
+Shared_Clean:      81920 kB
+Shared_Dirty:       4096 kB
+Private_Clean:      1024 kB
+Private_Dirty:     15360 kB
+Swap:                  0 kB
+"""
+
+
+@pytest.fixture
+def _smaps_rollup(mocker, tmp_path):
+    path = tmp_path / "smaps_rollup"
+    path.write_text(SMAPS_ROLLUP)
+    real_open = open
+    mocker.patch(
+        "builtins.open",
+        side_effect=lambda name, *args, **kwargs: real_open(
+            path if name == "/proc/self/smaps_rollup" else name, *args, **kwargs
+        ),
+    )
+
+
+@pytest.mark.usefixtures("_smaps_rollup")
+def test_get_memory_usage_reads_proc():
+    assert get_memory_usage() == {
+        "rss": 100 * 2**20,
+        "pss": 50 * 2**20,
+        "uss": 16 * 2**20,
+    }
+
+
+def test_get_memory_usage_falls_back_to_peak_rss(mocker):
+    mocker.patch("builtins.open", side_effect=FileNotFoundError)
+    mocker.patch.object(
+        workers.resource, "getrusage", return_value=Mock(ru_maxrss=2048)
+    )
+
+    assert get_memory_usage() == {"rss": 2 * 2**20}
+
+
+@pytest.mark.usefixtures("_smaps_rollup")
+@pytest.mark.parametrize(
+    ("max_memory_mb", "expected_alive"),
+    [
+        (None, True),
+        (17, True),
+        (15, False),
+    ],
+)
+def test_check_memory_restarts_workers_using_too_much_memory(
+    max_memory_mb, expected_alive
+):
+    worker = Mock(pid=1234, alive=True)
+
+    check_memory(worker, max_memory_mb)
+
+    assert worker.alive is expected_alive
+    worker.log.info.assert_called_once_with(
+        "worker %s memory: %s", 1234, "rss 100.0MB, pss 50.0MB, uss 16.0MB"
+    )
+    assert worker.log.warning.called is not expected_alive
+
+
+def test_check_memory_uses_rss_without_proc(mocker):
+    mocker.patch.object(workers, "get_memory_usage", return_value={"rss": 2 * 2**20})
+    worker = Mock(pid=1234, alive=True)
+
+    check_memory(worker, 1)
+
+    assert worker.alive is False
+
+
+def test_warm_up_loads_reference_data_and_freezes_memory(notify_admin, mocker):
+    loaders = [
+        mocker.patch.object(workers, name)
+        for name in (
+            "get_country_prefixes",
+            "get_countries",
+            "get_commonly_used_passwords",
+        )
+    ]
+    mock_compile_templates = mocker.patch.object(workers, "compile_templates")
+    mock_redis = mocker.patch.object(workers, "redis_client", active=True)
+    mock_gc = mocker.patch.object(workers, "gc")
+
+    warm_up(notify_admin)
+
+    for loader in loaders:
+        loader.assert_called_once_with()
+    assert mock_compile_templates.call_args_list == [
+        call(notify_admin.jinja_env, logger=notify_admin.logger),
+        call(workers.template_env, logger=notify_admin.logger),
+    ]
+    mock_redis.redis_store.connection_pool.disconnect.assert_called_once_with()
+    assert mock_gc.method_calls == [call.collect(), call.freeze()]
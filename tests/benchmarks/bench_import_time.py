@@ -0,0 +1,105 @@
+"""
+Profiles how long it takes to import the app, which is most of the time it takes
+a worker to start, and how much memory that uses.
+
+    poetry run python -m tests.benchmarks.bench_import_time [budget in ms]
+
+With a budget it exits with an error if the import takes longer, so it can be
+used to catch regressions.
+"""
+
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+
+REPEAT = 5
+SLOWEST = 15
+
+# Reference data which should only be loaded when something uses it
+LAZY_MODULES = ("app.main._commonly_used_passwords",)
+LAZY_LOADERS = (
+    "notifications_utils.countries.get_countries",
+    "notifications_utils.international_billing_rates.get_international_billing_rates",
+)
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| ( *)(\S+)$")
+
+CHECK_LAZY_LOADING = """
+import importlib, sys
+import application
+for module in {modules!r}:
+    assert module not in sys.modules, f"{{module}} was imported"
+for loader in {loaders!r}:
+    module, _, function = loader.rpartition(".")
+    cache_info = getattr(importlib.import_module(module), function).cache_info()
+    assert cache_info.currsize == 0, f"{{loader}} was called"
+"""
+
+
+def run(*args):
+    return subprocess.run(
+        [sys.executable, *args],
+        env={"NOTIFY_ENVIRONMENT": "test", **os.environ},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def profile_import(module="application"):
+    """
+    Imports `module` in a new interpreter, returning the time each module took
+    to import (excluding the modules it imported) in microseconds, and the total.
+    """
+    self_times = {}
+    total = 0
+    for line in run("-X", "importtime", "-c", f"import {module}").stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        if not match:
+            continue
+        self_time, cumulative, indent, name = match.groups()
+        self_times[name] = int(self_time)
+        if not indent:
+            total += int(cumulative)
+    return self_times, total
+
+
+def check_lazy_loading():
+    run(
+        "-c",
+        CHECK_LAZY_LOADING.format(modules=LAZY_MODULES, loaders=LAZY_LOADERS),
+    )
+
+
+def main(budget_ms=None):
+    check_lazy_loading()
+
+    profiles = [profile_import() for _ in range(REPEAT)]
+    total_ms = statistics.median(total for _, total in profiles) / 1000
+    max_rss_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+
+    sys.stdout.write(f"Slowest modules, median of {REPEAT}\n")
+    for name in sorted(
+        profiles[0][0],
+        key=lambda name: statistics.median(
+            self_times.get(name, 0) for self_times, _ in profiles
+        ),
+        reverse=True,
+    )[:SLOWEST]:
+        median = statistics.median(
+            self_times.get(name, 0) for self_times, _ in profiles
+        )
+        sys.stdout.write(f"  {name:<60} {median / 1000:8.2f}ms\n")
+    sys.stdout.write(
+        f"import application {total_ms:8.2f}ms   max RSS {max_rss_mb:6.1f}MB\n"
+    )
+
+    if budget_ms is not None and total_ms > budget_ms:
+        sys.exit(f"Importing the app took longer than {budget_ms}ms")
+
+
+if __name__ == "__main__":
+    main(*map(float, sys.argv[1:]))
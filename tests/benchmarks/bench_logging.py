@@ -0,0 +1,202 @@
+"""
+Compares the cost of logging a record with the queueing, single-pass scrubbing
+pipeline against the one it replaced, which scrubbed each message twice and
+wrote it to stdout before returning.
+
+    poetry run python -m tests.benchmarks.bench_logging [number of records]
+
+Records are written to os.devnull, so the time the old pipeline spends waiting
+for stdout here is as short as it can be. ‘in the request’ is the time a
+request spends logging each record; ‘in total’ includes the background thread
+writing them all out.
+
+Then it runs again in a new interpreter under eventlet, as gunicorn’s workers
+do, with stdout taking WRITE_TIME to write each record. Writing to stdout
+blocks the whole process rather than yielding to the hub, so while a record is
+written no other request can run. The request yields to the hub after logging
+each record, as it would while waiting for the API, so ‘in the request’ also
+counts the time it waits for the hub while other green threads write. ‘green
+thread’ is the queueing pipeline with its background thread started from the
+patched `threading` module, as it would be if `QueueingHandler` didn’t ask for
+a real one.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import subprocess
+import sys
+import time
+from types import SimpleNamespace
+
+from notifications_utils.logging import (
+    LOG_FORMAT,
+    TIME_FORMAT,
+    AppNameFilter,
+    JSONFormatter,
+    QueueingHandler,
+    RequestIdFilter,
+    ServiceIdFilter,
+    configure_handler,
+)
+
+RECORDS = 10_000
+WRITE_TIME = 0.0002
+
+APP = SimpleNamespace(
+    config={"NOTIFY_APP_NAME": "admin", "NOTIFY_LOG_LEVEL": "INFO"}, debug=False
+)
+
+CSV = "\n".join(
+    f"phone number,name,email address\n+1 (202) 555-01{index:02},Name {index},"
+    f"name.{index}@example.gov"
+    for index in range(30)
+)[:999]
+
+MESSAGES = (
+    ("Sending to %s for service %s", ("2025550123", "6ce466d0-fd6a-11e5-82f5")),
+    ("User %s logged in", ("someone@example.gov",)),
+    ("Generated CSV: %s", (CSV,)),
+    ("Request finished in %.2fs", (0.123,)),
+)
+
+RUN_UNDER_EVENTLET = """
+import eventlet
+eventlet.monkey_patch()
+from tests.benchmarks.bench_logging import main_under_eventlet
+main_under_eventlet({records})
+"""
+
+_legacy_phone_regex = re.compile("(?:\\+ *)?\\d[\\d\\- ]{7,}\\d")
+_legacy_email_regex = re.compile(r"[\w\.-]+@[\w\.-]+")
+
+
+def legacy_scrub(msg):
+    if not isinstance(msg, str):
+        return msg
+    phones = _legacy_phone_regex.findall(msg)
+    phones = [phone.replace("-", "").replace(" ", "") for phone in phones]
+    for phone in phones:
+        msg = msg.replace(phone, "1XXXXXXXXXX")
+    emails = _legacy_email_regex.findall(msg)
+    for email in emails:
+        msg = msg.replace(email, "XXXXX@XXXXXXX")
+    return msg
+
+
+class LegacyPIIFilter(logging.Filter):
+    def filter(self, record):
+        record.msg = legacy_scrub(record.msg)
+        return record
+
+
+class LegacyJSONFormatter(JSONFormatter):
+    def process_log_record(self, log_record):
+        log_record = super().process_log_record(log_record)
+        log_record["message"] = legacy_scrub(log_record["message"])
+        return log_record
+
+
+def legacy_handler(stream):
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(LegacyJSONFormatter(LOG_FORMAT, TIME_FORMAT))
+    handler.addFilter(AppNameFilter(APP.config["NOTIFY_APP_NAME"]))
+    handler.addFilter(RequestIdFilter())
+    handler.addFilter(ServiceIdFilter())
+    handler.addFilter(LegacyPIIFilter())
+    return handler
+
+
+def queueing_handler(stream, records, handler_class=QueueingHandler):
+    handler = configure_handler(
+        logging.StreamHandler(stream), APP, JSONFormatter(LOG_FORMAT, TIME_FORMAT)
+    )
+    queue_handler = handler_class([handler], records)
+    queue_handler.addFilter(AppNameFilter(APP.config["NOTIFY_APP_NAME"]))
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(ServiceIdFilter())
+    return queue_handler
+
+
+def benchmark(name, handler, records, finish=lambda: None, pause=lambda: None):
+    logger = logging.getLogger(f"bench_logging.{name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+
+    start = time.perf_counter()
+    for index in range(records):
+        message, args = MESSAGES[index % len(MESSAGES)]
+        logger.info(message, *args)
+        pause()
+    in_request = time.perf_counter() - start
+    finish()
+    in_total = time.perf_counter() - start
+
+    logger.removeHandler(handler)
+    sys.stdout.write(
+        f"{name:<13} {in_request / records * 1e6:>12.1f}µs "
+        f"{in_total / records * 1e6:>10.1f}µs\n"
+    )
+
+
+def main(records=RECORDS):
+    sys.stdout.write(
+        f"{records:,} records\n"
+        f"{'pipeline':<13} {'in the request':>14} {'in total':>12}\n"
+    )
+    with open(os.devnull, "w") as stream:
+        benchmark("legacy", legacy_handler(stream), records)
+        handler = queueing_handler(stream, records)
+        benchmark("queueing", handler, records, finish=handler.stop)
+    sys.stdout.flush()
+    subprocess.run(
+        [sys.executable, "-c", RUN_UNDER_EVENTLET.format(records=records)],
+        check=True,
+    )
+
+
+class SlowStream:
+    def __init__(self):
+        from eventlet.patcher import original
+
+        self.sleep = original("time").sleep
+
+    def write(self, text):
+        self.sleep(WRITE_TIME)
+
+    def flush(self):
+        pass
+
+
+class GreenQueueingHandler(QueueingHandler):
+    def start(self):
+        self.queue = queue.Queue(self.maxsize)
+        self.listener = logging.handlers.QueueListener(
+            self.queue, *self.handlers, respect_handler_level=True
+        )
+        self.listener.start()
+        self._pid = os.getpid()
+
+
+def main_under_eventlet(records):
+    import eventlet
+
+    sys.stdout.write(
+        f"\nUnder eventlet, {WRITE_TIME * 1e6:.0f}µs to write each record\n"
+        f"{'pipeline':<13} {'in the request':>14} {'in total':>12}\n"
+    )
+    stream = SlowStream()
+    benchmark("legacy", legacy_handler(stream), records, pause=eventlet.sleep)
+    handler = queueing_handler(stream, records, GreenQueueingHandler)
+    benchmark(
+        "green thread", handler, records, finish=handler.stop, pause=eventlet.sleep
+    )
+    handler = queueing_handler(stream, records)
+    benchmark("queueing", handler, records, finish=handler.stop, pause=eventlet.sleep)
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,373 @@
+"""
+Times the hot paths in notifications_utils against the corpora in
+tests/benchmarks/corpora, and catches them getting slower.
+
+    poetry run python -m tests.benchmarks.bench_notifications_utils \\
+        [-k name] [--rounds 5] [--output results.json] \\
+        [--compare baseline.json] [--threshold 0.1]
+
+Save the results from the main branch with `--output`, then run again on a
+branch with `--compare` to check it. Any benchmark whose fastest round is more
+than `--threshold` slower than the baseline’s is reported and the script exits
+with an error. Only compare results from the same machine.
+
+The corpora are small, realistic mixes of valid and invalid input. The
+spreadsheet benchmarks repeat them to make up 1,000, 10,000 and 100,000 rows.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+
+from notifications_utils.formatters import (
+    autolink_urls,
+    escape_html,
+    strip_and_remove_obscure_whitespace,
+)
+from notifications_utils.insensitive_dict import InsensitiveDict
+from notifications_utils.markdown import (
+    notify_email_markdown,
+    notify_email_preheader_markdown,
+    notify_letter_preview_markdown,
+    notify_plain_text_email_markdown,
+)
+from notifications_utils.recipients import (
+    InvalidEmailError,
+    InvalidPhoneError,
+    RecipientCSV,
+    validate_email_address,
+    validate_phone_number,
+)
+from notifications_utils.sanitise_text import SanitiseSMS
+from notifications_utils.template import (
+    EmailPreviewTemplate,
+    SMSMessageTemplate,
+    do_nice_typography,
+    get_placeholders,
+)
+
+CORPORA = Path(__file__).parent / "corpora"
+
+ROW_COUNTS = (1_000, 10_000, 100_000)
+
+SMS_TEMPLATE = {
+    "template_type": "sms",
+    "content": "Hello ((name)), your reference is ((reference)).",
+}
+EMAIL_TEMPLATE = {
+    "template_type": "email",
+    "subject": "Your reference is ((reference))",
+    "content": "Hello ((name)),\n\n* your reference is ((reference))",
+}
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """
+    Registers a function which sets a benchmark up and returns what to time.
+    """
+
+    def decorator(setup):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def read_corpus(name):
+    return (CORPORA / name).read_text().splitlines()
+
+
+def get_values(content):
+    return {
+        placeholder: f"Example {placeholder}"
+        for placeholder in get_placeholders(content)
+    }
+
+
+def make_spreadsheet(recipient_column, recipients, rows):
+    return "\n".join(
+        [f"{recipient_column},name,reference"]
+        + [
+            f'"{recipients[row % len(recipients)]}",Name {row},REF{row:06}'
+            for row in range(rows)
+        ]
+    )
+
+
+def setup_recipient_csv(template_type, rows):
+    if template_type == "sms":
+        file_data = make_spreadsheet(
+            "phone number", read_corpus("phone_numbers.txt"), rows
+        )
+        template = SMSMessageTemplate(SMS_TEMPLATE)
+    else:
+        file_data = make_spreadsheet(
+            "email address", read_corpus("email_addresses.txt"), rows
+        )
+        template = EmailPreviewTemplate(EMAIL_TEMPLATE)
+
+    def validate():
+        # What the check page does
+        recipients = RecipientCSV(
+            file_data, template=template, allow_international_sms=True
+        )
+        return recipients.has_errors, list(recipients.rows_with_errors)
+
+    return validate
+
+
+for _rows in ROW_COUNTS:
+    for _template_type in ("sms", "email"):
+        benchmark(f"recipient_csv_{_template_type}_{_rows // 1000}k")(
+            partial(setup_recipient_csv, _template_type, _rows)
+        )
+
+
+@benchmark("sms_message_template")
+def setup_sms_message_template():
+    templates = [
+        SMSMessageTemplate(
+            {"template_type": "sms", "content": content},
+            values=get_values(content),
+            prefix="Example agency",
+        )
+        for content in read_corpus("sms_messages.txt")
+    ]
+
+    def render():
+        return [(str(template), template.fragment_count) for template in templates]
+
+    return render
+
+
+@benchmark("email_preview_template")
+def setup_email_preview_template():
+    content = (CORPORA / "email_body.md").read_text()
+    template = EmailPreviewTemplate(
+        {
+            "template_type": "email",
+            "subject": "Your ((permit type)) application, ((reference))",
+            "content": content,
+        },
+        values=get_values(content) | {"show refund policy": "yes"},
+        from_name="Example agency",
+        reply_to="permits@example.gov",
+    )
+    return partial(str, template)
+
+
+@benchmark("sanitise_sms_encode")
+def setup_sanitise_sms_encode():
+    messages = read_corpus("sms_messages.txt")
+
+    def encode():
+        for message in messages:
+            SanitiseSMS.encode(message)
+
+    return encode
+
+
+@benchmark("validate_phone_number")
+def setup_validate_phone_number():
+    phone_numbers = read_corpus("phone_numbers.txt")
+
+    def validate():
+        for phone_number in phone_numbers:
+            try:
+                validate_phone_number(phone_number, international=True)
+            except InvalidPhoneError:
+                pass
+
+    return validate
+
+
+@benchmark("validate_email_address")
+def setup_validate_email_address():
+    email_addresses = read_corpus("email_addresses.txt")
+
+    def validate():
+        for email_address in email_addresses:
+            try:
+                validate_email_address(email_address)
+            except InvalidEmailError:
+                pass
+
+    return validate
+
+
+@benchmark("insensitive_dict")
+def setup_insensitive_dict():
+    rows = [
+        {"Phone Number": phone_number, "NAME": f"Name {index}", "ref_erence": index}
+        for index, phone_number in enumerate(read_corpus("phone_numbers.txt"))
+    ]
+
+    def build_and_look_up():
+        return [
+            (row["phone number"], row["Name"], row["REFERENCE"], "phone_number" in row)
+            for row in map(InsensitiveDict, rows)
+        ]
+
+    return build_and_look_up
+
+
+def setup_markdown(renderer):
+    return partial(renderer, (CORPORA / "email_body.md").read_text())
+
+
+for _name, _renderer in (
+    ("email", notify_email_markdown),
+    ("plain_text_email", notify_plain_text_email_markdown),
+    ("email_preheader", notify_email_preheader_markdown),
+    ("letter_preview", notify_letter_preview_markdown),
+):
+    benchmark(f"markdown_{_name}")(partial(setup_markdown, _renderer))
+
+
+@benchmark("formatters_nice_typography")
+def setup_formatters_nice_typography():
+    messages = read_corpus("sms_messages.txt")
+
+    def format_all():
+        for message in messages:
+            do_nice_typography(message)
+
+    return format_all
+
+
+@benchmark("formatters_links")
+def setup_formatters_links():
+    messages = read_corpus("sms_messages.txt")
+
+    def format_all():
+        for message in messages:
+            autolink_urls(escape_html(message))
+
+    return format_all
+
+
+@benchmark("formatters_obscure_whitespace")
+def setup_formatters_obscure_whitespace():
+    cells = read_corpus("phone_numbers.txt") + read_corpus("email_addresses.txt")
+
+    def format_all():
+        for cell in cells:
+            strip_and_remove_obscure_whitespace(cell)
+
+    return format_all
+
+
+def run_benchmark(function, rounds):
+    """
+    Times `function`, calling it enough times in each round to take at least
+    0.2 seconds.
+    """
+    timer = timeit.Timer(function)
+    loops, _ = timer.autorange()
+    times = [duration / loops for duration in timer.repeat(rounds, loops)]
+    return {
+        "rounds": rounds,
+        "loops": loops,
+        "min_s": min(times),
+        "median_s": statistics.median(times),
+        "max_s": max(times),
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """
+    Prints how each benchmark has changed since `baseline`, returning the
+    names of those which are more than `threshold` slower.
+    """
+    regressions = []
+    sys.stdout.write(f"\nCompared with {baseline['commit']} at {baseline['time']}\n")
+    for name, result in results["benchmarks"].items():
+        if name not in baseline["benchmarks"]:
+            sys.stdout.write(f"  {name:<36} new\n")
+            continue
+        change = result["min_s"] / baseline["benchmarks"][name]["min_s"] - 1
+        regressed = change > threshold
+        if regressed:
+            regressions.append(name)
+        sys.stdout.write(
+            f"  {name:<36} {change:+7.1%}"
+            + ("   slower than allowed" if regressed else "")
+            + "\n"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark the hot paths in notifications_utils"
+    )
+    parser.add_argument(
+        "-k", dest="pattern", help="only run benchmarks with this in their name"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--output", type=Path, help="write the results to this JSON file"
+    )
+    parser.add_argument("--compare", type=Path, help="results to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="how much slower a benchmark can get before it fails, as a fraction",
+    )
+    args = parser.parse_args(argv)
+
+    results = {
+        "commit": get_commit(),
+        "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.platform(),
+        "benchmarks": {},
+    }
+    sys.stdout.write(f"{'benchmark':<36} {'min':>10} {'median':>10} {'loops':>7}\n")
+    for name, setup in BENCHMARKS.items():
+        if args.pattern and args.pattern not in name:
+            continue
+        result = run_benchmark(setup(), args.rounds)
+        results["benchmarks"][name] = result
+        sys.stdout.write(
+            f"{name:<36} {result['min_s'] * 1000:8.3f}ms "
+            f"{result['median_s'] * 1000:8.3f}ms {result['loops']:>7}\n"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.compare:
+        regressions = compare(
+            results, json.loads(args.compare.read_text()), args.threshold
+        )
+        if regressions:
+            sys.exit(
+                f"{len(regressions)} benchmarks got more than {args.threshold:.0%} slower"
+            )
+
+
+if __name__ == "__main__":
+    main()
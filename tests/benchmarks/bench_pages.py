@@ -0,0 +1,160 @@
+"""
+Times how long key admin pages take to render against the stub API, and how
+many API calls each one makes.
+
+    poetry run python -m tests.benchmarks.bench_pages [requests per page] [scale]
+
+At a scale of 1 there are 10 services, and the one the pages are for has 50
+templates in 5 folders and 20 jobs.
+
+The first request to each page fills the caches and isn’t timed, but the API
+calls it makes are shown before those the rest make. Times include the stub API
+answering, but not a network between it and the admin. The time spent on each
+category of work is the median.
+"""
+
+import re
+import statistics
+import sys
+import time
+
+from flask import url_for
+
+from app.s3_client.s3_csv_client import s3upload
+from notifications_utils.request_timings import CATEGORIES
+from tests.benchmarks.stub_api import StubData, create_benchmark_app, stub_environment
+
+REQUESTS_PER_PAGE = 50
+
+SERVER_TIMING_METRIC = re.compile(r'(\w+);dur=([\d.]+)(?:;desc="(\d+) calls")?')
+
+
+def get_pages(data, upload_id):
+    service_id = data.service["id"]
+    return {
+        "service_dashboard": url_for("main.service_dashboard", service_id=service_id),
+        "choose_template": url_for("main.choose_template", service_id=service_id),
+        "check_messages": url_for(
+            "main.check_messages",
+            service_id=service_id,
+            template_id=data.templates[0]["id"],
+            upload_id=upload_id,
+        ),
+        "view_job": url_for(
+            "main.view_job", service_id=service_id, job_id=data.jobs[0]["id"]
+        ),
+        "platform_admin": url_for("main.platform_admin"),
+        "live_services": url_for("main.live_services"),
+    }
+
+
+def upload_contact_list(data, rows=100):
+    return s3upload(
+        data.service["id"],
+        {
+            "file_name": "contact-list.csv",
+            "data": "\n".join(
+                ["phone number,name,reference"]
+                + [f"+1202555{row:04},Name {row},REF{row}" for row in range(rows)]
+            ),
+        },
+    )
+
+
+def log_in(client, user):
+    with client.session_transaction() as session:
+        session["_user_id"] = user["id"]
+        session["_fresh"] = True
+        session["user_id"] = user["id"]
+        session["current_session_id"] = user["current_session_id"]
+
+
+def get_server_timings(response):
+    """
+    How long the request spent on each category of work, and how many calls
+    it made, from its `Server-Timing` header.
+    """
+    return {
+        category: (float(duration), int(count or 0))
+        for category, duration, count in SERVER_TIMING_METRIC.findall(
+            response.headers.get("Server-Timing", "")
+        )
+    }
+
+
+def benchmark_page(client, stub_api, url, requests):
+    first_response = client.get(url)
+    if first_response.status_code != 200:
+        raise AssertionError(
+            f"{url} returned {first_response.status_code}, calling {stub_api.unstubbed}"
+        )
+    durations = []
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url)
+        durations.append(time.perf_counter() - start)
+        timings.append(get_server_timings(response))
+    return {
+        "p50_ms": statistics.median(durations) * 1000,
+        "p95_ms": statistics.quantiles(durations, n=20)[-1] * 1000,
+        "first_api_calls": get_server_timings(first_response).get("api", (0, 0))[1],
+        "api_calls": statistics.median(
+            timing.get("api", (0, 0))[1] for timing in timings
+        ),
+        **{
+            f"{category}_ms": statistics.median(
+                timing.get(category, (0, 0))[0] for timing in timings
+            )
+            for category in CATEGORIES
+        },
+    }
+
+
+def main(requests=REQUESTS_PER_PAGE, scale=1):
+    data = StubData(
+        services=10 * scale, templates=50 * scale, folders=5 * scale, jobs=20 * scale
+    )
+    with stub_environment(data) as stub_api:
+        app = create_benchmark_app()
+        with app.test_request_context():
+            upload_id = upload_contact_list(data)
+            pages = get_pages(data, upload_id)
+        client = app.test_client()
+        log_in(client, data.user)
+
+        sys.stdout.write(
+            " ".join(
+                [
+                    f"{'page':<20} {'p50':>10} {'p95':>10} {'API calls':>12}",
+                    *(f"{category:>8}" for category in CATEGORIES),
+                ]
+            )
+            + "\n"
+        )
+        for name, url in pages.items():
+            results = benchmark_page(client, stub_api, url, requests)
+            sys.stdout.write(
+                " ".join(
+                    [
+                        f"{name:<20} {results['p50_ms']:8.1f}ms "
+                        f"{results['p95_ms']:8.1f}ms "
+                        f"{results['first_api_calls']:>5} then "
+                        f"{results['api_calls']:<3g}",
+                        *(
+                            f"{results[f'{category}_ms']:6.1f}ms"
+                            for category in CATEGORIES
+                        ),
+                    ]
+                )
+                + "\n"
+            )
+
+    if stub_api.unstubbed:
+        sys.stdout.write(
+            "\n  ".join(["Not stubbed:", *sorted(set(stub_api.unstubbed))]) + "\n"
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,133 @@
+"""
+Compares the GCRA rate limiter with the sorted set one it’s replacing: how long
+each check takes, how many commands it sends and how many values (and bytes,
+with a real Redis) it keeps after a burst of requests.
+
+    poetry run python -m tests.benchmarks.bench_rate_limit [requests] [redis url]
+
+Without a Redis URL it uses fakeredis, which needs lupa to run the Lua script,
+and doesn’t include any time on the network.
+"""
+
+import sys
+import time
+
+import fakeredis
+from flask import Flask
+
+from notifications_utils.clients.redis.redis_client import RedisClient
+
+REQUESTS = 10_000
+LIMIT = 3_000
+INTERVAL = 60
+
+
+class CallCounter:
+    """
+    Counts the round trips to Redis, and the commands sent in them.
+    """
+
+    def __init__(self, redis):
+        self.round_trips = 0
+        self.commands = 0
+        execute_command = redis.execute_command
+        pipeline = redis.pipeline
+
+        def counted_execute_command(*args, **kwargs):
+            self.round_trips += 1
+            self.commands += 1
+            return execute_command(*args, **kwargs)
+
+        def counted_pipeline(*args, **kwargs):
+            pipe = pipeline(*args, **kwargs)
+            execute = pipe.execute
+
+            def counted_execute(*args, **kwargs):
+                self.round_trips += 1
+                self.commands += len(pipe.command_stack)
+                return execute(*args, **kwargs)
+
+            pipe.execute = counted_execute
+            return pipe
+
+        redis.execute_command = counted_execute_command
+        redis.pipeline = counted_pipeline
+
+
+def create_redis_client(redis_url):
+    app = Flask(__name__)
+    app.config["REDIS_ENABLED"] = True
+    app.config["REDIS_URL"] = redis_url or "redis://fake"
+    redis_client = RedisClient()
+    if not redis_url:
+        redis_client.redis_store.provider_class = fakeredis.FakeStrictRedis
+    redis_client.init_app(app)
+    return app, redis_client
+
+
+def get_stored_values(redis, key):
+    if redis.type(key) == b"zset":
+        return redis.zcard(key)
+    return redis.exists(key)
+
+
+def get_memory_usage(redis, key):
+    try:
+        return redis.memory_usage(key)
+    except Exception:
+        # fakeredis doesn’t know
+        return None
+
+
+def benchmark(redis_client, name, check, requests):
+    redis = redis_client.redis_store._redis_client
+    key = f"bench-rate-limit-{name}"
+    redis.delete(key)
+    counter = CallCounter(redis)
+
+    allowed = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        allowed += check(key)
+    duration = time.perf_counter() - start
+    round_trips, commands = counter.round_trips, counter.commands
+
+    memory = get_memory_usage(redis, key)
+    sys.stdout.write(
+        f"{name:<12} {duration / requests * 1e6:8.1f}µs "
+        f"{round_trips / requests:>12.1f} {commands / requests:>10.1f} "
+        f"{allowed:>8} {get_stored_values(redis, key):>8} "
+        f"{memory if memory is not None else 'unknown':>10}\n"
+    )
+    del redis.execute_command, redis.pipeline
+    redis.delete(key)
+
+
+def main(requests=REQUESTS, redis_url=None):
+    app, redis_client = create_redis_client(redis_url)
+    with app.app_context():
+        sys.stdout.write(
+            f"{requests} requests with a limit of {LIMIT} every {INTERVAL} seconds\n"
+            f"{'limiter':<12} {'per check':>10} {'round trips':>12} {'commands':>10} "
+            f"{'allowed':>8} {'values':>8} {'key bytes':>10}\n"
+        )
+        benchmark(
+            redis_client,
+            "sorted set",
+            lambda key: not redis_client.exceeded_rate_limit(
+                key, LIMIT, INTERVAL, raise_exception=True
+            ),
+            requests,
+        )
+        benchmark(
+            redis_client,
+            "gcra",
+            lambda key: redis_client.check_rate_limit(
+                key, LIMIT, INTERVAL, raise_exception=True
+            ).allowed,
+            requests,
+        )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:2]), *sys.argv[2:3])
@@ -0,0 +1,152 @@
+"""
+Compares the array-based statistics used by the platform admin services pages
+and the dashboard with the pure Python loops they replaced.
+
+    poetry run python -m tests.benchmarks.bench_statistics [number of services]
+"""
+
+import itertools
+import random
+import sys
+import timeit
+import uuid
+from itertools import groupby
+
+from app.main.views.dashboard import aggregate_template_usage
+from app.statistics_utils import ServicesStatistics, get_formatted_percentage
+
+REPEAT = 5
+
+
+def make_services(count):
+    random.seed(count)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Service {index}",
+            "active": random.random() > 0.1,
+            "restricted": random.random() > 0.7,
+            "created_at": f"2023-{random.randint(1, 12):02}-{random.randint(1, 28):02}",
+            "statistics": {
+                notification_type: {
+                    "requested": random.randint(0, 10_000),
+                    "delivered": random.randint(0, 10_000),
+                    "failed": random.randint(0, 100),
+                }
+                for notification_type in ("sms", "email")
+            },
+        }
+        for index in range(count)
+    ]
+
+
+def make_template_statistics(count):
+    template_ids = [str(uuid.uuid4()) for _ in range(max(count // 20, 1))]
+    return [
+        {
+            "template_id": random.choice(template_ids),
+            "template_name": "Template",
+            "template_type": "sms",
+            "count": random.randint(1, 1000),
+            "status": random.choice(("delivered", "failed", "cancelled")),
+        }
+        for _ in range(count)
+    ]
+
+
+def legacy_services_page(services):
+    services = [
+        service
+        for service in sorted(
+            services,
+            key=lambda service: (
+                service["active"],
+                sum(stats["requested"] for stats in service["statistics"].values()),
+                service["created_at"],
+            ),
+            reverse=True,
+        )
+        if service["restricted"] is False
+    ]
+    stats = {
+        "email": {"delivered": 0, "failed": 0, "requested": 0},
+        "sms": {"delivered": 0, "failed": 0, "requested": 0},
+    }
+    for service in services:
+        for msg_type, status in itertools.product(
+            ("sms", "email"), ("delivered", "failed", "requested")
+        ):
+            stats[msg_type][status] += service["statistics"][msg_type][status]
+    for stat in stats.values():
+        stat["failure_rate"] = get_formatted_percentage(
+            stat["failed"], stat["requested"]
+        )
+    return services, stats
+
+
+def services_page(services):
+    statistics = ServicesStatistics(services).filter_and_sort()
+    return statistics.services, statistics.global_stats
+
+
+def legacy_aggregate_template_usage(template_statistics, sort_key="count"):
+    template_statistics = [s for s in template_statistics if s["status"] != "cancelled"]
+    templates = []
+    for k, v in groupby(
+        sorted(template_statistics, key=lambda x: x["template_id"]),
+        key=lambda x: x["template_id"],
+    ):
+        template_stats = list(v)
+        first_stat = template_stats[0] if template_stats else None
+        templates.append(
+            {
+                "template_id": k,
+                "template_name": first_stat.get("template_name"),
+                "template_type": first_stat.get("template_type"),
+                "count": sum(s["count"] for s in template_stats),
+                "created_by": first_stat.get("created_by"),
+                "created_by_id": first_stat.get("created_by_id"),
+                "last_used": first_stat.get("last_used"),
+                "status": first_stat.get("status"),
+                "template_folder": first_stat.get("template_folder"),
+                "template_folder_id": first_stat.get("template_folder_id"),
+            }
+        )
+    return sorted(templates, key=lambda x: x[sort_key], reverse=True)
+
+
+def best_time(function, *args):
+    return min(timeit.repeat(lambda: function(*args), number=1, repeat=REPEAT))
+
+
+def compare(name, legacy, current, data, same):
+    assert same(legacy(data), current(data)), f"{name} gives different results"
+    legacy_time = best_time(legacy, data)
+    current_time = best_time(current, data)
+    sys.stdout.write(
+        f"{name:<32} legacy {legacy_time * 1000:8.2f}ms   "
+        f"current {current_time * 1000:8.2f}ms   "
+        f"{legacy_time / current_time:5.1f}x\n"
+    )
+
+
+def main(count=10_000):
+    sys.stdout.write(f"{count:,} services, best of {REPEAT}\n")
+    compare(
+        "services page",
+        legacy_services_page,
+        services_page,
+        make_services(count),
+        lambda legacy, current: legacy == current,
+    )
+    compare(
+        "aggregate template usage",
+        legacy_aggregate_template_usage,
+        aggregate_template_usage,
+        make_template_statistics(count * 10),
+        lambda legacy, current: legacy == current,
+    )
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,544 @@
+"""
+A stand-in for notifications-api which runs in the same process, so admin pages
+can be benchmarked without one. It serves the read endpoints behind the
+benchmarked pages with payloads built from the same helpers the tests use, at
+whatever scale `StubData` is given, and accepts anything written to it.
+
+    with stub_environment(StubData(templates=1000)) as stub_api:
+        app = create_benchmark_app()
+
+S3 is faked with moto and Redis with fakeredis for as long as the environment is
+open.
+"""
+
+import os
+import random
+import threading
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import boto3
+import fakeredis
+from flask import Blueprint, Flask, abort, current_app, jsonify, request
+from moto import mock_aws
+from werkzeug.local import LocalProxy
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from app.config import Development, configs
+from app.extensions import redis_client
+from tests import job_json, notification_json, service_json, template_json, user_json
+
+ENVIRONMENT = "benchmark"
+CSV_UPLOAD_BUCKET = "benchmark-csv-upload"
+
+
+class StubData:
+    """
+    One platform admin, who belongs to every service. The first service has
+    `templates` text message templates spread across `folders` folders and
+    `jobs` jobs, each with `notifications_per_page` notifications on a page.
+    """
+
+    def __init__(
+        self,
+        services=10,
+        templates=50,
+        folders=5,
+        jobs=20,
+        notifications_per_page=50,
+        seed=0,
+    ):
+        self.random = random.Random(seed)
+        self.notifications_per_page = notifications_per_page
+
+        self.services = [
+            service_json(
+                id_=self.uuid(),
+                name=f"Service {index}",
+                restricted=index % 3 == 0,
+                created_at=str(datetime.utcnow() - timedelta(days=index)),
+            )
+            for index in range(services)
+        ]
+        self.service = self.services[0]
+        self.service["restricted"] = False
+
+        self.user = user_json(
+            id_=self.uuid(),
+            name="Benchmark User",
+            platform_admin=True,
+            permissions={
+                service["id"]: [
+                    "view_activity",
+                    "send_texts",
+                    "send_emails",
+                    "manage_users",
+                    "manage_templates",
+                    "manage_settings",
+                    "manage_api_keys",
+                ]
+                for service in self.services
+            },
+        )
+        for service in self.services:
+            service["users"] = [self.user["id"]]
+
+        self.folders = [
+            {
+                "id": self.uuid(),
+                "name": f"Folder {index}",
+                "parent_id": None,
+                "service_id": self.service["id"],
+                "users_with_permission": [self.user["id"]],
+            }
+            for index in range(folders)
+        ]
+        self.templates = [
+            template_json(
+                self.service["id"],
+                self.uuid(),
+                name=f"Template {index}",
+                type_="sms",
+                content="Hello ((name)), your reference is ((reference)).",
+                folder=(
+                    self.folders[index % len(self.folders)]["id"]
+                    if self.folders and index % 2
+                    else None
+                ),
+            )
+            for index in range(templates)
+        ]
+        self.jobs = [
+            job_json(
+                self.service["id"],
+                self.user,
+                job_id=self.uuid(),
+                template_id=self.templates[index % len(self.templates)]["id"],
+                template_name=self.templates[index % len(self.templates)]["name"],
+                original_file_name=f"contact-list-{index}.csv",
+                notification_count=notifications_per_page,
+                notifications_sent=notifications_per_page,
+                notifications_requested=notifications_per_page,
+                processing_started=datetime.now(timezone.utc).isoformat(),
+            )
+            for index in range(jobs)
+        ]
+
+    def uuid(self):
+        return str(uuid.UUID(int=self.random.getrandbits(128), version=4))
+
+    def get_service(self, service_id):
+        return _find(self.services, service_id)
+
+    def get_template(self, template_id):
+        return _find(self.templates, template_id)
+
+    def get_job(self, job_id):
+        return _find(self.jobs, job_id)
+
+    def get_notifications(self, service_id, job=None):
+        notifications = notification_json(
+            service_id,
+            job=job,
+            template=self.get_template(job["template"]) if job else self.templates[0],
+            template_type="sms",
+            rows=self.notifications_per_page,
+            with_links=True,
+        )
+        for row_number, notification in enumerate(notifications["notifications"]):
+            notification["id"] = self.uuid()
+            notification["job_row_number"] = row_number if job else None
+            notification["status"] = self.random.choice(
+                ("delivered", "delivered", "delivered", "sending", "failed")
+            )
+        return notifications
+
+    def get_statistics(self):
+        return {
+            notification_type: {
+                "requested": self.random.randint(0, 10_000),
+                "delivered": self.random.randint(0, 10_000),
+                "failed": self.random.randint(0, 100),
+            }
+            for notification_type in ("sms", "email")
+        }
+
+
+def _find(items, id_):
+    item = next((item for item in items if item["id"] == id_), None)
+    if item is None:
+        abort(404)
+    return item
+
+
+routes = Blueprint("stub_api", __name__)
+
+# The data of the stub API handling the current request
+stub_data = LocalProxy(lambda: current_app.stub_data)
+
+
+@routes.route("/<path:path>", methods=["POST", "PUT", "DELETE"])
+def write(path):
+    return jsonify(data={}), 200
+
+
+@routes.route("/user/<user_id>")
+def get_user(user_id):
+    return jsonify(data=stub_data.user)
+
+
+@routes.route("/user/<user_id>/organizations-and-services")
+def get_organizations_and_services_for_user(user_id):
+    return jsonify(
+        organizations=[],
+        services=[
+            {
+                "id": service["id"],
+                "name": service["name"],
+                "restricted": service["restricted"],
+                "organization": None,
+            }
+            for service in stub_data.services
+        ],
+    )
+
+
+@routes.route("/service")
+def get_services():
+    services = stub_data.services
+    if request.args.get("detailed") == "True":
+        services = [
+            {**service, "statistics": stub_data.get_statistics()}
+            for service in services
+        ]
+    return jsonify(data=services)
+
+
+@routes.route("/service/<service_id>")
+def get_service(service_id):
+    return jsonify(data=stub_data.get_service(service_id))
+
+
+@routes.route("/service/<service_id>/users")
+def get_users_for_service(service_id):
+    return jsonify(data=[stub_data.user])
+
+
+@routes.route("/service/<service_id>/statistics")
+def get_service_statistics(service_id):
+    return jsonify(data=stub_data.get_statistics())
+
+
+@routes.route("/service/<service_id>/statistics/<start_date>/<int:days>")
+@routes.route("/service/<service_id>/statistics/user/<user_id>/<start_date>/<int:days>")
+def get_service_notification_statistics_by_day(
+    service_id, start_date, days, user_id=None
+):
+    start = datetime.fromisoformat(start_date)
+    return jsonify(
+        data={
+            (start + timedelta(days=day)).strftime(
+                "%Y-%m-%d"
+            ): stub_data.get_statistics()
+            for day in range(days)
+        }
+    )
+
+
+@routes.route("/service/<service_id>/notification-count")
+def get_notification_count(service_id):
+    return jsonify(count=stub_data.random.randint(0, 1000))
+
+
+@routes.route("/service/<service_id>/api-keys")
+def get_api_keys(service_id):
+    return jsonify(apiKeys=[])
+
+
+@routes.route("/service/<service_id>/billing/yearly-usage-summary")
+def get_annual_usage_for_service(service_id):
+    return jsonify(
+        [
+            {
+                "notification_type": notification_type,
+                "chargeable_units": sent,
+                "notifications_sent": sent,
+                "charged_units": sent,
+                "rate": rate,
+                "cost": sent * rate,
+            }
+            for notification_type, rate in (("sms", 0.0165), ("email", 0))
+            for sent in [stub_data.random.randint(0, 10_000)]
+        ]
+    )
+
+
+@routes.route("/service/<service_id>/billing/monthly-usage")
+def get_monthly_usage_for_service(service_id):
+    return jsonify(
+        [
+            {
+                "month": month,
+                "notification_type": "sms",
+                "rate": 0.0165,
+                "chargeable_units": sent,
+                "notifications_sent": sent,
+                "charged_units": sent,
+                "free_allowance_used": 0,
+                "cost": sent * 0.0165,
+            }
+            for month in ("January", "February", "March")
+            for sent in [stub_data.random.randint(0, 10_000)]
+        ]
+    )
+
+
+@routes.route("/service/<service_id>/billing/free-sms-fragment-limit")
+def get_free_sms_fragment_limit_for_year(service_id):
+    return jsonify(free_sms_fragment_limit=250_000)
+
+
+@routes.route("/service/<service_id>/template")
+def get_service_templates(service_id):
+    return jsonify(data=stub_data.templates)
+
+
+@routes.route("/service/<service_id>/template/<template_id>")
+@routes.route("/service/<service_id>/template/<template_id>/version/<int:version>")
+def get_service_template(service_id, template_id, version=None):
+    return jsonify(data=stub_data.get_template(template_id))
+
+
+@routes.route("/service/<service_id>/template-folder")
+def get_template_folders(service_id):
+    return jsonify(template_folders=stub_data.folders)
+
+
+@routes.route("/service/<service_id>/template-statistics")
+def get_template_statistics_for_service(service_id):
+    return jsonify(
+        data=[
+            {
+                "template_id": template["id"],
+                "template_name": template["name"],
+                "template_type": template["template_type"],
+                "count": stub_data.random.randint(1, 1000),
+                "status": status,
+                "last_used": str(datetime.utcnow()),
+            }
+            for template in stub_data.templates[:20]
+            for status in ("delivered", "failed")
+        ]
+    )
+
+
+@routes.route("/service/<service_id>/job")
+def get_jobs(service_id):
+    page_size = 50
+    page = int(request.args.get("page", 1))
+    start, end = (page - 1) * page_size, page * page_size
+    return jsonify(
+        data=stub_data.jobs[start:end],
+        total=len(stub_data.jobs),
+        page_size=page_size,
+        links=(
+            {"next": f"/service/{service_id}/job?page={page + 1}"}
+            if end < len(stub_data.jobs)
+            else {}
+        ),
+    )
+
+
+@routes.route("/service/<service_id>/job/scheduled-job-stats")
+def get_scheduled_job_stats(service_id):
+    return jsonify(count=0, soonest_scheduled_for=None)
+
+
+@routes.route("/service/<service_id>/job/<job_id>")
+def get_job(service_id, job_id):
+    return jsonify(data=stub_data.get_job(job_id))
+
+
+@routes.route("/service/<service_id>/job/<job_id>/notifications")
+def get_notifications_for_job(service_id, job_id):
+    return jsonify(stub_data.get_notifications(service_id, stub_data.get_job(job_id)))
+
+
+@routes.route("/service/<service_id>/job/<job_id>/notification_count")
+def get_notification_count_for_job_id(service_id, job_id):
+    return jsonify(count=stub_data.get_job(job_id)["notification_count"])
+
+
+@routes.route("/service/<service_id>/notifications")
+def get_notifications_for_service(service_id):
+    return jsonify(stub_data.get_notifications(service_id))
+
+
+@routes.route("/service/<service_id>/sms-sender")
+def get_sms_senders(service_id):
+    return jsonify(
+        [
+            {
+                "id": stub_data.uuid(),
+                "sms_sender": "GOVUK",
+                "is_default": True,
+                "inbound_number_id": None,
+                "created_at": str(datetime.now(timezone.utc)),
+                "updated_at": None,
+            }
+        ]
+    )
+
+
+@routes.route("/service/<service_id>/email-reply-to")
+@routes.route("/service/<service_id>/data-retention")
+@routes.route("/service/<service_id>/guest-list")
+def get_empty_list(service_id):
+    return jsonify([])
+
+
+@routes.route("/complaint/count-by-date-range")
+def get_complaint_count():
+    return jsonify(stub_data.random.randint(0, 100))
+
+
+@routes.route("/platform-stats")
+def get_aggregate_platform_stats():
+    return jsonify(
+        {
+            notification_type: {
+                "failures": {
+                    "virus-scan-failed": 0,
+                    "temporary-failure": 0,
+                    "permanent-failure": 0,
+                    "technical-failure": 0,
+                },
+                **{
+                    key: value
+                    for key, value in stub_data.get_statistics()["sms"].items()
+                    if key != "failed"
+                },
+                "total": stub_data.random.randint(10_000, 20_000),
+                "test-key": 0,
+            }
+            for notification_type in ("sms", "email")
+        }
+    )
+
+
+def create_stub_api(data):
+    """
+    A Flask app which answers the admin’s API calls from `data`. Every call is
+    recorded in `app.calls`, and calls to endpoints which aren’t stubbed in
+    `app.unstubbed` too. Both get a 404, as would asking for something which
+    isn’t in `data`.
+    """
+    stub = Flask("stub_api")
+    stub.stub_data = data
+    stub.calls = []
+    stub.unstubbed = []
+
+    @stub.before_request
+    def record_call():
+        stub.calls.append((request.method, request.path))
+
+    @stub.errorhandler(404)
+    @stub.errorhandler(405)
+    def not_found(error):
+        if request.url_rule is None:
+            stub.unstubbed.append((request.method, request.path))
+        return jsonify(result="error", message="No result found"), 404
+
+    stub.register_blueprint(routes)
+    return stub
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+class StubAPI:
+    """
+    Serves `create_stub_api(data)` on a free port from a background thread.
+    """
+
+    def __init__(self, data):
+        self.app = create_stub_api(data)
+        self._server = make_server(
+            "127.0.0.1",
+            0,
+            self.app,
+            threaded=True,
+            request_handler=QuietRequestHandler,
+        )
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+
+    @property
+    def calls(self):
+        return self.app.calls
+
+    @property
+    def unstubbed(self):
+        return self.app.unstubbed
+
+
+class Benchmark(Development):
+    DEBUG = False
+    NOTIFY_LOG_LEVEL = "ERROR"
+    WTF_CSRF_ENABLED = False
+    REDIS_ENABLED = True
+    REDIS_URL = "redis://benchmark"
+    REQUEST_TIMINGS_ENABLED = True
+    REQUEST_TIMINGS_SAMPLE_RATE = 1
+    CSV_UPLOAD_BUCKET = {
+        "bucket": CSV_UPLOAD_BUCKET,
+        "access_key_id": "benchmark",
+        "secret_access_key": "benchmark",  # nosec B105 - only used by moto
+        "region": "us-east-1",
+    }
+
+
+@contextmanager
+def stub_environment(data):
+    """
+    Starts a stub API for `data` and fakes S3 and Redis. Apps made with
+    `create_benchmark_app` inside it use them.
+    """
+    # `create_benchmark_app` changes the environment, so put it back after
+    original_environment = os.environ.get("NOTIFY_ENVIRONMENT")
+    original_provider_class = redis_client.redis_store.provider_class
+    with StubAPI(data) as stub_api, mock_aws():
+        boto3.client("s3", region_name="us-east-1").create_bucket(
+            Bucket=CSV_UPLOAD_BUCKET
+        )
+        redis_client.redis_store.provider_class = fakeredis.FakeStrictRedis
+        configs[ENVIRONMENT] = type(
+            "Benchmark", (Benchmark,), {"API_HOST_NAME": stub_api.url}
+        )
+        try:
+            yield stub_api
+        finally:
+            del configs[ENVIRONMENT]
+            redis_client.redis_store.provider_class = original_provider_class
+            if original_environment is None:
+                os.environ.pop("NOTIFY_ENVIRONMENT", None)
+            else:
+                os.environ["NOTIFY_ENVIRONMENT"] = original_environment
+
+
+def create_benchmark_app():
+    from app import create_app
+
+    os.environ["NOTIFY_ENVIRONMENT"] = ENVIRONMENT
+    application = Flask("app")
+    create_app(application)
+    return application
@@ -14,6 +14,7 @@ from flask import Flask, url_for
 from notifications_python_client.errors import HTTPError
 
 from app import create_app
+from app.utils.render_cache import fragment_cache, preview_cache
 from notifications_utils.url_safe_token import generate_token
 
 from . import (
@@ -53,6 +54,15 @@ def notify_admin():
     return app
 
 
+@pytest.fixture(autouse=True)
+def _clear_render_caches():
+    # Rendered output is cached per process, so stop it leaking between tests
+    # which reuse the same template IDs with different content
+    yield
+    preview_cache.clear()
+    fragment_cache.clear()
+
+
 @pytest.fixture
 def service_one(api_user_active):
     return service_json(SERVICE_ONE_ID, "service one", [api_user_active["id"]])
@@ -2450,19 +2460,25 @@ def client_request(logged_in_client, mocker, service_one):  # noqa (C901 too com
 
         @staticmethod
         def get_response(
-            endpoint, _expected_status=200, _optional_args="", **endpoint_kwargs
+            endpoint,
+            _expected_status=200,
+            _optional_args="",
+            _headers=None,
+            **endpoint_kwargs,
         ):
             return ClientRequest.get_response_from_url(
                 url_for(endpoint, **(endpoint_kwargs or {})) + _optional_args,
                 _expected_status=_expected_status,
+                _headers=_headers,
             )
 
         @staticmethod
         def get_response_from_url(
             url,
             _expected_status=200,
+            _headers=None,
         ):
-            resp = logged_in_client.get(url)
+            resp = logged_in_client.get(url, headers=_headers)
             assert resp.status_code == _expected_status
             return resp
 
@@ -498,6 +498,94 @@ describe('Update content', () => {
 
   });
 
+  describe("If the server streams progress for the block", () => {
+
+    let stream;
+    let streamCount = 0;
+
+    beforeEach(() => {
+
+      // jsdom doesn't have EventSource so mock the bits that are used
+      window.EventSource = jest.fn(function (url) {
+        stream = this;
+        this.listeners = {};
+        this.readyState = 1;
+        this.addEventListener = (name, listener) => this.listeners[name] = listener;
+        this.close = jest.fn(() => this.readyState = 2);
+      });
+      window.EventSource.CLOSED = 2;
+
+      // Streams are shared by URL so give each test its own
+      streamCount++;
+
+      document.body.innerHTML = `
+        <div data-module="update-content" data-resource="${resourceURL}" data-key="${updateKey}" data-stream="/progress/${streamCount}">
+          <div class="ajax-block-container">
+            <ul class="pill">
+              <li data-pill-option="delivered"><span class="big-number-number">0</span></li>
+            </ul>
+          </div>
+        </div>`;
+
+      responseObj[updateKey] = `<div class="ajax-block-container"><p>Finished</p></div>`;
+
+      // start the module
+      window.GOVUK.modules.start();
+
+    });
+
+    afterEach(() => {
+      delete window.EventSource;
+    });
+
+    test("It should listen to the stream instead of polling", () => {
+
+      jest.advanceTimersByTime(10000);
+      expect(window.EventSource).toHaveBeenCalledWith(`/progress/${streamCount}`);
+      expect($.ajax).not.toHaveBeenCalled();
+
+    });
+
+    test("It should update the counts it is sent", () => {
+
+      stream.listeners.progress({ data: JSON.stringify({ counts: { delivered: 1234 } }) });
+      expect(
+        document.querySelector('[data-pill-option="delivered"] .big-number-number').textContent
+      ).toEqual('1,234');
+      expect($.ajax).not.toHaveBeenCalled();
+
+    });
+
+    test("It should close the stream and fetch the block once when the stream ends", () => {
+
+      stream.listeners.end({ data: '{}' });
+      expect(stream.close).toHaveBeenCalled();
+      expect($.ajax).toHaveBeenCalledTimes(1);
+      expect(document.querySelector('.ajax-block-container').textContent).toEqual('Finished');
+
+    });
+
+    test("It should go back to polling if the server can't keep sending progress", () => {
+
+      stream.listeners.fallback({ data: '{}' });
+      expect(stream.close).toHaveBeenCalled();
+      expect($.ajax).toHaveBeenCalledTimes(1);
+
+      jest.advanceTimersByTime(2000);
+      expect($.ajax).toHaveBeenCalledTimes(2);
+
+    });
+
+    test("It should go back to polling if the server refuses the stream", () => {
+
+      stream.readyState = window.EventSource.CLOSED;
+      stream.listeners.error({});
+      expect($.ajax).toHaveBeenCalledTimes(1);
+
+    });
+
+  });
+
   afterEach(() => {
 
     document.body.innerHTML = '';
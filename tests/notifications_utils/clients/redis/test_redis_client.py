@@ -2,10 +2,19 @@ import uuid
 from datetime import datetime
 from unittest.mock import Mock, call
 
+import fakeredis
 import pytest
 from freezegun import freeze_time
-
-from notifications_utils.clients.redis.redis_client import RedisClient, prepare_value
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ResponseError
+
+from notifications_utils.clients.redis.redis_client import (
+    RateLimit,
+    RedisCircuitBreaker,
+    RedisCircuitOpenError,
+    RedisClient,
+    prepare_value,
+)
 
 
 @pytest.fixture
@@ -19,7 +28,14 @@ def delete_mock():
 
 
 @pytest.fixture
-def mocked_redis_client(app, mocked_redis_pipeline, delete_mock, mocker):
+def rate_limit_mock():
+    return Mock(return_value=[1, 4, b"0"])
+
+
+@pytest.fixture
+def mocked_redis_client(
+    app, mocked_redis_pipeline, delete_mock, rate_limit_mock, mocker
+):
     app.config["REDIS_ENABLED"] = True
 
     redis_client = RedisClient()
@@ -34,7 +50,9 @@ def mocked_redis_client(app, mocked_redis_pipeline, delete_mock, mocker):
     )
 
     mocker.patch.object(
-        redis_client, "scripts", {"delete-keys-by-pattern": delete_mock}
+        redis_client,
+        "scripts",
+        {"delete-keys-by-pattern": delete_mock, "rate-limit": rate_limit_mock},
     )
 
     mocker.patch.object(
@@ -47,7 +65,7 @@ def mocked_redis_client(app, mocked_redis_pipeline, delete_mock, mocker):
 
 
 @pytest.fixture
-def failing_redis_client(mocked_redis_client, delete_mock):
+def failing_redis_client(mocked_redis_client, delete_mock, rate_limit_mock):
     # nota bene: using KeyError because flake8 thinks Exception
     # and BaseException are too broad
     mocked_redis_client.redis_store.get.side_effect = KeyError("get failed")
@@ -56,6 +74,7 @@ def failing_redis_client(mocked_redis_client, delete_mock):
     mocked_redis_client.redis_store.pipeline.side_effect = KeyError("pipeline failed")
     mocked_redis_client.redis_store.delete.side_effect = KeyError("delete failed")
     delete_mock.side_effect = KeyError("delete by pattern failed")
+    rate_limit_mock.side_effect = KeyError("rate limit failed")
     return mocked_redis_client
 
 
@@ -64,15 +83,25 @@ def test_should_not_raise_exception_if_raise_set_to_false(
 ):
     mock_logger = mocker.patch("flask.Flask.logger")
 
+    assert failing_redis_client.get("get_key") is None
+    assert failing_redis_client.set("set_key", "set_value") is None
     assert failing_redis_client.incr("incr_key") is None
     assert failing_redis_client.exceeded_rate_limit("rate_limit_key", 100, 100) is False
+    assert failing_redis_client.check_rate_limit("rate_limit_key", 100, 100) == (
+        True,
+        99,
+        0,
+    )
     assert failing_redis_client.delete("delete_key") is None
     assert failing_redis_client.delete("a", "b", "c") is None
     assert failing_redis_client.delete_by_pattern("pattern") == 0
 
     assert mock_logger.mock_calls == [
+        call.exception("Redis error performing get on get_key"),
+        call.exception("Redis error performing set on set_key"),
         call.exception("Redis error performing incr on incr_key"),
         call.exception("Redis error performing rate-limit-pipeline on rate_limit_key"),
+        call.exception("Redis error performing rate-limit on rate_limit_key"),
         call.exception("Redis error performing delete on delete_key"),
         call.exception("Redis error performing delete on a, b, c"),
         call.exception("Redis error performing delete-by-pattern on pattern"),
@@ -138,6 +167,30 @@ def test_should_call_get_if_enabled(mocked_redis_client):
     mocked_redis_client.redis_store.get.assert_called_with("key")
 
 
+def test_get_many(mocked_redis_client, mocker):
+    mocker.patch.object(
+        mocked_redis_client.redis_store, "mget", return_value=[b"1", None]
+    )
+    assert mocked_redis_client.get_many(["a", uuid.UUID(int=1)]) == [b"1", None]
+    mocked_redis_client.redis_store.mget.assert_called_once_with(
+        ["a", "00000000-0000-0000-0000-000000000001"]
+    )
+
+
+def test_get_many_returns_misses_if_not_enabled_or_failing(mocked_redis_client, mocker):
+    mocker.patch.object(
+        mocked_redis_client.redis_store, "mget", side_effect=KeyError("mget failed")
+    )
+    mock_logger = mocker.patch("flask.Flask.logger")
+
+    assert mocked_redis_client.get_many(["a", "b"]) == [None, None]
+    mock_logger.exception.assert_called_once_with("Redis error performing mget on a, b")
+
+    mocked_redis_client.active = False
+    assert mocked_redis_client.get_many(["a", "b"]) == [None, None]
+    assert mocked_redis_client.redis_store.mget.call_count == 1
+
+
 @freeze_time("2001-01-01 12:00:00.000000")
 def test_exceeded_rate_limit_should_add_correct_calls_to_the_pipe(
     mocked_redis_client, mocked_redis_pipeline
@@ -217,3 +270,160 @@ def test_delete_by_pattern(mocked_redis_client, delete_mock):
     ret = mocked_redis_client.delete_by_pattern("foo")
     assert ret == 4
     delete_mock.assert_called_once_with(args=["foo"])
+
+
+def test_pool_and_timeouts_are_configured(app, mocker):
+    mock_init_app = mocker.patch("flask_redis.FlaskRedis.init_app")
+    app.config.update(
+        REDIS_ENABLED=True,
+        REDIS_MAX_CONNECTIONS=20,
+        REDIS_SOCKET_TIMEOUT=0.5,
+        REDIS_SOCKET_CONNECT_TIMEOUT=1,
+        REDIS_HEALTH_CHECK_INTERVAL=None,
+    )
+
+    RedisClient().init_app(app)
+
+    mock_init_app.assert_called_once_with(
+        app, max_connections=20, socket_timeout=0.5, socket_connect_timeout=1
+    )
+
+
+def test_circuit_opens_after_failures_in_a_row_and_skips_redis(
+    app, mocked_redis_client, mocker
+):
+    mocked_redis_client.circuit.max_failures = 3
+    mocked_redis_client.redis_store.get.side_effect = RedisConnectionError
+    mock_logger = mocker.patch("flask.Flask.logger")
+
+    for _ in range(5):
+        assert mocked_redis_client.get("key") is None
+    mocked_redis_client.set("key", "value")
+    assert mocked_redis_client.get_many(["key"]) == [None]
+
+    assert mocked_redis_client.redis_store.get.call_count == 3
+    assert not mocked_redis_client.redis_store.set.called
+    assert mocked_redis_client.circuit.stats == {
+        "state": "open",
+        "consecutive_failures": 3,
+    }
+    mock_logger.warning.assert_called_once_with("Redis circuit is %s", "open")
+    with pytest.raises(RedisCircuitOpenError):
+        mocked_redis_client.get("key", raise_exception=True)
+
+
+def test_other_errors_do_not_open_the_circuit(app, failing_redis_client):
+    for _ in range(10):
+        failing_redis_client.get("key")
+
+    assert failing_redis_client.redis_store.get.call_count == 10
+    assert failing_redis_client.circuit.state == "closed"
+
+
+@pytest.mark.parametrize(
+    ("side_effect", "expected_state"),
+    [(None, "closed"), (RedisConnectionError, "open")],
+)
+def test_circuit_tries_redis_again_after_cooling_down(
+    app, mocked_redis_client, side_effect, expected_state
+):
+    mocked_redis_client.circuit.max_failures = 1
+    mocked_redis_client.redis_store.get.side_effect = RedisConnectionError
+
+    with freeze_time("2001-01-01 12:00:00") as frozen_time:
+        mocked_redis_client.get("key")
+        frozen_time.tick(29)
+        mocked_redis_client.get("key")
+        assert mocked_redis_client.redis_store.get.call_count == 1
+
+        frozen_time.tick(1)
+        mocked_redis_client.redis_store.get.side_effect = side_effect
+        mocked_redis_client.get("key")
+
+    assert mocked_redis_client.redis_store.get.call_count == 2
+    assert mocked_redis_client.circuit.state == expected_state
+
+
+def test_circuit_closes_if_redis_answers_the_call_after_cooling_down_with_an_error(
+    app, mocked_redis_client
+):
+    mocked_redis_client.circuit.max_failures = 1
+    mocked_redis_client.redis_store.get.side_effect = RedisConnectionError
+
+    with freeze_time("2001-01-01 12:00:00") as frozen_time:
+        mocked_redis_client.get("key")
+        frozen_time.tick(30)
+        mocked_redis_client.redis_store.get.side_effect = ResponseError("WRONGTYPE")
+        mocked_redis_client.get("key")
+        assert mocked_redis_client.circuit.state == "closed"
+
+        mocked_redis_client.redis_store.get.side_effect = None
+        for _ in range(3):
+            assert mocked_redis_client.get("key") == 100
+
+    assert mocked_redis_client.redis_store.get.call_count == 5
+
+
+def test_circuit_tries_again_if_the_call_after_cooling_down_never_finishes(app):
+    circuit = RedisCircuitBreaker(max_failures=1, cooldown=30)
+
+    with freeze_time("2001-01-01 12:00:00") as frozen_time:
+        circuit.record_failure()
+        frozen_time.tick(30)
+        assert circuit.allow()
+        assert circuit.state == "half-open"
+        frozen_time.tick(29)
+        assert not circuit.allow()
+        frozen_time.tick(1)
+        assert circuit.allow()
+        circuit.record_success()
+
+    assert circuit.state == "closed"
+
+
+def test_check_rate_limit(mocked_redis_client, rate_limit_mock):
+    assert mocked_redis_client.check_rate_limit(uuid.UUID(int=1), 5, 60) == RateLimit(
+        allowed=True, remaining=4, retry_after=0
+    )
+    rate_limit_mock.assert_called_once_with(
+        keys=["00000000-0000-0000-0000-000000000001"], args=[5, 60]
+    )
+
+
+def test_check_rate_limit_returns_when_to_retry(mocked_redis_client, rate_limit_mock):
+    rate_limit_mock.return_value = [0, 0, b"11.5"]
+
+    assert mocked_redis_client.check_rate_limit("key", 5, 60) == RateLimit(
+        allowed=False, remaining=0, retry_after=11.5
+    )
+
+
+def test_check_rate_limit_allows_requests_if_not_enabled(
+    mocked_redis_client, rate_limit_mock
+):
+    mocked_redis_client.active = False
+
+    assert mocked_redis_client.check_rate_limit("key", 5, 60).allowed is True
+    rate_limit_mock.assert_not_called()
+
+
+def test_check_rate_limit_script(app, mocker):
+    # Running Lua in fakeredis needs lupa
+    pytest.importorskip("lupa")
+    app.config["REDIS_ENABLED"] = True
+    redis_client = RedisClient()
+    mocker.patch.object(
+        redis_client.redis_store, "provider_class", fakeredis.FakeStrictRedis
+    )
+    redis_client.init_app(app)
+
+    results = [redis_client.check_rate_limit("key", 3, 60) for _ in range(4)]
+
+    assert [result[:2] for result in results] == [
+        (True, 2),
+        (True, 1),
+        (True, 0),
+        (False, 0),
+    ]
+    assert 19 < results[-1].retry_after <= 20
+    assert 39_000 < redis_client.redis_store.pttl("key") <= 60_000
@@ -1,6 +1,12 @@
 import pytest
 
-from notifications_utils.countries import Country, CountryMapping, CountryNotFoundError
+from notifications_utils import countries as countries_module
+from notifications_utils.countries import (
+    Country,
+    CountryMapping,
+    CountryNotFoundError,
+    get_countries,
+)
 from notifications_utils.countries.data import (
     _EUROPEAN_ISLANDS_LIST,
     _UK_ISLANDS_LIST,
@@ -17,6 +23,15 @@ from .country_synonyms import ALL as ALL_SYNONYMS
 from .country_synonyms import CROWDSOURCED_MISTAKES
 
 
+def test_countries_are_only_mapped_once():
+    assert countries_module.countries is get_countries()
+    assert Country("Wales").canonical_name == UK
+    assert get_countries.cache_info().misses == 1
+
+    with pytest.raises(AttributeError):
+        countries_module.not_a_thing
+
+
 def test_constants():
     assert UK == "United Kingdom"
     assert UK_ISLANDS == [
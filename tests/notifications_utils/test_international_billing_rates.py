@@ -3,6 +3,7 @@ import pytest
 from notifications_utils.international_billing_rates import (
     COUNTRY_PREFIXES,
     INTERNATIONAL_BILLING_RATES,
+    get_international_billing_rates,
 )
 from notifications_utils.recipients import use_numeric_sender
 
@@ -11,6 +12,11 @@ def test_international_billing_rates_exists():
     assert INTERNATIONAL_BILLING_RATES["1"]["names"][0] == "Canada"
 
 
+def test_international_billing_rates_are_only_loaded_once():
+    assert get_international_billing_rates() is INTERNATIONAL_BILLING_RATES
+    assert get_international_billing_rates.cache_info().misses == 1
+
+
 @pytest.mark.parametrize(
     ("country_prefix", "values"), sorted(INTERNATIONAL_BILLING_RATES.items())
 )
@@ -1,5 +1,11 @@
+import importlib
 import json
 import logging as builtin_logging
+import os
+import sys
+from io import StringIO
+
+import pytest
 
 from notifications_utils import logging
 
@@ -64,3 +70,92 @@ def test_pii_filter():
     pii_filter = logging.PIIFilter()
     clean_msg = "phone1: 1XXXXXXXXXX, phone2: 1XXXXXXXXXX, email1: XXXXX@XXXXXXX, email2: XXXXX@XXXXXXX"
     assert pii_filter.filter(record).msg == clean_msg
+
+
+def test_pii_filter_scrubs_the_message_once_merged_with_its_arguments():
+    record = builtin_logging.makeLogRecord(
+        {"msg": "Sending to %s and %s", "args": ("1555555555", "fake@fake.gov")}
+    )
+
+    logging.PIIFilter().filter(record)
+
+    assert record.msg == "Sending to 1XXXXXXXXXX and XXXXX@XXXXXXX"
+    assert record.args is None
+
+
+@pytest.mark.parametrize(
+    ("message", "expected_message"),
+    [
+        ("email: 15555555555@fake.gov", "email: XXXXX@XXXXXXX"),
+        ("phone: +15555555555.", "phone: 1XXXXXXXXXX."),
+        ("created at 2024-01-01 12:00:00", "created at 2024-01-01 12:00:00"),
+        (
+            "job 6ce466d0-fd6a-11e5-82f5-e0accb9d11a6",
+            "job 6ce466d0-fd6a-11e5-82f5-e0accb9d11a6",
+        ),
+    ],
+)
+def test_scrub(message, expected_message):
+    assert logging._scrub(message) == expected_message
+
+
+def test_queueing_handler_writes_records_in_the_background():
+    stream = StringIO()
+    stream_handler = builtin_logging.StreamHandler(stream)
+    stream_handler.addFilter(logging.PIIFilter())
+    stream_handler.addFilter(logging.AppNameFilter("background"))
+    queue_handler = logging.QueueingHandler([stream_handler], 10)
+    queue_handler.addFilter(logging.AppNameFilter("admin"))
+    stream_handler.setFormatter(builtin_logging.Formatter("%(app_name)s %(message)s"))
+    args = {"to": "fake@fake.gov"}
+
+    queue_handler.handle(
+        builtin_logging.makeLogRecord(
+            {"msg": "Sent to %(to)s", "args": args, "levelno": builtin_logging.INFO}
+        )
+    )
+    args["to"] = "changed"
+    assert queue_handler.listener._thread is not None
+    queue_handler.stop()
+
+    assert stream.getvalue() == "admin Sent to XXXXX@XXXXXXX\n"
+
+
+def test_queueing_handler_drops_records_when_the_queue_is_full():
+    queue_handler = logging.QueueingHandler([builtin_logging.StreamHandler()], 2)
+    # Without starting the background thread
+    queue_handler._pid = os.getpid()
+
+    for i in range(5):
+        queue_handler.handle(builtin_logging.makeLogRecord({"msg": f"record {i}"}))
+
+    assert queue_handler.stats == {"waiting": 2, "maxsize": 2, "dropped": 3}
+
+    queue_handler.queue.get_nowait()
+    queue_handler.queue.get_nowait()
+    queue_handler.handle(builtin_logging.makeLogRecord({"msg": "record 5"}))
+
+    assert [record.getMessage() for record in queue_handler.queue.queue] == [
+        "record 5",
+        "Dropped 3 log records because the queue was full",
+    ]
+    assert queue_handler.queue.queue[1].levelno == builtin_logging.WARNING
+
+
+def test_queueing_handler_uses_a_real_thread_if_eventlet_has_patched_threading(
+    mocker,
+):
+    patcher = mocker.Mock()
+    patcher.is_monkey_patched.return_value = True
+    patcher.original.side_effect = importlib.import_module
+    mocker.patch.dict(sys.modules, {"eventlet.patcher": patcher})
+    queue_handler = logging.QueueingHandler([builtin_logging.StreamHandler()], 2)
+
+    queue_handler.start()
+    queue_handler.stop()
+
+    patcher.is_monkey_patched.assert_called_with("thread")
+    assert [args for args, _ in patcher.original.call_args_list] == [
+        ("queue",),
+        ("threading",),
+    ]
@@ -0,0 +1,186 @@
+import pytest
+from flask import render_template_string
+
+from notifications_utils import request_timings
+from notifications_utils.request_timings import (
+    LatencyHistograms,
+    RequestTimings,
+    get_endpoint_template,
+    timed,
+    timer,
+)
+
+
+@pytest.fixture
+def timed_app(app, mocker):
+    app.config["REQUEST_TIMINGS_ENABLED"] = True
+    app.config["REQUEST_TIMINGS_SAMPLE_RATE"] = 1
+
+    @timed("redis")
+    def get_from_redis():
+        return "cached"
+
+    @app.before_request
+    def load_something():
+        get_from_redis()
+
+    @app.route("/<thing_id>")
+    def page(thing_id):
+        with timer("api", "GET /thing/<id>") as outcome:
+            outcome["status"] = 200
+        return render_template_string("{{ thing_id }}", thing_id=thing_id)
+
+    request_timings.init_app(app)
+    request_timings.latency_histograms.clear()
+    yield app
+    request_timings.latency_histograms.clear()
+
+
+@pytest.mark.parametrize(
+    ("url", "expected_template"),
+    [
+        ("https://api.notify.gov/service/1234-abcd/job", "/service/<id>/job"),
+        (
+            "http://localhost:6011/service/6ce466d0-fd6a-11e5-82f5-e0accb9d11a6/job/"
+            "8c6f0d7c-2a1a-4a5b-9d4e-3b2a1c0d9e8f?page=2",
+            "/service/<id>/job/<id>",
+        ),
+        ("/user/someone@example.gov/verify", "/user/<id>/verify"),
+        ("/invite/service/check/IjEyMyI.abc", "/invite/service/check/<id>"),
+        ("/platform-stats", "/platform-stats"),
+    ],
+)
+def test_get_endpoint_template(url, expected_template):
+    assert get_endpoint_template(url) == expected_template
+
+
+def test_sampled_requests_get_a_server_timing_header_and_a_log_line(timed_app, mocker):
+    mock_log = mocker.patch.object(timed_app.logger, "info")
+
+    response = timed_app.test_client().get("/1234")
+
+    assert response.status_code == 200
+    metrics = [
+        metric.split(";") for metric in response.headers["Server-Timing"].split(", ")
+    ]
+    assert [metric[0] for metric in metrics] == [
+        "hooks",
+        "api",
+        "redis",
+        "render",
+        "total",
+    ]
+    assert metrics[0][2] == 'desc="1 calls"'
+    assert all(metric[1].startswith("dur=") for metric in metrics)
+
+    message, method, endpoint, status_code = mock_log.call_args.args[:4]
+    assert message == "%s %s %s took %.1fms (%s)"
+    assert (method, endpoint, status_code) == ("GET", "page", 200)
+    extra = mock_log.call_args.kwargs["extra"]
+    assert extra["endpoint"] == "page"
+    assert extra["status_code"] == 200
+    assert {
+        (call["category"], call["name"], call["status"], call["count"])
+        for call in extra["request_timings"]["calls"]
+    } == {
+        ("hooks", "load_something", None, 1),
+        ("redis", "get_from_redis", None, 1),
+        ("api", "GET /thing/<id>", 200, 1),
+        ("render", None, None, 1),
+    }
+
+
+def test_requests_which_are_not_sampled_still_count_towards_latency(timed_app, mocker):
+    timed_app.config["REQUEST_TIMINGS_SAMPLE_RATE"] = 0
+    mock_log = mocker.patch.object(timed_app.logger, "info")
+
+    client = timed_app.test_client()
+    client.get("/1234")
+    response = client.get("/5678")
+
+    assert "Server-Timing" not in response.headers
+    assert mock_log.called is False
+    assert request_timings.latency_histograms.stats["page"]["count"] == 2
+
+
+def test_nothing_is_timed_when_turned_off(timed_app):
+    timed_app.config["REQUEST_TIMINGS_ENABLED"] = False
+
+    response = timed_app.test_client().get("/1234")
+
+    assert "Server-Timing" not in response.headers
+    assert request_timings.latency_histograms.stats == {}
+
+
+def test_timer_does_nothing_outside_a_request(app):
+    with timer("api", "GET /thing") as outcome:
+        outcome["status"] = 200
+
+    assert timed("redis")(lambda: "cached")() == "cached"
+
+
+def test_request_timings_add_up_calls():
+    timings = RequestTimings(sampled=True)
+    timings.add("api", "GET /service/<id>", 0.010, 200)
+    timings.add("api", "GET /service/<id>", 0.020, 200)
+    timings.add("api", "GET /user/<id>", 0.005, 404)
+    timings.add("redis", "get", 0.001)
+
+    assert timings.server_timing(0.05) == (
+        'api;dur=35.0;desc="3 calls", redis;dur=1.0;desc="1 calls", total;dur=50.0'
+    )
+    assert timings.summary() == "api 35.0ms/3, redis 1.0ms/1"
+    assert timings.as_dict(0.05) == {
+        "duration_ms": 50.0,
+        "api_ms": 35.0,
+        "redis_ms": 1.0,
+        "calls": [
+            {
+                "category": "api",
+                "name": "GET /service/<id>",
+                "status": 200,
+                "count": 2,
+                "duration_ms": 30.0,
+            },
+            {
+                "category": "api",
+                "name": "GET /user/<id>",
+                "status": 404,
+                "count": 1,
+                "duration_ms": 5.0,
+            },
+            {
+                "category": "redis",
+                "name": "get",
+                "status": None,
+                "count": 1,
+                "duration_ms": 1.0,
+            },
+        ],
+    }
+
+
+def test_latency_histograms():
+    histograms = LatencyHistograms(buckets=(0.01, 0.1, 1))
+    for duration in (0.005, 0.005, 0.05, 0.5, 5):
+        histograms.observe("main.dashboard", duration)
+    histograms.observe("main.index", 0.01)
+
+    assert histograms.stats == {
+        "main.dashboard": {
+            "count": 5,
+            "mean_ms": 1112.0,
+            "p50_ms": 100,
+            "p95_ms": None,
+            "p99_ms": None,
+            "buckets": [[10, 2], [100, 1], [1000, 1], ["+Inf", 1]],
+        },
+        "main.index": {
+            "count": 1,
+            "mean_ms": 10.0,
+            "p50_ms": 10,
+            "p95_ms": 10,
+            "p99_ms": 10,
+            "buckets": [[10, 1], [100, 0], [1000, 0], ["+Inf", 0]],
+        },
+    }